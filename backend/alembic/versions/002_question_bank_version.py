@@ -0,0 +1,49 @@
+"""Question bank version counter
+
+Revision ID: 002_question_bank_version
+Revises: 001_initial
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '002_question_bank_version'
+down_revision = '001_initial'
+branch_labels = None
+depends_on = None
+
+QUESTION_BANK_TABLES = ('technologies', 'categories', 'questions')
+
+
+def upgrade():
+    op.create_table('question_bank_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO question_bank_version (id, version) VALUES (1, 0)")
+
+    op.execute("""
+    CREATE OR REPLACE FUNCTION bump_question_bank_version() RETURNS trigger AS $$
+    BEGIN
+        UPDATE question_bank_version SET version = version + 1, updated_at = now() WHERE id = 1;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """)
+    for table_name in QUESTION_BANK_TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table_name}_bump_question_bank_version "
+            f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table_name} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION bump_question_bank_version()"
+        )
+
+
+def downgrade():
+    for table_name in QUESTION_BANK_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table_name}_bump_question_bank_version ON {table_name}")
+    op.execute("DROP FUNCTION IF EXISTS bump_question_bank_version()")
+    op.drop_table('question_bank_version')
@@ -0,0 +1,29 @@
+"""Widen users.hashed_password for argon2 hashes
+
+Revision ID: 003_widen_password_hash
+Revises: 002_question_bank_version
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003_widen_password_hash'
+down_revision = '002_question_bank_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.alter_column('users', 'hashed_password',
+               existing_type=sa.String(length=100),
+               type_=sa.String(length=255),
+               existing_nullable=False)
+
+
+def downgrade():
+    op.alter_column('users', 'hashed_password',
+               existing_type=sa.String(length=255),
+               type_=sa.String(length=100),
+               existing_nullable=False)
@@ -0,0 +1,75 @@
+"""Per-user statistics rollups
+
+Revision ID: 004_user_stats_rollups
+Revises: 003_widen_password_hash
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004_user_stats_rollups'
+down_revision = '003_widen_password_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('total_quizzes', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.BigInteger(), nullable=False),
+    sa.Column('best_score', sa.Integer(), nullable=False),
+    sa.Column('total_time_spent', sa.BigInteger(), nullable=False),
+    sa.Column('last_completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    op.create_table('user_technology_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('technology_id', sa.Integer(), nullable=False),
+    sa.Column('quiz_count', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['technology_id'], ['technologies.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'technology_id')
+    )
+
+    op.create_table('user_daily_activity',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('quiz_count', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+    # Backfill initial depuis les sessions déjà terminées
+    op.execute("""
+    INSERT INTO user_stats (user_id, total_quizzes, score_sum, best_score, total_time_spent, last_completed_at)
+    SELECT user_id, count(id), sum(coalesce(score_percentage, 0)), max(coalesce(score_percentage, 0)),
+           sum(coalesce(time_spent_seconds, 0)), max(completed_at)
+    FROM quiz_sessions WHERE completed_at IS NOT NULL
+    GROUP BY user_id
+    """)
+    op.execute("""
+    INSERT INTO user_technology_stats (user_id, technology_id, quiz_count, score_sum)
+    SELECT user_id, technology_id, count(id), sum(coalesce(score_percentage, 0))
+    FROM quiz_sessions WHERE completed_at IS NOT NULL
+    GROUP BY user_id, technology_id
+    """)
+    op.execute("""
+    INSERT INTO user_daily_activity (user_id, day, quiz_count, score_sum)
+    SELECT user_id, CAST(completed_at AS DATE), count(id), sum(coalesce(score_percentage, 0))
+    FROM quiz_sessions WHERE completed_at IS NOT NULL
+    GROUP BY user_id, CAST(completed_at AS DATE)
+    """)
+
+
+def downgrade():
+    op.drop_table('user_daily_activity')
+    op.drop_table('user_technology_stats')
+    op.drop_table('user_stats')
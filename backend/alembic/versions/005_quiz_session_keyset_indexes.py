@@ -0,0 +1,29 @@
+"""Keyset pagination indexes on quiz_sessions
+
+Revision ID: 005_quiz_session_keyset_indexes
+Revises: 004_user_stats_rollups
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005_quiz_session_keyset_indexes'
+down_revision = '004_user_stats_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_quiz_sessions_user_completed', 'quiz_sessions',
+                    ['user_id', sa.text('completed_at DESC'), sa.text('id DESC')],
+                    unique=False, postgresql_where=sa.text('completed_at IS NOT NULL'))
+    op.create_index('ix_quiz_sessions_user_started', 'quiz_sessions',
+                    ['user_id', sa.text('started_at DESC'), sa.text('id DESC')],
+                    unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_quiz_sessions_user_started', table_name='quiz_sessions')
+    op.drop_index('ix_quiz_sessions_user_completed', table_name='quiz_sessions')
@@ -0,0 +1,54 @@
+"""Indexes for hot query shapes, per-technology category names
+
+Revision ID: 006_hot_query_indexes
+Revises: 005_quiz_session_keyset_indexes
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_hot_query_indexes'
+down_revision = '005_quiz_session_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 001 déclarait categories.name unique globalement : le modèle n'impose l'unicité
+    # que par technologie (_category_technology_uc)
+    op.execute("DROP INDEX IF EXISTS ix_categories_name")
+    op.create_index(op.f('ix_categories_name'), 'categories', ['name'], unique=False)
+    op.execute("""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = '_category_technology_uc') THEN
+            ALTER TABLE categories ADD CONSTRAINT _category_technology_uc UNIQUE (name, technology_id);
+        END IF;
+    END
+    $$
+    """)
+    # Colonne présente dans le modèle mais absente de 001
+    op.execute("ALTER TABLE questions ADD COLUMN IF NOT EXISTS images JSON")
+
+    op.create_index(op.f('ix_categories_technology_id'), 'categories', ['technology_id'], unique=False)
+    op.create_index('ix_questions_active_filters', 'questions',
+                    ['technology_id', 'category_id', 'difficulty'],
+                    unique=False, postgresql_where=sa.text('is_active = true'))
+    op.create_index('ix_questions_active_category', 'questions',
+                    ['category_id', 'difficulty'],
+                    unique=False, postgresql_where=sa.text('is_active = true'))
+    op.create_index(op.f('ix_quiz_answers_quiz_session_id'), 'quiz_answers', ['quiz_session_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_quiz_answers_quiz_session_id'), table_name='quiz_answers')
+    op.drop_index('ix_questions_active_category', table_name='questions')
+    op.drop_index('ix_questions_active_filters', table_name='questions')
+    op.drop_index(op.f('ix_categories_technology_id'), table_name='categories')
+    op.drop_constraint('_category_technology_uc', 'categories', type_='unique')
+    # Retour à l'index unique global de 001 (échoue si des catégories homonymes existent
+    # dans plusieurs technologies : les renommer avant de redescendre)
+    op.drop_index(op.f('ix_categories_name'), table_name='categories')
+    op.create_index(op.f('ix_categories_name'), 'categories', ['name'], unique=True)
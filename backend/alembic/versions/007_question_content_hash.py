@@ -0,0 +1,85 @@
+"""Normalized content hash on questions
+
+Duplicate questions already present are merged and deleted: this data change is
+irreversible, downgrade() only drops the column and its index.
+
+Revision ID: 007_question_content_hash
+Revises: 006_hot_query_indexes
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+import hashlib
+import json
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_question_content_hash'
+down_revision = '006_hot_query_indexes'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+# Normalisation figée à cette révision (copie de app.models.database_models) : rejouer la
+# migration doit donner les mêmes empreintes et les mêmes fusions, même si l'application évolue
+def _normalize_text(value) -> str:
+    return " ".join(unicodedata.normalize("NFKC", str(value)).casefold().split())
+
+
+def question_content_hash(question_text, options) -> str:
+    if isinstance(options, str):
+        options = json.loads(options)
+    payload = json.dumps(
+        [_normalize_text(question_text), sorted(_normalize_text(option) for option in options or [])],
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def upgrade():
+    op.add_column('questions', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+    # Empreintes calculées en Python avec la normalisation de l'application.
+    # Les doublons déjà présents sont fusionnés dans la question conservée (active de
+    # préférence, sinon la plus ancienne) : leurs réponses y sont rattachées, puis ils
+    # sont supprimés. Chaque question restante reçoit son empreinte.
+    connection = op.get_bind()
+    rows = connection.execute(sa.text(
+        "SELECT id, technology_id, question_text, options, is_active FROM questions"
+    )).all()
+    kept = {}
+    updates = []
+    merges = []
+    for row in sorted(rows, key=lambda row: (not row.is_active, row.id)):
+        digest = question_content_hash(row.question_text, row.options)
+        key = (row.technology_id, digest)
+        if key in kept:
+            merges.append({"duplicate_id": row.id, "question_id": kept[key]})
+            continue
+        kept[key] = row.id
+        updates.append({"question_id": row.id, "content_hash": digest})
+
+    for start in range(0, len(merges), BATCH_SIZE):
+        batch = merges[start:start + BATCH_SIZE]
+        connection.execute(sa.text(
+            "UPDATE quiz_answers SET question_id = :question_id WHERE question_id = :duplicate_id"
+        ), batch)
+        connection.execute(sa.text("DELETE FROM questions WHERE id = :duplicate_id"), batch)
+
+    statement = sa.text("UPDATE questions SET content_hash = :content_hash WHERE id = :question_id")
+    for start in range(0, len(updates), BATCH_SIZE):
+        connection.execute(statement, updates[start:start + BATCH_SIZE])
+
+    op.alter_column('questions', 'content_hash', nullable=False)
+    op.create_index('ix_questions_content_hash', 'questions', ['technology_id', 'content_hash'], unique=True)
+
+
+def downgrade():
+    # Les doublons fusionnés par upgrade() ne sont pas restaurés
+    op.drop_index('ix_questions_content_hash', table_name='questions')
+    op.drop_column('questions', 'content_hash')
@@ -0,0 +1,83 @@
+"""One answer per question and quiz session
+
+Revision ID: 008_unique_quiz_answers
+Revises: 007_question_content_hash
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008_unique_quiz_answers'
+down_revision = '007_question_content_hash'
+branch_labels = None
+depends_on = None
+
+# Rollups (004) recalculés pour les utilisateurs dont une session terminée a changé
+ROLLUP_REBUILD_STATEMENTS = [
+    "DELETE FROM user_stats WHERE user_id = ANY(:user_ids)",
+    "DELETE FROM user_technology_stats WHERE user_id = ANY(:user_ids)",
+    "DELETE FROM user_daily_activity WHERE user_id = ANY(:user_ids)",
+    """
+    INSERT INTO user_stats (user_id, total_quizzes, score_sum, best_score, total_time_spent, last_completed_at)
+    SELECT user_id, count(id), sum(coalesce(score_percentage, 0)), max(coalesce(score_percentage, 0)),
+           sum(coalesce(time_spent_seconds, 0)), max(completed_at)
+    FROM quiz_sessions WHERE completed_at IS NOT NULL AND user_id = ANY(:user_ids)
+    GROUP BY user_id
+    """,
+    """
+    INSERT INTO user_technology_stats (user_id, technology_id, quiz_count, score_sum)
+    SELECT user_id, technology_id, count(id), sum(coalesce(score_percentage, 0))
+    FROM quiz_sessions WHERE completed_at IS NOT NULL AND user_id = ANY(:user_ids)
+    GROUP BY user_id, technology_id
+    """,
+    """
+    INSERT INTO user_daily_activity (user_id, day, quiz_count, score_sum)
+    SELECT user_id, CAST(completed_at AS DATE), count(id), sum(coalesce(score_percentage, 0))
+    FROM quiz_sessions WHERE completed_at IS NOT NULL AND user_id = ANY(:user_ids)
+    GROUP BY user_id, CAST(completed_at AS DATE)
+    """,
+]
+
+
+def upgrade():
+    # Seule la première réponse à une question compte; les sessions terminées concernées
+    # sont recalculées, puis les rollups de leurs utilisateurs
+    connection = op.get_bind()
+    session_ids = sorted({row.quiz_session_id for row in connection.execute(sa.text("""
+    DELETE FROM quiz_answers a
+    USING quiz_answers b
+    WHERE a.quiz_session_id = b.quiz_session_id
+      AND a.question_id = b.question_id
+      AND a.id > b.id
+    RETURNING a.quiz_session_id
+    """))})
+    if session_ids:
+        user_ids = sorted({row.user_id for row in connection.execute(sa.text("""
+        UPDATE quiz_sessions s
+        SET total_questions = totals.total,
+            correct_answers = totals.correct,
+            score_percentage = CASE WHEN totals.total > 0
+                                    THEN round(totals.correct * 100.0 / totals.total) ELSE 0 END
+        FROM (
+            SELECT quiz_session_id,
+                   count(*) AS total,
+                   count(*) FILTER (WHERE is_correct) AS correct
+            FROM quiz_answers
+            WHERE quiz_session_id = ANY(:session_ids)
+            GROUP BY quiz_session_id
+        ) totals
+        WHERE s.id = totals.quiz_session_id AND s.status = 'completed'
+        RETURNING s.user_id
+        """), {"session_ids": session_ids})})
+        if user_ids:
+            for statement in ROLLUP_REBUILD_STATEMENTS:
+                connection.execute(sa.text(statement), {"user_ids": user_ids})
+    op.create_unique_constraint(
+        'uq_quiz_answers_session_question', 'quiz_answers', ['quiz_session_id', 'question_id']
+    )
+
+
+def downgrade():
+    op.drop_constraint('uq_quiz_answers_session_question', 'quiz_answers', type_='unique')
@@ -2,15 +2,23 @@ from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from ...core.db import get_db
 from ...core.auth import (
-    authenticate_user, 
     create_access_token, 
-    get_password_hash,
     get_current_active_user,
+    get_current_principal,
+    token_claims,
+    principal_cache,
+    Principal,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
+from ...core.hashing import (
+    authenticate_user_async,
+    hash_password_async,
+    hashing_pool
+)
 from ...models.database_models import User
 from ...schemas import (
     Token, 
@@ -24,16 +32,24 @@ import logging
 router = APIRouter()
 logger = logging.getLogger("quiz_app.auth")
 
+def _save_user(db: Session, user: User) -> User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
 @router.post("/register", response_model=UserSchema, status_code=status.HTTP_201_CREATED)
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user: UserCreate, db: Session = Depends(get_db)):
     """Créer un nouveau compte utilisateur"""
     
     logger.info(f"Tentative de création de compte pour: {user.username}")
     
     # Vérifier si l'utilisateur existe déjà
-    existing_user = db.query(User).filter(
-        (User.username == user.username) | (User.email == user.email)
-    ).first()
+    existing_user = await run_in_threadpool(
+        lambda: db.query(User).filter(
+            (User.username == user.username) | (User.email == user.email)
+        ).first()
+    )
     
     if existing_user:
         if existing_user.username == user.username:
@@ -49,8 +65,8 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
                 detail="Cette adresse email est déjà utilisée"
             )
     
-    # Créer le nouvel utilisateur
-    hashed_password = get_password_hash(user.password)
+    # Créer le nouvel utilisateur (hachage dans le pool dédié)
+    hashed_password = await hash_password_async(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -60,20 +76,18 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
         is_admin=False
     )
     
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await run_in_threadpool(_save_user, db, db_user)
     
     logger.info(f"✅ Compte créé avec succès pour: {user.username} (ID: {db_user.id})")
     return db_user
 
 @router.post("/login", response_model=Token)
-def login_user(user_credentials: LoginRequest, db: Session = Depends(get_db)):
+async def login_user(user_credentials: LoginRequest, db: Session = Depends(get_db)):
     """Connexion utilisateur avec username/email et mot de passe"""
     
     logger.info(f"Tentative de connexion pour: {user_credentials.username}")
     
-    user = authenticate_user(db, user_credentials.username, user_credentials.password)
+    user = await authenticate_user_async(db, user_credentials.username, user_credentials.password)
     if not user:
         logger.warning(f"❌ Échec de connexion pour: {user_credentials.username}")
         raise HTTPException(
@@ -84,7 +98,7 @@ def login_user(user_credentials: LoginRequest, db: Session = Depends(get_db)):
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.username}, 
+        data=token_claims(user), 
         expires_delta=access_token_expires
     )
     
@@ -95,13 +109,13 @@ def login_user(user_credentials: LoginRequest, db: Session = Depends(get_db)):
     }
 
 @router.post("/login/form", response_model=Token)
-def login_for_access_token(
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
     """Connexion OAuth2 standard (pour la documentation FastAPI)"""
     
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user_async(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -111,7 +125,7 @@ def login_for_access_token(
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.username}, 
+        data=token_claims(user), 
         expires_delta=access_token_expires
     )
     
@@ -120,22 +134,11 @@ def login_for_access_token(
         "token_type": "bearer"
     }
 
-@router.get("/me")
+@router.get("/me", response_model=UserSchema)
 def read_current_user(current_user: User = Depends(get_current_active_user)):
     """Obtenir les informations de l'utilisateur connecté"""
     logger.info(f"Récupération du profil pour: {current_user.username}")
-    
-    # Sérialisation manuelle pour éviter les erreurs de validation Pydantic
-    return {
-        "id": current_user.id,
-        "username": current_user.username,
-        "email": current_user.email,
-        "full_name": current_user.full_name,
-        "is_active": current_user.is_active,
-        "is_admin": current_user.is_admin,
-        "created_at": str(current_user.created_at) if current_user.created_at else None,
-        "updated_at": str(current_user.updated_at) if current_user.updated_at else None
-    }
+    return current_user
 
 @router.get("/test-cors")
 def test_cors():
@@ -183,8 +186,13 @@ def debug_users(db: Session = Depends(get_db)):
     
     return result
 
+@router.get("/debug/hashing")
+def debug_hashing():
+    """Debug - Métriques du pool de hachage des mots de passe"""
+    return hashing_pool.stats()
+
 @router.put("/me", response_model=UserSchema)
-def update_current_user(
+async def update_current_user(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -195,10 +203,12 @@ def update_current_user(
     
     # Vérifier si l'email est déjà utilisé par un autre utilisateur
     if user_update.email and user_update.email != current_user.email:
-        existing_user = db.query(User).filter(
-            User.email == user_update.email,
-            User.id != current_user.id
-        ).first()
+        existing_user = await run_in_threadpool(
+            lambda: db.query(User).filter(
+                User.email == user_update.email,
+                User.id != current_user.id
+            ).first()
+        )
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -206,28 +216,29 @@ def update_current_user(
             )
     
     # Mettre à jour les champs
-    update_data = user_update.model_dump(exclude_unset=True)
+    update_data = user_update.dict(exclude_unset=True)
     
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = await hash_password_async(update_data.pop("password"))
     
     for field, value in update_data.items():
         setattr(current_user, field, value)
     
-    db.commit()
-    db.refresh(current_user)
+    await run_in_threadpool(_save_user, db, current_user)
+    # Le hook after_commit invalide déjà ce worker; explicite ici car le nom peut avoir changé
+    principal_cache.invalidate_user(current_user.id)
     
     logger.info(f"✅ Profil mis à jour pour: {current_user.username}")
     return current_user
 
 @router.post("/logout")
-def logout_user(current_user: User = Depends(get_current_active_user)):
+def logout_user(current_user: Principal = Depends(get_current_principal)):
     """Déconnexion utilisateur (côté client seulement)"""
     logger.info(f"Déconnexion pour: {current_user.username}")
     return {"message": "Déconnexion réussie"}
 
 @router.get("/validate-token")
-def validate_token(current_user: User = Depends(get_current_active_user)):
+def validate_token(current_user: Principal = Depends(get_current_principal)):
     """Valider un token JWT"""
     return {
         "valid": True,
@@ -1,14 +1,20 @@
-from typing import List
-from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException
+import hashlib
+from typing import List, Optional, Tuple
+from datetime import date, timedelta
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy import Date, cast, func, desc, literal_column, select
 
-from ...core.db import get_db
-from ...core.auth import get_current_active_user
-from ...models.database_models import User, QuizSession, Technology, Question
+from ...core.db import get_read_db, run_db
+from ...core.config import settings
+from ...core.pagination import keyset_page, set_next_cursor
+from ...core.auth import get_current_active_user, get_current_principal, Principal
+from ...models.database_models import (
+    User, QuizSession, Technology, UserStats, UserTechnologyStats, UserDailyActivity
+)
 from ...schemas import (
-    UserDashboard,
+    User as UserSchema,
     UserStatistics,
     ProgressData,
     QuizSessionSummary
@@ -17,207 +23,232 @@ from ...schemas import (
 router = APIRouter()
 
 @router.get("/me")
-def get_user_dashboard(
+async def get_user_dashboard(
+    request: Request,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db = Depends(get_read_db)
 ):
     """Obtenir le dashboard complet de l'utilisateur connecté"""
-    
-    # Récupérer les statistiques générales
-    statistics = get_user_statistics(current_user.id, db)
-    
-    # Récupérer les données de progression
-    progress_data = get_progress_data(current_user.id, db)
-    
-    # Récupérer l'historique complet des quiz
-    quiz_history = get_quiz_history(current_user.id, db, limit=50)
-    
-    return {
-        "user": {
-            "id": current_user.id,
-            "username": current_user.username,
-            "email": current_user.email,
-            "full_name": current_user.full_name,
-            "is_active": current_user.is_active,
-            "is_admin": current_user.is_admin,
-            "created_at": current_user.created_at.isoformat() if current_user.created_at else None,
-            "updated_at": current_user.updated_at.isoformat() if current_user.updated_at else None
-        },
-        "statistics": statistics.dict(),
-        "progress_data": progress_data.dict(),
-        "quiz_history": [q.dict() for q in quiz_history]
-    }
+    return await run_db(db, build_dashboard_response, current_user, request.headers.get("if-none-match"))
 
 @router.get("/stats", response_model=UserStatistics)
-def get_user_stats(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+async def get_user_stats(
+    current_user: Principal = Depends(get_current_principal),
+    db = Depends(get_read_db)
 ):
     """Obtenir les statistiques de l'utilisateur"""
-    return get_user_statistics(current_user.id, db)
+    return await run_db(db, lambda session: get_user_statistics(current_user.id, session))
 
 @router.get("/history", response_model=List[QuizSessionSummary])
-def get_user_quiz_history(
-    limit: int = 20,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+async def get_user_quiz_history(
+    response: Response,
+    limit: int = Query(20, ge=1, le=settings.HISTORY_PAGE_MAX_SIZE),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_principal),
+    db = Depends(get_read_db)
 ):
-    """Obtenir l'historique des quiz de l'utilisateur"""
-    return get_quiz_history(current_user.id, db, limit)
+    """Obtenir l'historique des quiz de l'utilisateur, page par page (curseur dans X-Next-Cursor)"""
+    history, next_cursor = await run_db(
+        db, lambda session: get_quiz_history(current_user.id, session, limit, cursor)
+    )
+    set_next_cursor(response, next_cursor)
+    return history
 
 @router.get("/progress", response_model=ProgressData)
-def get_user_progress(
-    days: int = 30,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+async def get_user_progress(
+    days: int = Query(30, ge=1, le=settings.DASHBOARD_PROGRESS_MAX_DAYS),
+    granularity: str = Query("day", regex="^(day|week|month)$"),
+    current_user: Principal = Depends(get_current_principal),
+    db = Depends(get_read_db)
 ):
-    """Obtenir les données de progression sur les X derniers jours"""
-    return get_progress_data(current_user.id, db, days)
+    """Obtenir les données de progression sur les X derniers jours (par jour, semaine ou mois)"""
+    return await run_db(db, lambda session: get_progress_data(current_user.id, session, days, granularity))
 
 # Fonctions utilitaires
 
-def get_user_statistics(user_id: int, db: Session) -> UserStatistics:
-    """Calculer les statistiques d'un utilisateur"""
-    
-    # Sessions terminées avec technologie
-    completed_sessions = db.query(QuizSession).join(Technology).filter(
-        QuizSession.user_id == user_id,
-        QuizSession.completed_at.isnot(None)
-    ).all()
-    
-    if not completed_sessions:
-        return UserStatistics(
-            total_quizzes=0,
-            average_score=0.0,
-            best_score=0,
-            total_time_spent=0,
-            quizzes_by_technology={},
-            scores_by_technology={},
-            recent_activity=[]
-        )
-    
-    # Statistiques de base
-    total_quizzes = len(completed_sessions)
-    scores = [session.score_percentage for session in completed_sessions]
-    average_score = sum(scores) / len(scores)
-    best_score = max(scores)
-    total_time_spent = sum(session.time_spent_seconds or 0 for session in completed_sessions)
-    
-    # Statistiques par technologie
-    tech_stats = {}
-    tech_scores = {}
-    
-    for session in completed_sessions:
-        tech_name = session.technology.name
-        if tech_name not in tech_stats:
-            tech_stats[tech_name] = 0
-            tech_scores[tech_name] = []
-        tech_stats[tech_name] += 1
-        tech_scores[tech_name].append(session.score_percentage)
-    
-    # Moyenne des scores par technologie
-    scores_by_technology = {
-        tech: sum(scores) / len(scores) 
-        for tech, scores in tech_scores.items()
+def build_dashboard_response(db: Session, current_user: User, if_none_match: Optional[str]) -> Response:
+    """Dashboard complet, ou 304 si l'ETag envoyé par le client est toujours valide"""
+    
+    # Une lecture par clé primaire suffit pour savoir si le dashboard a changé
+    totals, today = _user_totals_and_day(current_user.id, db)
+    etag = dashboard_etag(current_user, totals, today)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    # Historique récupéré une seule fois : ses 5 premières lignes forment l'activité récente
+    history = _quiz_history_rows(current_user.id, db, limit=50)
+    
+    payload = {
+        "user": UserSchema.from_orm(current_user).dict(),
+        "statistics": statistics_payload(current_user.id, db, totals, history[:5]),
+        "progress_data": progress_payload(current_user.id, db),
+        "quiz_history": history
     }
-    
-    # Activité récente (5 derniers quiz)
-    recent_sessions = sorted(completed_sessions, key=lambda x: x.completed_at, reverse=True)[:5]
-    recent_activity = [
-        QuizSessionSummary(
-            id=session.id,
-            technology_name=session.technology.name,
-            score_percentage=session.score_percentage,
-            total_questions=session.total_questions,
-            correct_answers=session.correct_answers,
-            started_at=session.started_at,
-            completed_at=session.completed_at,
-            time_spent_seconds=session.time_spent_seconds or 0
-        )
-        for session in recent_sessions
-    ]
-    
-    return UserStatistics(
-        total_quizzes=total_quizzes,
-        average_score=round(average_score, 1),
-        best_score=best_score,
-        total_time_spent=total_time_spent,
-        quizzes_by_technology=tech_stats,
-        scores_by_technology={k: round(v, 1) for k, v in scores_by_technology.items()},
-        recent_activity=recent_activity
-    )
+    # Uniquement des types natifs (int, float, str, datetime) : orjson sérialise directement
+    return ORJSONResponse(content=payload, headers=headers)
 
-def get_progress_data(user_id: int, db: Session, days: int = 30) -> ProgressData:
-    """Obtenir les données de progression sur les X derniers jours"""
-    
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
-    
-    # Sessions dans la période
-    sessions = db.query(QuizSession).filter(
+def _session_summaries_query(user_id: int, db: Session):
+    """Colonnes des sessions terminées avec le nom de la technologie, sans charger les objets ORM"""
+    return db.query(
+        QuizSession.id,
+        Technology.name.label("technology_name"),
+        QuizSession.score_percentage,
+        QuizSession.total_questions,
+        QuizSession.correct_answers,
+        QuizSession.started_at,
+        QuizSession.completed_at,
+        func.coalesce(QuizSession.time_spent_seconds, 0).label("time_spent_seconds")
+    ).join(Technology, QuizSession.technology_id == Technology.id).filter(
         QuizSession.user_id == user_id,
-        QuizSession.completed_at >= start_date,
         QuizSession.completed_at.isnot(None)
-    ).order_by(QuizSession.completed_at).all()
-    
-    # Grouper par date
-    daily_data = {}
-    current_date = start_date.date()
-    
-    # Initialiser toutes les dates avec des valeurs vides
-    while current_date <= end_date.date():
-        daily_data[current_date.strftime('%Y-%m-%d')] = {
-            'scores': [],
-            'count': 0
+    )
+
+def dashboard_etag(user: User, totals: Optional[UserStats], today: date) -> str:
+    """ETag faible du dashboard : change à chaque quiz terminé, profil modifié ou nouveau jour.
+
+    `today` est la date de la base, celle qui borne les périodes de progress_payload.
+    """
+    key = ":".join(str(part) for part in (
+        user.id,
+        user.updated_at,
+        totals.total_quizzes if totals else 0,
+        totals.last_completed_at if totals else None,
+        today
+    ))
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # Comparaison faible : W/"x" et "x" désignent la même représentation
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return "*" in candidates or any(
+        (candidate[2:] if candidate.startswith("W/") else candidate) == opaque
+        for candidate in candidates
+    )
+
+def _user_totals(user_id: int, db: Session) -> Optional[UserStats]:
+    return db.query(UserStats).filter(UserStats.user_id == user_id).first()
+
+def _user_totals_and_day(user_id: int, db: Session) -> Tuple[Optional[UserStats], date]:
+    """Totaux de l'utilisateur et date courante de la base, en une requête"""
+    today = select(func.current_date().label("today")).subquery("today")
+    row = db.query(today.c.today, UserStats).select_from(today).outerjoin(
+        UserStats, UserStats.user_id == user_id
+    ).one()
+    return row.UserStats, row.today
+
+def _quiz_history_rows(user_id: int, db: Session, limit: int) -> List[dict]:
+    rows = _session_summaries_query(user_id, db).order_by(
+        desc(QuizSession.completed_at)
+    ).limit(limit).all()
+    return [row._asdict() for row in rows]
+
+def statistics_payload(
+    user_id: int,
+    db: Session,
+    totals: Optional[UserStats],
+    recent_activity: List[dict]
+) -> dict:
+    """Statistiques sous forme de dict, à partir des totaux et de l'activité récente déjà lus"""
+    
+    if not totals or not totals.total_quizzes:
+        return {
+            "total_quizzes": 0,
+            "average_score": 0.0,
+            "best_score": 0,
+            "total_time_spent": 0,
+            "quizzes_by_technology": {},
+            "scores_by_technology": {},
+            "recent_activity": []
         }
-        current_date += timedelta(days=1)
-    
-    # Remplir avec les vraies données
-    for session in sessions:
-        date_str = session.completed_at.date().strftime('%Y-%m-%d')
-        if date_str in daily_data:
-            daily_data[date_str]['scores'].append(session.score_percentage)
-            daily_data[date_str]['count'] += 1
-    
-    # Préparer les listes pour le graphique
-    dates = sorted(daily_data.keys())
-    scores = []
-    quiz_counts = []
     
-    for date in dates:
-        data = daily_data[date]
-        if data['scores']:
-            avg_score = sum(data['scores']) / len(data['scores'])
-        else:
-            avg_score = 0.0
-        
-        scores.append(round(avg_score, 1))
-        quiz_counts.append(data['count'])
+    # Statistiques par technologie : une ligne par technologie pratiquée
+    tech_rows = db.query(
+        Technology.name,
+        UserTechnologyStats.quiz_count,
+        UserTechnologyStats.score_sum
+    ).join(Technology, UserTechnologyStats.technology_id == Technology.id).filter(
+        UserTechnologyStats.user_id == user_id,
+        UserTechnologyStats.quiz_count > 0
+    ).all()
     
-    return ProgressData(
-        dates=dates,
-        scores=scores,
-        quiz_counts=quiz_counts
-    )
+    return {
+        "total_quizzes": totals.total_quizzes,
+        "average_score": round(totals.score_sum / totals.total_quizzes, 1),
+        "best_score": totals.best_score,
+        "total_time_spent": totals.total_time_spent,
+        "quizzes_by_technology": {row.name: row.quiz_count for row in tech_rows},
+        "scores_by_technology": {row.name: round(row.score_sum / row.quiz_count, 1) for row in tech_rows},
+        "recent_activity": recent_activity
+    }
 
-def get_quiz_history(user_id: int, db: Session, limit: int = 20) -> List[QuizSessionSummary]:
-    """Obtenir l'historique des quiz avec détails"""
-    
-    sessions = db.query(QuizSession).join(Technology).filter(
-        QuizSession.user_id == user_id,
-        QuizSession.completed_at.isnot(None)
-    ).order_by(desc(QuizSession.completed_at)).limit(limit).all()
+def get_user_statistics(user_id: int, db: Session) -> UserStatistics:
+    """Calculer les statistiques d'un utilisateur depuis les rollups (lectures par clé primaire)"""
+    totals = _user_totals(user_id, db)
+    recent_activity = _quiz_history_rows(user_id, db, limit=5) if totals and totals.total_quizzes else []
+    return UserStatistics(**statistics_payload(user_id, db, totals, recent_activity))
+
+PROGRESS_GRANULARITIES = ("day", "week", "month")
+
+def progress_payload(user_id: int, db: Session, days: int = 30, granularity: str = "day") -> dict:
+    """Données de progression sur les X derniers jours, par jour, semaine ou mois"""
+    
+    if granularity not in PROGRESS_GRANULARITIES:
+        raise ValueError(f"Granularité inconnue: {granularity}")
+    
+    # Bornes calculées par la base : toutes les périodes entre le début de la fenêtre et maintenant
+    first_bucket = func.date_trunc(granularity, func.now() - timedelta(days=days))
+    last_bucket = func.date_trunc(granularity, func.now())
+    step = literal_column(f"interval '1 {granularity}'")
+    
+    buckets = select(
+        func.generate_series(first_bucket, last_bucket, step).label("bucket")
+    ).subquery("buckets")
+    
+    # Moyenne et nombre de quiz par période, agrégés depuis le rollup journalier
+    activity_bucket = func.date_trunc(granularity, UserDailyActivity.day)
+    stats = select(
+        activity_bucket.label("bucket"),
+        (func.sum(UserDailyActivity.score_sum) * 1.0 / func.sum(UserDailyActivity.quiz_count)).label("average_score"),
+        func.sum(UserDailyActivity.quiz_count).label("quiz_count")
+    ).where(
+        UserDailyActivity.user_id == user_id,
+        UserDailyActivity.day >= cast(first_bucket, Date),
+        UserDailyActivity.quiz_count > 0
+    ).group_by(activity_bucket).subquery("stats")
+    
+    # Les périodes sans quiz sont complétées par la jointure externe
+    rows = db.execute(
+        select(
+            buckets.c.bucket,
+            func.coalesce(stats.c.average_score, 0).label("average_score"),
+            func.coalesce(stats.c.quiz_count, 0).label("quiz_count")
+        ).select_from(
+            buckets.outerjoin(stats, stats.c.bucket == buckets.c.bucket)
+        ).order_by(buckets.c.bucket)
+    ).all()
     
-    return [
-        QuizSessionSummary(
-            id=session.id,
-            technology_name=session.technology.name,
-            score_percentage=session.score_percentage,
-            total_questions=session.total_questions,
-            correct_answers=session.correct_answers,
-            started_at=session.started_at,
-            completed_at=session.completed_at,
-            time_spent_seconds=session.time_spent_seconds or 0
-        )
-        for session in sessions
-    ]
\ No newline at end of file
+    return {
+        "dates": [row.bucket.strftime('%Y-%m-%d') for row in rows],
+        "scores": [round(float(row.average_score), 1) for row in rows],
+        "quiz_counts": [row.quiz_count for row in rows]
+    }
+
+def get_progress_data(user_id: int, db: Session, days: int = 30, granularity: str = "day") -> ProgressData:
+    """Obtenir les données de progression sur les X derniers jours"""
+    return ProgressData(**progress_payload(user_id, db, days, granularity))
+
+def get_quiz_history(
+    user_id: int,
+    db: Session,
+    limit: int = 20,
+    cursor: Optional[str] = None
+) -> Tuple[List[QuizSessionSummary], Optional[str]]:
+    """Obtenir une page de l'historique des quiz avec détails, et le curseur de la suivante"""
+    rows, next_cursor = keyset_page(
+        _session_summaries_query(user_id, db), QuizSession.completed_at, QuizSession.id, cursor, limit
+    )
+    return [QuizSessionSummary(**row._asdict()) for row in rows], next_cursor
\ No newline at end of file
@@ -0,0 +1,76 @@
+import threading
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .bank_version import bank_version
+from ..models.database_models import Question
+
+MAX_CACHED_ANSWERS = 100_000
+
+
+class AnswerKey(NamedTuple):
+    """Bonne réponse d'une question et ce qu'il faut pour vérifier qu'elle est jouable"""
+    correct_answer: str
+    technology_id: int
+    is_active: bool
+
+
+class AnswerKeyCache:
+    """Cache question_id -> AnswerKey pour corriger les quiz sans relire la table.
+
+    Le cache est vidé dès que la version de la banque de questions change : une
+    modification faite par un autre worker ou par un import est vue en quelques secondes.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_ANSWERS):
+        self._answers: Dict[int, AnswerKey] = {}
+        self._max_entries = max_entries
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def get_many(self, db: Session, question_ids: Iterable[int]) -> Dict[int, AnswerKey]:
+        """Bonnes réponses des questions demandées (une seule requête pour les absentes)"""
+        wanted = set(question_ids)
+        version = bank_version.get(db)
+        with self._lock:
+            if version != self._version:
+                self._answers.clear()
+                self._version = version
+            found = {qid: self._answers[qid] for qid in wanted if qid in self._answers}
+
+        missing = wanted - found.keys()
+        if missing:
+            rows = db.query(
+                Question.id, Question.correct_answer, Question.technology_id, Question.is_active
+            ).filter(Question.id.in_(missing)).all()
+            loaded = {
+                row.id: AnswerKey(row.correct_answer, row.technology_id, bool(row.is_active))
+                for row in rows
+            }
+            with self._lock:
+                if len(self._answers) + len(loaded) > self._max_entries:
+                    self._answers.clear()
+                self._answers.update(loaded)
+            found.update(loaded)
+
+        return found
+
+    def invalidate(self, question_id: int = None):
+        """Oublier une question (ou tout le cache)"""
+        with self._lock:
+            if question_id is None:
+                self._answers.clear()
+            else:
+                self._answers.pop(question_id, None)
+
+
+answer_key_cache = AnswerKeyCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_changed_answers(session, flush_context):
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Question) and obj.id is not None:
+            answer_key_cache.invalidate(obj.id)
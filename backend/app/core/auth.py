@@ -1,13 +1,17 @@
 import os
+import threading
+import time
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Dict, Optional, Set, Tuple
 import jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
-from .db import get_db
+from .db import get_db, SessionLocal
+from .config import settings
+from . import password_policy
 from ..models.database_models import User
 
 # JWT Configuration
@@ -15,9 +19,6 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))  # 24h default
 
-# Bcrypt configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=12)
-
 # Security scheme for FastAPI
 security = HTTPBearer()
 
@@ -30,13 +31,103 @@ class AuthError(HTTPException):
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+class Principal:
+    """Authenticated user as needed by most routes (no ORM instance, no DB session)"""
+    __slots__ = ("id", "username", "email", "is_active", "is_admin")
+
+    def __init__(self, id: int, username: str, email: str, is_active: bool, is_admin: bool):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.is_active = is_active
+        self.is_admin = is_admin
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(user.id, user.username, user.email, bool(user.is_active), bool(user.is_admin))
+
+# Cache key: (token subject, token uid). uid is None for tokens issued before it existed.
+PrincipalKey = Tuple[str, Optional[int]]
+
+def principal_key(payload: dict) -> PrincipalKey:
+    return payload["sub"], payload.get("uid")
+
+def principal_matches(key: PrincipalKey, principal: Principal) -> bool:
+    """A principal only answers for the user its token designates (a username can be reassigned)"""
+    subject, user_id = key
+    if user_id is not None:
+        return principal.id == user_id
+    return principal.username == subject
+
+class PrincipalCache:
+    """Short-lived (token subject, uid) -> Principal cache"""
+
+    def __init__(self, ttl_seconds: int = 30):
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[PrincipalKey, Tuple[Principal, float]] = {}
+        self._keys_by_user: Dict[int, Set[PrincipalKey]] = {}
+
+    def get(self, key: PrincipalKey) -> Optional[Principal]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        principal, expires_at = entry
+        if time.monotonic() > expires_at or not principal_matches(key, principal):
+            self.invalidate_key(key)
+            return None
+        return principal
+
+    def put(self, key: PrincipalKey, principal: Principal):
+        with self._lock:
+            self._entries[key] = (principal, time.monotonic() + self._ttl_seconds)
+            self._keys_by_user.setdefault(principal.id, set()).add(key)
+
+    def invalidate_key(self, key: PrincipalKey):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._keys_by_user.get(entry[0].id, set()).discard(key)
+
+    def invalidate_user(self, user_id: int):
+        """Forget every cached key of a user (username/role/active change, deletion...)"""
+        with self._lock:
+            for key in self._keys_by_user.pop(user_id, set()):
+                self._entries.pop(key, None)
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault("changed_user_ids", set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            changed.add(obj.id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop("changed_user_ids", ()):
+        principal_cache.invalidate_user(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop("changed_user_ids", None)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_policy.get_context().verify(plain_password, hashed_password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password; also return a new hash if the stored one is below the current policy"""
+    return password_policy.get_context().verify_and_update(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
-    return pwd_context.hash(password)
+    return password_policy.get_context().hash(password)
+
+def token_claims(user: User) -> dict:
+    """Claims identifying a user: username as subject plus the user id"""
+    return {"sub": user.username, "uid": user.id}
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT token"""
@@ -61,7 +152,7 @@ def verify_token(token: str) -> dict:
         return payload
     except jwt.ExpiredSignatureError:
         raise AuthError("Token expired")
-    except jwt.JWTError:
+    except jwt.InvalidTokenError:
         raise AuthError("Invalid token")
 
 def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
@@ -72,10 +163,15 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
     
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = verify_and_update_password(password, user.hashed_password)
+    if not verified:
         return None
     if not user.is_active:
         return None
+    if new_hash:
+        # Mise à niveau transparente vers la politique de hachage courante
+        user.hashed_password = new_hash
+        db.commit()
     
     return user
 
@@ -91,7 +187,11 @@ def get_current_user(
     if username is None:
         raise AuthError("Invalid token")
     
-    user = db.query(User).filter(User.username == username).first()
+    user_id = payload.get("uid")
+    if user_id is not None:
+        user = db.query(User).filter(User.id == user_id).first()
+    else:
+        user = db.query(User).filter(User.username == username).first()
     if user is None:
         raise AuthError("User not found")
     
@@ -106,6 +206,36 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
         raise AuthError("Inactive user")
     return current_user
 
+def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Principal:
+    """Get the current principal, from cache when possible (no DB session checkout on hit)"""
+    payload = verify_token(credentials.credentials)
+    key = principal_key(payload)
+    subject, user_id = key
+
+    principal = principal_cache.get(key)
+    if principal is None:
+        db = SessionLocal()
+        try:
+            query = db.query(User.id, User.username, User.email, User.is_active, User.is_admin)
+            if user_id is not None:
+                row = query.filter(User.id == user_id).first()
+            else:
+                row = query.filter(User.username == subject).first()
+        finally:
+            db.close()
+
+        if row is None:
+            raise AuthError("User not found")
+        principal = Principal(row.id, row.username, row.email, bool(row.is_active), bool(row.is_admin))
+        principal_cache.put(key, principal)
+
+    if not principal.is_active:
+        raise AuthError("Inactive user")
+
+    return principal
+
 def get_current_admin_user(current_user: User = Depends(get_current_user)) -> User:
     """Get current user if admin"""
     if not current_user.is_admin:
@@ -0,0 +1,46 @@
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from .config import settings
+from ..models.database_models import QuestionBankVersion
+
+
+def current_bank_version(db: Session) -> int:
+    version = db.query(QuestionBankVersion.version).filter(QuestionBankVersion.id == 1).scalar()
+    return version or 0
+
+
+class BankVersionTracker:
+    """Version de la banque de questions, relue au plus une fois toutes les `check_seconds`.
+
+    Le compteur est incrémenté par les triggers Postgres à chaque écriture sur les
+    technologies, catégories et questions, y compris les INSERT Core des imports lancés
+    dans un autre processus : les caches en mémoire s'y réfèrent pour savoir s'ils sont à jour.
+    """
+
+    def __init__(self, check_seconds: float = 2):
+        self._check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._checked_at: Optional[float] = None
+
+    def get(self, db: Session) -> int:
+        checked_at = self._checked_at
+        if checked_at is None or time.monotonic() - checked_at >= self._check_seconds:
+            version = current_bank_version(db)
+            with self._lock:
+                self._version = version
+                self._checked_at = time.monotonic()
+            return version
+        return self._version
+
+    def expire(self):
+        """Forcer une relecture au prochain accès (écriture faite par ce processus)"""
+        with self._lock:
+            self._checked_at = None
+
+
+bank_version = BankVersionTracker(settings.QUESTION_BANK_VERSION_CHECK_SECONDS)
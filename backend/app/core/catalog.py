@@ -0,0 +1,149 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .bank_version import bank_version, current_bank_version
+from .config import settings
+from ..models.database_models import Technology, Category
+
+logger = logging.getLogger("quiz_app.catalog")
+
+
+CatalogMaps = Tuple[Dict[str, int], Dict[Tuple[str, str], int], Dict[str, int]]
+
+
+def load_catalog(db: Session) -> CatalogMaps:
+    """Charger tout le catalogue en une seule requête.
+
+    Retourne (technologie -> id, (technologie, catégorie) -> id, catégorie -> id)
+    """
+    rows = db.query(
+        Technology.id.label("technology_id"),
+        Technology.name.label("technology_name"),
+        Category.id.label("category_id"),
+        Category.name.label("category_name")
+    ).outerjoin(Category, Category.technology_id == Technology.id).order_by(Category.id).all()
+
+    technologies = {}
+    categories = {}
+    categories_by_name = {}
+    for row in rows:
+        technologies[row.technology_name] = row.technology_id
+        if row.category_id is not None:
+            categories[(row.technology_name, row.category_name)] = row.category_id
+            # Sans technologie, on garde la première catégorie portant ce nom
+            categories_by_name.setdefault(row.category_name, row.category_id)
+
+    return technologies, categories, categories_by_name
+
+
+class UnknownFilter(HTTPException):
+    """Filtre de technologie ou de catégorie inconnu : 404 plutôt qu'un filtre ignoré"""
+
+    def __init__(self, detail: str):
+        super().__init__(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+
+def resolve_filters(
+    maps: CatalogMaps,
+    technology: Optional[str],
+    category: Optional[str]
+) -> Tuple[Optional[int], Optional[int]]:
+    """Ids (technologie, catégorie) pour des filtres de questions; None si absent.
+
+    Lève UnknownFilter si un nom donné n'existe pas.
+    """
+    technologies, categories, categories_by_name = maps
+
+    technology_id = None
+    if technology:
+        technology_id = technologies.get(technology)
+        if technology_id is None:
+            raise UnknownFilter(f"Technologie non trouvée: {technology}")
+    category_id = None
+    if category:
+        if technology_id is not None:
+            category_id = categories.get((technology, category))
+        else:
+            category_id = categories_by_name.get(category)
+        if category_id is None:
+            raise UnknownFilter(f"Catégorie non trouvée: {category}")
+
+    return technology_id, category_id
+
+
+class CatalogCache:
+    """Résolution nom -> id des technologies et catégories, gardée en mémoire.
+
+    Rechargée après `ttl_seconds` ou dès que la version de la banque de questions change
+    (technologie importée par un autre processus, par exemple).
+    """
+
+    def __init__(self, ttl_seconds: int = 60):
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._maps: CatalogMaps = ({}, {}, {})
+        self._loaded_at: Optional[float] = None
+        self._version: Optional[int] = None
+
+    def _load(self, db: Session):
+        version = current_bank_version(db)
+        maps = load_catalog(db)
+
+        with self._lock:
+            self._maps = maps
+            self._loaded_at = time.monotonic()
+            self._version = version
+
+        logger.info(f"📚 Catalogue chargé: {len(maps[0])} technologies, {len(maps[1])} catégories")
+
+    def _ensure_loaded(self, db: Session):
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > self._ttl_seconds \
+                or bank_version.get(db) != self._version:
+            self._load(db)
+
+    def technology_id(self, db: Session, name: str) -> Optional[int]:
+        """Id d'une technologie à partir de son nom"""
+        self._ensure_loaded(db)
+        return self._maps[0].get(name)
+
+    def resolve(
+        self,
+        db: Session,
+        technology: Optional[str] = None,
+        category: Optional[str] = None
+    ) -> Tuple[Optional[int], Optional[int]]:
+        """Résoudre les filtres de questions (voir `resolve_filters`)"""
+        if not technology and not category:
+            return None, None
+
+        self._ensure_loaded(db)
+        return resolve_filters(self._maps, technology, category)
+
+    def invalidate(self):
+        """Forcer le rechargement au prochain accès"""
+        with self._lock:
+            self._loaded_at = None
+
+
+catalog_cache = CatalogCache(settings.CATALOG_CACHE_TTL_SECONDS)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_catalog_write(session):
+    if session.info.pop("catalog_changed", False):
+        catalog_cache.invalidate()
+
+
+@event.listens_for(Session, "after_flush")
+def _detect_catalog_write(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, (Technology, Category)):
+            session.info["catalog_changed"] = True
+            return
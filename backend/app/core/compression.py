@@ -0,0 +1,149 @@
+import zlib
+from typing import Callable, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Types de contenu qui gagnent à être compressés (les images matricielles le sont déjà)
+COMPRESSIBLE_TYPES = ("application/json", "text/", "image/svg+xml", "application/javascript")
+
+# Réponses sans corps ou dont le corps ne peut pas être réencodé (plage d'octets)
+UNCOMPRESSED_STATUSES = {204, 206, 304}
+
+
+def brotli_module():
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Encodages acceptés par le client (q=0 exclut l'encodage)"""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        encoding, _, params = item.strip().partition(";")
+        quality = params.strip().lower()
+        if quality.startswith("q=") and quality[2:].strip() in ("0", "0.0", "0.00", "0.000"):
+            continue
+        accepted.add(encoding.strip().lower())
+    return accepted
+
+
+class CompressionMiddleware:
+    """Compression Brotli (si le module est installé) ou gzip des réponses de l'API.
+
+    Seuls les types texte/JSON d'au moins `minimum_size` octets sont compressés. Les réponses
+    déjà encodées (SVG précompressés de /static/images), les plages d'octets et les réponses
+    marquées `no-transform` passent telles quelles.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6,
+                 brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.brotli = brotli_module()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if self.brotli is not None and "br" in accepted:
+            encoding = "br"
+        elif "gzip" in accepted:
+            encoding = "gzip"
+        else:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(send, encoding, self))
+
+    def compressor(self, encoding: str) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+        """(compresser un bloc, terminer le flux) pour l'encodage choisi"""
+        if encoding == "br":
+            compressor = self.brotli.Compressor(mode=self.brotli.MODE_TEXT, quality=self.brotli_quality)
+            return compressor.process, compressor.finish
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return compressor.compress, compressor.flush
+
+
+class _CompressingSend:
+    """`send` d'une réponse : l'en-tête est retenu jusqu'au premier bloc du corps"""
+
+    def __init__(self, send: Send, encoding: str, middleware: CompressionMiddleware):
+        self.send = send
+        self.encoding = encoding
+        self.middleware = middleware
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.process: Optional[Callable[[bytes], bytes]] = None
+        self.finish: Optional[Callable[[], bytes]] = None
+
+    def _compressible(self, message: Message) -> bool:
+        headers = Headers(raw=message["headers"])
+        if message["status"] in UNCOMPRESSED_STATUSES or "content-encoding" in headers:
+            return False
+        if "no-transform" in headers.get("cache-control", "").lower():
+            return False
+        content_length = headers.get("content-length")
+        if content_length is not None and int(content_length) < self.middleware.minimum_size:
+            return False
+        return headers.get("content-type", "").lower().startswith(COMPRESSIBLE_TYPES)
+
+    async def _flush_start(self):
+        start, self.start = self.start, None
+        await self.send(start)
+
+    async def __call__(self, message: Message) -> None:
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            if self._compressible(message):
+                self.start = message
+            else:
+                self.passthrough = True
+                await self.send(message)
+            return
+
+        if message_type != "http.response.body":
+            # Envoi zéro-copie d'un fichier : impossible à compresser au vol
+            self.passthrough = True
+            await self._flush_start()
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.process is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self._flush_start()
+                await self.send(message)
+                return
+
+            self.process, self.finish = self.middleware.compressor(self.encoding)
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            vary = {token.strip().lower() for token in headers.get("vary", "").split(",")}
+            if "accept-encoding" not in vary and "*" not in vary:
+                headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # Les octets envoyés diffèrent de ceux décrits par une ETag forte
+                headers["ETag"] = "W/" + etag
+            body = self.process(body) + (b"" if more_body else self.finish())
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(body))
+            await self._flush_start()
+        else:
+            body = self.process(body) + (b"" if more_body else self.finish())
+
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
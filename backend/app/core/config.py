@@ -9,18 +9,83 @@ class Settings(BaseSettings):
     POSTGRES_PORT: str
     POSTGRES_DB: str
     
+    # Connection pool settings (DB_POOL_MODE=null + DB_PGBOUNCER=true derrière PgBouncer en mode transaction)
+    DB_POOL_MODE: str = "queue"  # queue, null
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_PGBOUNCER: bool = False
+    
     # JWT settings
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    
+    # Password hashing pool (0 = un processus par cœur)
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    
+    # Password hashing policy (coût mesuré au démarrage si non fixé)
+    PASSWORD_HASH_SCHEME: str = "bcrypt"  # bcrypt, argon2
+    PASSWORD_HASH_TARGET_MS: int = 250
+    PASSWORD_BCRYPT_ROUNDS: Optional[int] = None
+    PASSWORD_ARGON2_TIME_COST: Optional[int] = None
+    PASSWORD_ARGON2_MEMORY_KB: int = 65536
+    PASSWORD_ARGON2_PARALLELISM: int = 2
     
     # Application settings
     LOG_LEVEL: str = "INFO"
     ENVIRONMENT: str = "development"
     
+    # Redis settings (optionnel)
+    REDIS_URL: Optional[str] = None
+    
+    # Question sampling settings
+    QUESTION_SAMPLER_BACKEND: str = "memory"  # memory, redis
+    QUESTION_INDEX_REFRESH_SECONDS: int = 300
+    
+    # Catalog cache settings
+    CATALOG_CACHE_TTL_SECONDS: int = 60
+    
+    # Question snapshot settings (lectures servies depuis la mémoire)
+    QUESTION_SNAPSHOT_ENABLED: bool = False
+    QUESTION_SNAPSHOT_POLL_SECONDS: int = 5
+    # Relecture du compteur de version qui valide les caches (bonnes réponses, tirage, catalogue)
+    QUESTION_BANK_VERSION_CHECK_SECONDS: float = 2
+    
+    # Nombre maximal de réponses par lot (POST /quiz/{id}/answers)
+    QUIZ_ANSWERS_MAX_BATCH: int = 100
+    
+    # Dashboard settings (fenêtre de /dashboard/progress, taille max des pages d'historique)
+    DASHBOARD_PROGRESS_MAX_DAYS: int = 1825
+    HISTORY_PAGE_MAX_SIZE: int = 100
+    
+    # Moteur asynchrone (asyncpg) pour les routes de lecture
+    ASYNC_DB_ENABLED: bool = False
+    
+    # Images des questions (un fichier par contenu distinct, voir core/image_store.py)
+    IMAGES_DIR: str = "/app/static/images"
+    IMAGE_IMPORT_WORKERS: int = 8
+    # Variantes redimensionnées WebP/AVIF (0 = un processus par cœur; nécessite Pillow)
+    IMAGE_VARIANTS_ENABLED: bool = True
+    IMAGE_VARIANT_WORKERS: int = 0
+    IMAGE_VARIANT_FORMATS: str = "webp,avif"
+    
+    # Compression des réponses (Brotli si installé, sinon gzip) au-delà de ce nombre d'octets
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    GZIP_COMPRESSION_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+    
     @property
     def DATABASE_URL(self) -> str:
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
     
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        return f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
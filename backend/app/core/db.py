@@ -1,21 +1,29 @@
+from typing import Callable, Union
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
+from starlette.concurrency import run_in_threadpool
 
 from .config import settings
+from .pool import engine_options
 
-# Création du moteur SQLAlchemy
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,  # Vérifie la connexion avant chaque requête
-    pool_size=5,  # Nombre de connexions dans le pool
-    max_overflow=10,  # Nombre max de connexions supplémentaires
-    echo=settings.ENVIRONMENT == "development"  # Active les logs SQL en dev
-)
+# Création du moteur SQLAlchemy (taille du pool, recyclage et pre-ping dans Settings)
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings))
 
 # Session locale pour les requêtes
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Moteur asynchrone optionnel (asyncpg) pour les routes de lecture
+async_engine = None
+AsyncSessionLocal = None
+if settings.ASYNC_DB_ENABLED:
+    async_engine = create_async_engine(settings.ASYNC_DATABASE_URL, **engine_options(settings, is_async=True))
+    AsyncSessionLocal = sessionmaker(
+        async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
 # Base pour les modèles
 Base = declarative_base()
 
@@ -25,4 +33,22 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as async_db:
+        yield async_db
+
+# Session des routes de lecture : un seul moteur par requête, choisi au démarrage
+# (AsyncSession sur asyncpg si ASYNC_DB_ENABLED, sinon la Session de get_db)
+get_read_db = get_async_db if AsyncSessionLocal is not None else get_db
+
+async def run_db(db: Union[Session, AsyncSession], fn: Callable, *args, **kwargs):
+    """Exécuter une fonction de lecture synchrone `fn(session, ...)` sans bloquer la boucle.
+
+    Avec une AsyncSession, la fonction s'exécute sur la connexion asyncpg (run_sync) ;
+    avec une Session classique, elle part dans le threadpool comme une route `def`.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
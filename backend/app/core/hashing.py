@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from . import password_policy
+from .auth import get_password_hash, verify_password, verify_and_update_password
+from .config import settings
+from ..models.database_models import User
+
+logger = logging.getLogger("quiz_app.hashing")
+
+
+class HashingPoolSaturated(HTTPException):
+    """Raised when too many password hashes are already queued"""
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Trop de connexions simultanées, veuillez réessayer",
+            headers={"Retry-After": "1"},
+        )
+
+
+def _timed_call(fn: Callable, *args):
+    """Run in a worker process: returns the result with start/end timestamps"""
+    started_at = time.monotonic()
+    result = fn(*args)
+    return result, started_at, time.monotonic()
+
+
+class HashingMetrics:
+    """Counters separating time spent waiting in queue from time spent hashing"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.hash_time_total = 0.0
+        self.hash_time_max = 0.0
+
+    def record(self, queue_wait: float, hash_time: float):
+        with self._lock:
+            self.completed += 1
+            self.queue_wait_total += queue_wait
+            self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+            self.hash_time_total += hash_time
+            self.hash_time_max = max(self.hash_time_max, hash_time)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "queue_wait_avg_ms": round(self.queue_wait_total / completed * 1000, 2),
+                "queue_wait_max_ms": round(self.queue_wait_max * 1000, 2),
+                "hash_time_avg_ms": round(self.hash_time_total / completed * 1000, 2),
+                "hash_time_max_ms": round(self.hash_time_max * 1000, 2),
+            }
+
+
+class PasswordHashingPool:
+    """Process pool dedicated to password hashing, with a bounded number of pending jobs"""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.metrics = HashingMetrics()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn : pas de fork d'un processus qui a déjà des threads et des connexions
+                # Les workers reçoivent la politique déjà mesurée au lieu de refaire le benchmark
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=password_policy.configure,
+                    initargs=(password_policy.current_params(),)
+                )
+                logger.info(f"🔐 Pool de hachage démarré: {self.workers} processus")
+            return self._executor
+
+    async def run(self, fn: Callable, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.metrics.rejected += 1
+                raise HashingPoolSaturated()
+            self._pending += 1
+            self.metrics.submitted += 1
+
+        submitted_at = time.monotonic()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started_at, finished_at = await loop.run_in_executor(
+                self._get_executor(), _timed_call, fn, *args
+            )
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+        self.metrics.record(started_at - submitted_at, finished_at - started_at)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "policy": password_policy.describe(),
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            **self.metrics.snapshot()
+        }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+hashing_pool = PasswordHashingPool(
+    workers=settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the hashing pool"""
+    return await hashing_pool.run(get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the hashing pool"""
+    return await hashing_pool.run(verify_password, plain_password, hashed_password)
+
+
+def _find_login_user(db: Session, username: str) -> Optional[User]:
+    return db.query(User).filter(
+        (User.username == username) | (User.email == username)
+    ).first()
+
+
+def _store_password_hash(db: Session, user: User, new_hash: str):
+    user.hashed_password = new_hash
+    db.commit()
+
+
+async def authenticate_user_async(db: Session, username: str, password: str) -> Optional[User]:
+    """Authenticate a user without blocking the event loop"""
+    user = await run_in_threadpool(_find_login_user, db, username)
+
+    if not user:
+        return None
+    verified, new_hash = await hashing_pool.run(verify_and_update_password, password, user.hashed_password)
+    if not verified:
+        return None
+    if not user.is_active:
+        return None
+    if new_hash:
+        # Mise à niveau transparente vers la politique de hachage courante
+        await run_in_threadpool(_store_password_hash, db, user, new_hash)
+        logger.info(f"🔐 Hash du mot de passe mis à niveau pour l'utilisateur {user.id}")
+
+    return user
@@ -0,0 +1,214 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from .compression import brotli_module
+
+logger = logging.getLogger("quiz_app.image_store")
+
+IMAGE_CATEGORIES = ("questions", "code_examples", "diagrams", "screenshots")
+ALLOWED_IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg'}
+
+IMAGES_URL_PREFIX = "/static/images"
+MANIFEST_NAME = "manifest.json"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Formats texte servis précompressés (voir static_images), par ordre de préférence
+PRECOMPRESSED_EXTENSIONS = {'.svg'}
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# ioctl Linux de copie par référence (btrfs, XFS) : blocs partagés mais copie à l'écriture
+FICLONE = 0x40049409
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_file(source: Path, destination: Path):
+    """Copier un fichier, par référence si le système de fichiers le permet.
+
+    Jamais de lien physique : une image stockée sous son empreinte est servie `immutable`,
+    elle ne doit pas changer si le fichier source est modifié sur place.
+    """
+    try:
+        import fcntl
+        with open(source, "rb") as src, open(destination, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return
+    except (ImportError, OSError):
+        pass
+    shutil.copyfile(source, destination)
+
+
+def precompress(path: Path):
+    """Écrire les versions .br (si brotli est installé) et .gz d'un fichier texte stocké"""
+    brotli = brotli_module()
+    data = None
+    for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+        destination = path.with_name(path.name + suffix)
+        if destination.exists() or (encoding == "br" and brotli is None):
+            continue
+        if data is None:
+            data = path.read_bytes()
+        if encoding == "br":
+            compressed = brotli.compress(data, mode=brotli.MODE_TEXT, quality=11)
+        else:
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        temporary = destination.with_name(f".{destination.name}.{threading.get_ident()}.tmp")
+        temporary.write_bytes(compressed)
+        os.replace(temporary, destination)
+
+
+class ImageStore:
+    """Stockage des images par empreinte de contenu : un seul fichier par image distincte.
+
+    Le manifeste (`manifest.json` à la racine du dossier) associe chaque empreinte à son
+    fichier stocké, et chaque fichier source déjà vu (taille, date de modification) à son
+    empreinte : un import relancé ne relit ni ne recopie les images inchangées. Il garde
+    aussi les dimensions et variantes générées pour chaque image (voir image_variants).
+    """
+
+    def __init__(self, base_dir, workers: int = 8):
+        self.base_dir = Path(base_dir)
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._images: Dict[str, Dict] = {}
+        self._sources: Dict[str, Dict] = {}
+        self._variants: Dict[str, Dict] = {}
+        self._changed = False
+        self._load_manifest()
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.base_dir / MANIFEST_NAME
+
+    def _load_manifest(self):
+        if not self.manifest_path.exists():
+            return
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        self._images = manifest.get("images", {})
+        self._sources = manifest.get("sources", {})
+        self._variants = manifest.get("variants", {})
+
+    def setup_directories(self):
+        for category in IMAGE_CATEGORIES:
+            (self.base_dir / category).mkdir(parents=True, exist_ok=True)
+
+    def save(self):
+        """Écrire le manifeste (remplacement atomique) s'il a changé"""
+        with self._lock:
+            if not self._changed:
+                return
+            manifest = {"images": self._images, "sources": self._sources, "variants": self._variants}
+            self._changed = False
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        temporary = self.manifest_path.with_name(MANIFEST_NAME + ".tmp")
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(temporary, self.manifest_path)
+
+    def url(self, relative_path: str) -> str:
+        return f"{IMAGES_URL_PREFIX}/{relative_path}"
+
+    def relative_path(self, url: str) -> Optional[str]:
+        """Chemin dans le stockage d'une URL /static/images/... (None pour une URL externe)"""
+        if not url.startswith(IMAGES_URL_PREFIX + "/"):
+            return None
+        return url[len(IMAGES_URL_PREFIX) + 1:]
+
+    def variants(self, relative_path: str) -> Optional[Dict]:
+        with self._lock:
+            return self._variants.get(relative_path)
+
+    def record_variants(self, relative_path: str, metadata: Dict):
+        with self._lock:
+            self._variants[relative_path] = metadata
+            self._changed = True
+
+    def _source_digest(self, source: Path) -> str:
+        """Empreinte d'un fichier source, reprise du manifeste s'il n'a pas changé"""
+        key = str(source.resolve())
+        stat = source.stat()
+        with self._lock:
+            known = self._sources.get(key)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return known["digest"]
+
+        digest = file_digest(source)
+        with self._lock:
+            self._sources[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": digest}
+            self._changed = True
+        return digest
+
+    def _store(self, source: Path, relative_path: str):
+        destination = self.base_dir / relative_path
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        temporary = destination.with_name(f".{destination.name}.{threading.get_ident()}.tmp")
+        copy_file(source, temporary)
+        os.replace(temporary, destination)
+
+    def ingest(self, source, category: str = "questions") -> Optional[str]:
+        """Stocker une image et retourner son URL (None si absente ou non supportée)"""
+        source = Path(source)
+        if not source.exists():
+            logger.warning(f"⚠️  Image non trouvée: {source}")
+            return None
+        suffix = source.suffix.lower()
+        if suffix not in ALLOWED_IMAGE_EXTENSIONS:
+            logger.warning(f"⚠️  Extension non supportée: {source.suffix}")
+            return None
+
+        digest = self._source_digest(source)
+        with self._lock:
+            stored = self._images.get(digest)
+        stored_path = self.base_dir / stored["path"] if stored else None
+        if stored_path is not None and stored_path.exists():
+            if stored_path.stat().st_nlink > 1:
+                # Fichier stocké par une version antérieure sous forme de lien physique vers la
+                # source : on le remplace par une copie indépendante
+                self._store(stored_path, stored["path"])
+            if suffix in PRECOMPRESSED_EXTENSIONS:
+                precompress(stored_path)
+            return self.url(stored["path"])
+
+        relative_path = f"{category}/{digest}{suffix}"
+        self._store(source, relative_path)
+        if suffix in PRECOMPRESSED_EXTENSIONS:
+            precompress(self.base_dir / relative_path)
+        with self._lock:
+            # Une autre tâche a pu stocker la même image entre-temps : la première entrée gagne
+            stored = self._images.setdefault(digest, {"path": relative_path, "size": source.stat().st_size})
+            self._changed = True
+        return self.url(stored["path"])
+
+    def ingest_many(self, images: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[str]]:
+        """Stocker des couples (chemin source, catégorie) en parallèle; retourne couple -> URL"""
+        images = list(dict.fromkeys(images))
+        if len(images) <= 1 or self.workers <= 1:
+            return {image: self._ingest_safely(image) for image in images}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return dict(zip(images, executor.map(self._ingest_safely, images)))
+
+    def _ingest_safely(self, image: Tuple[str, str]) -> Optional[str]:
+        try:
+            return self.ingest(*image)
+        except OSError as e:
+            logger.error(f"❌ Erreur lors de la copie d'image {image[0]}: {e}")
+            return None
+
+    def stored_files(self) -> int:
+        with self._lock:
+            return len(self._images)
@@ -0,0 +1,161 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from .image_store import ImageStore, IMAGES_URL_PREFIX
+
+logger = logging.getLogger("quiz_app.image_variants")
+
+# Largeurs cibles des variantes (jamais agrandies au-delà de l'original)
+VARIANT_WIDTHS = {
+    "thumbnail": 320,
+    "mobile": 768,
+    "desktop": 1280,
+}
+
+# Formats matriciels redimensionnables (SVG est vectoriel, GIF peut être animé)
+RESIZABLE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+
+SAVE_OPTIONS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 6},
+    "avif": {"format": "AVIF", "quality": 55},
+}
+
+
+def pillow_available() -> bool:
+    try:
+        import PIL  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def supported_formats(requested: Sequence[str]) -> List[str]:
+    """Formats demandés que l'installation de Pillow sait encoder"""
+    if not pillow_available():
+        return []
+    from PIL import Image
+
+    Image.init()
+    return [fmt for fmt in requested if fmt in SAVE_OPTIONS and SAVE_OPTIONS[fmt]["format"] in Image.SAVE]
+
+
+def _variant_path(relative_path: str, width: int, fmt: str) -> str:
+    path = Path(relative_path)
+    return str(path.with_name(f"{path.stem}-{width}w.{fmt}"))
+
+
+def build_variants(base_dir: str, relative_path: str, formats: Sequence[str]) -> Optional[Dict]:
+    """Générer les variantes d'une image stockée (exécuté dans un processus du pool).
+
+    Retourne les dimensions de l'original et, par variante, ses dimensions et l'URL de
+    chaque format. Les fichiers déjà générés ne sont pas réencodés.
+    """
+    from PIL import Image, ImageOps
+
+    base = Path(base_dir)
+    try:
+        with Image.open(base / relative_path) as original:
+            image = ImageOps.exif_transpose(original)
+            width, height = image.size
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "transparency" in image.info or "A" in image.mode else "RGB")
+
+            metadata = {"width": width, "height": height, "formats": list(formats)}
+            resized = {}
+            for name, target_width in VARIANT_WIDTHS.items():
+                variant_width = min(target_width, width)
+                variant_height = max(1, round(height * variant_width / width))
+                variant = {"width": variant_width, "height": variant_height}
+
+                for fmt in formats:
+                    variant_path = _variant_path(relative_path, variant_width, fmt)
+                    destination = base / variant_path
+                    if not destination.exists():
+                        if variant_width not in resized:
+                            resized[variant_width] = image if variant_width == width else \
+                                image.resize((variant_width, variant_height), Image.LANCZOS)
+                        temporary = destination.with_name(f".{destination.name}.{os.getpid()}.tmp")
+                        resized[variant_width].save(temporary, **SAVE_OPTIONS[fmt])
+                        os.replace(temporary, destination)
+                    variant[fmt] = f"{IMAGES_URL_PREFIX}/{variant_path}"
+
+                metadata[name] = variant
+            return metadata
+    except (OSError, Image.DecompressionBombError) as e:
+        logger.error(f"❌ Variantes impossibles pour {relative_path}: {e}")
+        return None
+
+
+class VariantGenerator:
+    """Génère les variantes des images du stockage dans un pool de processus"""
+
+    def __init__(self, store: ImageStore, workers: int = 0, formats: Sequence[str] = ("webp", "avif")):
+        self.store = store
+        self.workers = workers or os.cpu_count() or 1
+        self.formats = supported_formats(formats)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        if not self.formats:
+            logger.warning("⚠️  Pillow absent ou sans encodeur WebP/AVIF : pas de variantes d'images")
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def generate(self, urls: Iterable[str]) -> Dict[str, Dict]:
+        """Variantes des images désignées par leur URL (réutilisées depuis le manifeste si à jour)"""
+        if not self.formats:
+            return {}
+
+        variants = {}
+        pending = []
+        for url in dict.fromkeys(urls):
+            relative_path = self.store.relative_path(url)
+            if relative_path is None or Path(relative_path).suffix.lower() not in RESIZABLE_EXTENSIONS:
+                continue
+            known = self.store.variants(relative_path)
+            if known and set(self.formats) <= set(known["formats"]):
+                variants[url] = known
+            else:
+                pending.append(relative_path)
+
+        if pending:
+            base_dir = str(self.store.base_dir)
+            results = self._get_executor().map(
+                build_variants, [base_dir] * len(pending), pending, [self.formats] * len(pending)
+            )
+            for relative_path, metadata in zip(pending, results):
+                if metadata:
+                    self.store.record_variants(relative_path, metadata)
+                    variants[self.store.url(relative_path)] = metadata
+        return variants
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def image_urls(images) -> List[str]:
+    """URLs d'images stockées référencées par un objet `Question.images`"""
+    if not isinstance(images, dict):
+        return []
+    return [
+        value for key, value in images.items()
+        if key != "variants" and isinstance(value, str) and value.startswith(IMAGES_URL_PREFIX + "/")
+    ]
+
+
+def with_variants(images: Optional[Dict], variants: Dict[str, Dict]) -> Optional[Dict]:
+    """Ajouter à `images` la clé "variants" (URL de l'original -> dimensions et variantes)"""
+    found = {url: variants[url] for url in image_urls(images) if url in variants}
+    if not found:
+        return images
+    return {**images, "variants": found}
@@ -1,6 +1,6 @@
 import logging
 from sqlalchemy.orm import Session
-from ..models.database_models import User, Technology, Category, Question
+from ..models.database_models import User, Technology, Category, Question, question_content_hash
 from ..core.auth import get_password_hash
 
 logger = logging.getLogger("quiz_app.init_data")
@@ -153,8 +153,9 @@ def create_initial_questions(db: Session):
                 })
             
             for q_data in spark_questions:
-                existing = db.query(Question).filter(
-                    Question.question_text == q_data["question_text"]
+                existing = db.query(Question.id).filter(
+                    Question.technology_id == q_data["technology_id"],
+                    Question.content_hash == question_content_hash(q_data["question_text"], q_data["options"])
                 ).first()
                 if not existing:
                     question = Question(**q_data)
@@ -202,8 +203,9 @@ def create_initial_questions(db: Session):
             ]
             
             for q_data in git_questions:
-                existing = db.query(Question).filter(
-                    Question.question_text == q_data["question_text"]
+                existing = db.query(Question.id).filter(
+                    Question.technology_id == q_data["technology_id"],
+                    Question.content_hash == question_content_hash(q_data["question_text"], q_data["options"])
                 ).first()
                 if not existing:
                     question = Question(**q_data)
@@ -256,8 +258,9 @@ def create_initial_questions(db: Session):
             ]
             
             for q_data in docker_questions:
-                existing = db.query(Question).filter(
-                    Question.question_text == q_data["question_text"]
+                existing = db.query(Question.id).filter(
+                    Question.technology_id == q_data["technology_id"],
+                    Question.content_hash == question_content_hash(q_data["question_text"], q_data["options"])
                 ).first()
                 if not existing:
                     question = Question(**q_data)
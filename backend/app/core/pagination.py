@@ -0,0 +1,62 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: Optional[datetime], row_id: int) -> str:
+    """Curseur opaque désignant la dernière ligne d'une page (valeur de tri ou null, id)"""
+    raw = json.dumps([sort_value.isoformat() if sort_value is not None else None, row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (datetime.fromisoformat(sort_value) if sort_value is not None else None), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Curseur de pagination invalide"
+        )
+
+
+def keyset_page(query: Query, sort_column, id_column, cursor: Optional[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Page suivante d'une requête triée par (sort_column DESC, id DESC).
+
+    Le filtre `(tri, id) < (curseur)` suit l'index composite : le coût d'une page ne dépend
+    pas de sa profondeur dans l'historique. Les lignes sans valeur de tri viennent en premier
+    (NULLS FIRST, ordre par défaut de l'index DESC). Retourne les lignes et le curseur
+    suivant (None sur la dernière page).
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        if sort_value is None:
+            # Suite des lignes sans valeur de tri, puis toutes les autres
+            query = query.filter(or_(
+                and_(sort_column.is_(None), id_column < row_id),
+                sort_column.isnot(None)
+            ))
+        else:
+            query = query.filter(tuple_(sort_column, id_column) < tuple_(sort_value, row_id))
+
+    # Une ligne de plus que demandé indique s'il reste une page
+    rows = query.order_by(sort_column.desc().nullsfirst(), id_column.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
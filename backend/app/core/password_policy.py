@@ -0,0 +1,138 @@
+import logging
+import time
+from typing import Optional
+
+from passlib.context import CryptContext
+
+from .config import settings
+
+logger = logging.getLogger("quiz_app.password_policy")
+
+SUPPORTED_SCHEMES = ("bcrypt", "argon2")
+
+# Bornes de sécurité : jamais en dessous du minimum, même sur une machine lente
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 16
+ARGON2_MAX_TIME_COST = 10
+
+_params: Optional[dict] = None
+_context: Optional[CryptContext] = None
+
+
+def _argon2_available() -> bool:
+    try:
+        import argon2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _time_hash(context: CryptContext, samples: int = 3) -> float:
+    """Best-of-N duration (seconds) of one hash with the given context"""
+    best = float("inf")
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.hash("benchmark-password")
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def benchmark_bcrypt_rounds(target_ms: int) -> int:
+    """Highest bcrypt cost whose hash time stays under the target on this host"""
+    base = _time_hash(CryptContext(schemes=["bcrypt"], bcrypt__rounds=BCRYPT_MIN_ROUNDS))
+    rounds = BCRYPT_MIN_ROUNDS
+    # Chaque round supplémentaire double le temps de calcul
+    while rounds < BCRYPT_MAX_ROUNDS and base * 2 ** (rounds + 1 - BCRYPT_MIN_ROUNDS) * 1000 <= target_ms:
+        rounds += 1
+    return rounds
+
+
+def benchmark_argon2_time_cost(target_ms: int, memory_kb: int, parallelism: int) -> int:
+    """argon2 time cost (roughly linear) hitting the target latency on this host"""
+    one_pass = _time_hash(CryptContext(
+        schemes=["argon2"],
+        argon2__time_cost=1,
+        argon2__memory_cost=memory_kb,
+        argon2__parallelism=parallelism
+    ))
+    return max(1, min(ARGON2_MAX_TIME_COST, int(target_ms / (one_pass * 1000))))
+
+
+def select_policy() -> dict:
+    """Pick scheme and cost from settings, benchmarking the host when no cost is forced"""
+    scheme = settings.PASSWORD_HASH_SCHEME
+    if scheme not in SUPPORTED_SCHEMES:
+        raise ValueError(f"PASSWORD_HASH_SCHEME inconnu: {scheme}")
+    if scheme == "argon2" and not _argon2_available():
+        logger.warning("⚠️  argon2-cffi non installé, utilisation de bcrypt")
+        scheme = "bcrypt"
+
+    params = {
+        "scheme": scheme,
+        "target_ms": settings.PASSWORD_HASH_TARGET_MS,
+        "bcrypt_rounds": settings.PASSWORD_BCRYPT_ROUNDS,
+        "argon2_time_cost": settings.PASSWORD_ARGON2_TIME_COST,
+        "argon2_memory_kb": settings.PASSWORD_ARGON2_MEMORY_KB,
+        "argon2_parallelism": settings.PASSWORD_ARGON2_PARALLELISM,
+    }
+
+    if scheme == "bcrypt" and params["bcrypt_rounds"] is None:
+        params["bcrypt_rounds"] = benchmark_bcrypt_rounds(params["target_ms"])
+    elif params["bcrypt_rounds"] is not None and params["bcrypt_rounds"] < BCRYPT_MIN_ROUNDS:
+        logger.warning(
+            f"⚠️  PASSWORD_BCRYPT_ROUNDS={params['bcrypt_rounds']} sous le minimum, "
+            f"{BCRYPT_MIN_ROUNDS} utilisé"
+        )
+        params["bcrypt_rounds"] = BCRYPT_MIN_ROUNDS
+    if scheme == "argon2" and params["argon2_time_cost"] is None:
+        params["argon2_time_cost"] = benchmark_argon2_time_cost(
+            params["target_ms"], params["argon2_memory_kb"], params["argon2_parallelism"]
+        )
+
+    return params
+
+
+def build_context(params: dict) -> CryptContext:
+    """CryptContext hashing with the selected scheme and flagging everything else for rehash"""
+    primary = params["scheme"]
+    schemes = [primary] + [scheme for scheme in SUPPORTED_SCHEMES if scheme != primary]
+
+    options = {}
+    if params.get("bcrypt_rounds"):
+        options["bcrypt__rounds"] = params["bcrypt_rounds"]
+        # Les hashes moins coûteux que la politique courante sont mis à niveau à la connexion
+        options["bcrypt__min_rounds"] = params["bcrypt_rounds"]
+    if params.get("argon2_time_cost"):
+        options["argon2__time_cost"] = params["argon2_time_cost"]
+        options["argon2__memory_cost"] = params["argon2_memory_kb"]
+        options["argon2__parallelism"] = params["argon2_parallelism"]
+
+    return CryptContext(schemes=schemes, default=primary, deprecated=schemes[1:], **options)
+
+
+def configure(params: dict):
+    """Install a policy (called at startup and in every hashing worker process)"""
+    global _params, _context
+    _params = params
+    _context = build_context(params)
+
+
+def get_context() -> CryptContext:
+    """Current CryptContext, selecting the policy on first use"""
+    if _context is None:
+        configure(select_policy())
+        logger.info(f"🔐 Politique de hachage: {describe()}")
+    return _context
+
+
+def current_params() -> dict:
+    get_context()
+    return dict(_params)
+
+
+def describe() -> dict:
+    params = _params or {}
+    if params.get("scheme") == "argon2":
+        return {"scheme": "argon2", "time_cost": params["argon2_time_cost"],
+                "memory_kb": params["argon2_memory_kb"], "parallelism": params["argon2_parallelism"]}
+    return {"scheme": "bcrypt", "rounds": params.get("bcrypt_rounds"), "target_ms": params.get("target_ms")}
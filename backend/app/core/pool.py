@@ -0,0 +1,114 @@
+import threading
+import time
+from typing import Dict, Optional, Type
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+
+class PoolMetrics:
+    """Compteurs d'attente lors de l'obtention d'une connexion du pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            attempts = (self.checkouts + self.timeouts) or 1
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / attempts * 1000, 3),
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+
+_instrumented: Dict[Type[Pool], Type[Pool]] = {}
+
+
+def instrumented(pool_class: Type[Pool]) -> Type[Pool]:
+    """Sous-classe du pool mesurant le temps passé à attendre une connexion"""
+    if pool_class not in _instrumented:
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                connection = pool_class._do_get(self)
+            except exc.TimeoutError:
+                self.metrics.record(time.perf_counter() - started, timed_out=True)
+                raise
+            self.metrics.record(time.perf_counter() - started)
+            return connection
+
+        def __init__(self, *args, **kwargs):
+            pool_class.__init__(self, *args, **kwargs)
+            self.metrics = PoolMetrics()
+
+        def recreate(self):
+            new_pool = pool_class.recreate(self)
+            new_pool.metrics = self.metrics
+            return new_pool
+
+        _instrumented[pool_class] = type(
+            f"Instrumented{pool_class.__name__}",
+            (pool_class,),
+            {"__init__": __init__, "_do_get": _do_get, "recreate": recreate}
+        )
+    return _instrumented[pool_class]
+
+
+def engine_options(settings, is_async: bool = False) -> dict:
+    """Options de create_engine / create_async_engine dérivées de la configuration"""
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "echo": settings.ENVIRONMENT == "development",
+    }
+
+    if settings.DB_POOL_MODE == "null":
+        # Une connexion par session, rendue aussitôt : le pooling est confié à PgBouncer
+        options["poolclass"] = instrumented(NullPool)
+    else:
+        options["poolclass"] = instrumented(AsyncAdaptedQueuePool if is_async else QueuePool)
+        options["pool_size"] = settings.DB_POOL_SIZE
+        options["max_overflow"] = settings.DB_MAX_OVERFLOW
+        options["pool_timeout"] = settings.DB_POOL_TIMEOUT
+        options["pool_recycle"] = settings.DB_POOL_RECYCLE
+
+    if settings.DB_PGBOUNCER and is_async:
+        # En mode transaction, PgBouncer peut changer de connexion serveur entre deux requêtes :
+        # pas de requêtes préparées côté serveur (psycopg2 n'en utilise pas)
+        options["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+
+    return options
+
+
+def pool_stats(engine) -> Optional[dict]:
+    if engine is None:
+        return None
+
+    pool = getattr(engine, "sync_engine", engine).pool
+    stats = {"class": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+        })
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.snapshot())
+    return stats
@@ -0,0 +1,124 @@
+import json
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from ..models.database_models import Question, Technology, Category
+
+# Colonnes nécessaires pour l'affichage d'une question (sans la bonne réponse)
+QUESTION_COLUMNS = (
+    Question.id,
+    Question.technology_id,
+    Question.category_id,
+    Question.question_text,
+    Question.options,
+    Question.difficulty,
+    Question.images,
+    Question.tags,
+    Technology.name.label("technology"),
+    Category.name.label("category"),
+)
+
+# Colonnes d'une technologie (schéma `Technology` de l'API)
+TECHNOLOGY_COLUMNS = (
+    Technology.id,
+    Technology.name,
+    Technology.display_name,
+    Technology.description,
+    Technology.icon,
+    Technology.color,
+    Technology.is_active,
+    Technology.created_at,
+)
+
+
+def _json_value(value):
+    """Certaines anciennes importations stockent les listes en JSON encodé deux fois"""
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def questions_select(
+    technology_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    difficulty: Optional[int] = None,
+    limit: Optional[int] = None
+) -> Select:
+    """SELECT unique des questions actives avec les noms de technologie et de catégorie"""
+    stmt = (
+        select(*QUESTION_COLUMNS)
+        .join(Technology, Question.technology_id == Technology.id)
+        .join(Category, Question.category_id == Category.id)
+        .where(Question.is_active == True)
+    )
+
+    if technology_id is not None:
+        stmt = stmt.where(Question.technology_id == technology_id)
+    if category_id is not None:
+        stmt = stmt.where(Question.category_id == category_id)
+    if difficulty:
+        stmt = stmt.where(Question.difficulty == difficulty)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
+    return stmt
+
+
+def serialize_question_row(row) -> Dict:
+    """Convertir une ligne de `questions_select` en réponse JSON"""
+    return {
+        "id": row.id,
+        "technology_id": row.technology_id,
+        "category_id": row.category_id,
+        "question_text": row.question_text,
+        "options": _json_value(row.options),
+        "difficulty": row.difficulty,
+        "images": row.images,
+        "tags": _json_value(row.tags),
+        "technology": row.technology,
+        "category": row.category
+    }
+
+
+def fetch_questions(
+    db: Session,
+    technology_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    difficulty: Optional[int] = None,
+    limit: Optional[int] = None
+) -> List[Dict]:
+    """Questions filtrées, sérialisées, en une seule requête quel que soit `limit`"""
+    rows = db.execute(questions_select(technology_id, category_id, difficulty, limit)).all()
+    return [serialize_question_row(row) for row in rows]
+
+
+def fetch_questions_by_ids(db: Session, question_ids: Sequence[int]) -> List[Dict]:
+    """Questions actives par clé primaire, dans l'ordre des ids demandés"""
+    if not question_ids:
+        return []
+    rows = db.execute(questions_select().where(Question.id.in_(question_ids))).all()
+    by_id = {row.id: serialize_question_row(row) for row in rows}
+    return [by_id[question_id] for question_id in question_ids if question_id in by_id]
+
+
+def serialize_technology_row(row) -> Dict:
+    """Convertir une ligne de TECHNOLOGY_COLUMNS (ou une Technology) en réponse JSON"""
+    return {
+        "id": row.id,
+        "name": row.name,
+        "display_name": row.display_name,
+        "description": row.description,
+        "icon": row.icon,
+        "color": row.color,
+        "is_active": row.is_active,
+        "created_at": row.created_at
+    }
+
+
+def fetch_technologies(db: Session) -> List[Dict]:
+    """Technologies actives, sérialisées en une requête sur les seules colonnes exposées"""
+    rows = db.execute(
+        select(*TECHNOLOGY_COLUMNS).where(Technology.is_active == True).order_by(Technology.id)
+    ).all()
+    return [serialize_technology_row(row) for row in rows]
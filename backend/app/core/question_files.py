@@ -0,0 +1,172 @@
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterator, Optional, TextIO
+
+QUESTION_FILE_FORMATS = ("json", "ndjson")
+NDJSON_SUFFIXES = {".ndjson", ".jsonl"}
+
+READ_CHUNK_SIZE = 64 * 1024
+# Taille maximale d'un élément en cours de lecture : au-delà, le fichier est rejeté
+MAX_BUFFER_SIZE = 16 * 1024 * 1024
+
+# Caractères pouvant suivre une valeur complète
+VALUE_DELIMITERS = frozenset(",]}: \t\r\n")
+
+_decoder = json.JSONDecoder()
+
+
+def detect_format(file_path) -> str:
+    return "ndjson" if Path(file_path).suffix.lower() in NDJSON_SUFFIXES else "json"
+
+
+class _JsonReader:
+    """Lecture incrémentale d'un document JSON : seul l'élément en cours est gardé en mémoire"""
+
+    def __init__(self, stream: TextIO, chunk_size: int = READ_CHUNK_SIZE,
+                 max_buffer_size: int = MAX_BUFFER_SIZE):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._max_buffer_size = max_buffer_size
+        self._buffer = ""
+        self._pos = 0
+
+    def _fill(self) -> bool:
+        if len(self._buffer) - self._pos > self._max_buffer_size:
+            raise ValueError(f"JSON invalide: élément de plus de {self._max_buffer_size} caractères")
+        chunk = self._stream.read(self._chunk_size)
+        if not chunk:
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Prochain caractère significatif ("" en fin de fichier)"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"JSON invalide: '{char}' attendu, '{found}' trouvé")
+        self._pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # Un nombre coupé par la fin du tampon est décodé sans sa suite ("4." -> 4,
+            # "1e" -> 1) : relire tant que la valeur n'est pas suivie d'un délimiteur
+            if (end == len(self._buffer) or self._buffer[end] not in VALUE_DELIMITERS) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def array(self) -> Iterator:
+        self.expect("[")
+        if self.peek() == "]":
+            self.expect("]")
+            return
+        while True:
+            yield self.value()
+            if self.peek() != ",":
+                break
+            self.expect(",")
+        self.expect("]")
+
+
+def _iter_json(stream: TextIO, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Dict]:
+    """Éléments d'une liste de questions ou de la clé "questions" d'un objet"""
+    reader = _JsonReader(stream, chunk_size)
+    if reader.peek() != "{":
+        yield from reader.array()
+        return
+
+    reader.expect("{")
+    while reader.peek() != "}":
+        key = reader.value()
+        reader.expect(":")
+        if key == "questions":
+            yield from reader.array()
+        else:
+            reader.value()
+        if reader.peek() == ",":
+            reader.expect(",")
+    reader.expect("}")
+
+
+def _iter_ndjson(stream: TextIO, skip: int) -> Iterator[Dict]:
+    position = 0
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        position += 1
+        # Les lignes déjà importées ne sont pas décodées
+        if position > skip:
+            yield json.loads(line)
+
+
+def iter_questions(file_path, file_format: Optional[str] = None, skip: int = 0) -> Iterator[Dict]:
+    """Questions d'un fichier JSON ou NDJSON, lues une à une.
+
+    La mémoire utilisée ne dépend pas de la taille du fichier. `skip` saute les premières
+    questions (reprise après un point de contrôle).
+    """
+    file_format = file_format or detect_format(file_path)
+    with open(file_path, "r", encoding="utf-8") as stream:
+        if file_format == "ndjson":
+            yield from _iter_ndjson(stream, skip)
+            return
+        for position, question in enumerate(_iter_json(stream)):
+            if position >= skip:
+                yield question
+
+
+# === Points de contrôle pour reprendre un import interrompu ===
+
+def checkpoint_path(file_path) -> Path:
+    path = Path(file_path)
+    return path.with_name(path.name + ".checkpoint")
+
+
+def _file_identity(file_path) -> Dict:
+    stat = os.stat(file_path)
+    return {"file": str(Path(file_path).resolve()), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def load_checkpoint(file_path, technology: str) -> int:
+    """Nombre de questions déjà traitées d'après le point de contrôle (0 sans point valide)"""
+    path = checkpoint_path(file_path)
+    if not path.exists():
+        return 0
+    with open(path, "r", encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    # Un fichier modifié depuis invalide le point de contrôle
+    if checkpoint.get("technology") != technology or \
+            any(checkpoint.get(key) != value for key, value in _file_identity(file_path).items()):
+        return 0
+    return checkpoint["processed"]
+
+
+def save_checkpoint(file_path, technology: str, processed: int):
+    path = checkpoint_path(file_path)
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump({**_file_identity(file_path), "technology": technology, "processed": processed}, f)
+    os.replace(temporary, path)
+
+
+def clear_checkpoint(file_path):
+    checkpoint_path(file_path).unlink(missing_ok=True)
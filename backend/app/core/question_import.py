@@ -0,0 +1,264 @@
+import itertools
+import logging
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from .. import schemas
+from .db import SessionLocal
+from .question_files import iter_questions
+from ..models.database_models import Technology, Category, Question, question_content_hash
+
+logger = logging.getLogger("quiz_app.question_import")
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_CATEGORY = "General"
+
+# Anciens champs d'image à plat -> clé de l'objet `images`
+LEGACY_IMAGE_FIELDS = {
+    "question_image": "question",
+    "code_image": "code",
+    "diagram_image": "diagram",
+    "screenshot_image": "screenshot",
+}
+
+REQUIRED_FIELDS = ("question_text", "options", "correct_answer")
+
+# Nombre de motifs de rejet conservés dans le rapport
+MAX_REPORTED_ERRORS = 5
+
+
+class ImportReport:
+    """Compteurs d'un import de questions"""
+
+    def __init__(self, technology: str):
+        self.technology = technology
+        self.read = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.errors: List[str] = []
+        self.started_at = time.perf_counter()
+        self.elapsed = 0.0
+
+    def reject(self, q_data, reason: str):
+        self.invalid += 1
+        message = f"{str(q_data.get('question_text') if isinstance(q_data, dict) else q_data)[:50]}: {reason}"
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+        logger.warning(f"⚠️  Question ignorée: {message}")
+
+    def finish(self) -> "ImportReport":
+        self.elapsed = time.perf_counter() - self.started_at
+        return self
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed or time.perf_counter() - self.started_at
+        return self.inserted / elapsed if elapsed else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.technology}: {self.inserted} insérées, {self.duplicates} doublons, "
+            f"{self.invalid} invalides en {self.elapsed:.2f}s ({self.rows_per_second:.0f} lignes/s)"
+        )
+
+
+def question_images(q_data: Dict) -> Optional[Dict]:
+    """Regrouper les champs d'image (ancien et nouveau format) dans un seul objet"""
+    images = {}
+    for field, key in LEGACY_IMAGE_FIELDS.items():
+        if q_data.get(field):
+            images[key] = q_data[field]
+    if isinstance(q_data.get("images"), dict):
+        images.update({key: path for key, path in q_data["images"].items() if path})
+    return images or None
+
+
+def ensure_technology(db: Session, name: str, display_name: Optional[str] = None, **defaults) -> Technology:
+    """Récupérer une technologie par son nom ou la créer"""
+    tech = db.query(Technology).filter(Technology.name == name).first()
+    if not tech:
+        tech = Technology(name=name, display_name=display_name or name, **defaults)
+        db.add(tech)
+        db.flush()
+        logger.info(f"✅ Technologie créée: {name}")
+    return tech
+
+
+def upsert_categories(db: Session, technology_id: int, categories: Iterable[Dict]) -> Dict[str, int]:
+    """Créer les catégories manquantes en une instruction; retourne nom -> id.
+
+    `categories` contient des dictionnaires {"name", "description"}; les catégories existantes
+    sont laissées telles quelles.
+    """
+    rows = {}
+    for category in categories:
+        rows.setdefault(category["name"], {
+            "name": category["name"],
+            "description": category.get("description"),
+            "technology_id": technology_id,
+        })
+    if not rows:
+        return {}
+
+    stmt = pg_insert(Category.__table__).values(list(rows.values()))
+    db.execute(stmt.on_conflict_do_nothing(index_elements=["name", "technology_id"]))
+
+    return dict(db.execute(
+        select(Category.name, Category.id).where(
+            Category.technology_id == technology_id,
+            Category.name.in_(list(rows))
+        )
+    ).all())
+
+
+def existing_question_hashes(db: Session, technology_id: int) -> Set[str]:
+    """Empreintes des questions déjà en base pour une technologie (parcours de ix_questions_content_hash)"""
+    rows = db.execute(
+        select(Question.content_hash).where(
+            Question.technology_id == technology_id
+        ).execution_options(stream_results=True)
+    )
+    return {row.content_hash for row in rows}
+
+
+def _question_row(q_data: Dict, technology_id: int, category_id: int, digest: str) -> Dict:
+    return {
+        "technology_id": technology_id,
+        "category_id": category_id,
+        "question_text": str(q_data["question_text"]).strip(),
+        "options": q_data["options"],
+        "correct_answer": q_data["correct_answer"],
+        "explanation": q_data.get("explanation") or "",
+        "difficulty": q_data.get("difficulty", 1),
+        "images": question_images(q_data),
+        "tags": q_data.get("tags", []),
+        "is_active": True,
+        "content_hash": digest,
+    }
+
+
+def _batches(items: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_questions(
+    db: Session,
+    technology: Technology,
+    questions: Iterable[Dict],
+    categories: Optional[Iterable[Dict]] = None,
+    default_category: str = DEFAULT_CATEGORY,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    on_batch: Optional[Callable[[ImportReport], None]] = None,
+    validate: bool = False
+) -> ImportReport:
+    """Insérer un flux de questions par lots pour une technologie.
+
+    Les doublons sont écartés par empreinte de contenu contre un ensemble chargé une fois au
+    départ; chaque lot résout ses nouvelles catégories en un upsert puis s'insère en un seul
+    INSERT multi-lignes. L'index unique sur l'empreinte écarte les doublons entre lots et les
+    questions insérées entre-temps par un import concurrent : seules les empreintes déjà en
+    base restent en mémoire, quelle que soit la taille du flux.
+
+    Avec `validate`, chaque ligne passe par le schéma `QuestionCreate` avant insertion.
+    Aucun commit ici : `on_batch` est appelé après chaque lot (l'appelant peut y valider la
+    transaction et enregistrer sa progression).
+    """
+    report = ImportReport(technology.name)
+    seen = existing_question_hashes(db, technology.id)
+
+    category_ids = upsert_categories(db, technology.id, categories or [])
+
+    for batch in _batches(questions, batch_size):
+        rows = []
+        pending = []
+        batch_hashes = set()
+        for q_data in batch:
+            report.read += 1
+            if not isinstance(q_data, dict) or any(q_data.get(field) in (None, "", []) for field in REQUIRED_FIELDS):
+                report.reject(q_data, "champs obligatoires manquants")
+                continue
+            if not isinstance(q_data.get("category") or "", str):
+                report.reject(q_data, "category: chaîne de caractères attendue")
+                continue
+
+            digest = question_content_hash(q_data["question_text"], q_data["options"])
+            if digest in seen or digest in batch_hashes:
+                report.duplicates += 1
+                continue
+            batch_hashes.add(digest)
+            pending.append((q_data, digest))
+
+        missing = {q.get("category") or default_category for q, _ in pending} - category_ids.keys()
+        if missing:
+            category_ids.update(upsert_categories(db, technology.id, [{"name": name} for name in missing]))
+
+        for q_data, digest in pending:
+            category_id = category_ids[q_data.get("category") or default_category]
+            row = _question_row(q_data, technology.id, category_id, digest)
+            if validate:
+                try:
+                    row.update(schemas.QuestionCreate(**row).dict())
+                except ValidationError as e:
+                    error = e.errors()[0]
+                    report.reject(q_data, f"{'.'.join(map(str, error['loc']))}: {error['msg']}")
+                    continue
+            rows.append(row)
+
+        if rows:
+            stmt = pg_insert(Question.__table__).values(rows).on_conflict_do_nothing(
+                index_elements=["technology_id", "content_hash"]
+            )
+            inserted = len(db.execute(stmt.returning(Question.id)).all())
+            report.inserted += inserted
+            report.duplicates += len(rows) - inserted
+            logger.info(f"📊 {technology.name}: {report.inserted} questions insérées...")
+
+        if on_batch:
+            on_batch(report)
+
+    return report.finish()
+
+
+def import_files(
+    technology_name: str,
+    display_name: Optional[str],
+    file_paths: List[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    validate: bool = True
+) -> ImportReport:
+    """Importer les fichiers d'une technologie avec sa propre session.
+
+    Point d'entrée des processus de l'import parallèle : une technologie par appel, un commit
+    par lot pour garder les transactions courtes.
+    """
+    db = SessionLocal()
+    try:
+        technology = ensure_technology(db, technology_name, display_name)
+        db.commit()
+        report = import_questions(
+            db,
+            technology,
+            itertools.chain.from_iterable(iter_questions(path) for path in file_paths),
+            batch_size=batch_size,
+            on_batch=lambda _: db.commit(),
+            validate=validate
+        )
+        return report
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,154 @@
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import Date, cast, delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from ..models.database_models import QuizSession, UserStats, UserTechnologyStats, UserDailyActivity
+
+logger = logging.getLogger("quiz_app.rollups")
+
+ROLLUP_MODELS = (UserStats, UserTechnologyStats, UserDailyActivity)
+
+_score = func.coalesce(QuizSession.score_percentage, 0)
+_time_spent = func.coalesce(QuizSession.time_spent_seconds, 0)
+
+
+# Agrégats calculés depuis quiz_sessions : source de vérité des rollups
+
+def user_totals_select(*criteria) -> Select:
+    return select(
+        QuizSession.user_id,
+        func.count(QuizSession.id).label("total_quizzes"),
+        func.sum(_score).label("score_sum"),
+        func.max(_score).label("best_score"),
+        func.sum(_time_spent).label("total_time_spent"),
+        func.max(QuizSession.completed_at).label("last_completed_at")
+    ).where(QuizSession.completed_at.isnot(None), *criteria).group_by(QuizSession.user_id)
+
+
+def technology_totals_select(*criteria) -> Select:
+    return select(
+        QuizSession.user_id,
+        QuizSession.technology_id,
+        func.count(QuizSession.id).label("quiz_count"),
+        func.sum(_score).label("score_sum")
+    ).where(QuizSession.completed_at.isnot(None), *criteria).group_by(
+        QuizSession.user_id, QuizSession.technology_id
+    )
+
+
+def daily_totals_select(*criteria) -> Select:
+    day = cast(QuizSession.completed_at, Date)
+    return select(
+        QuizSession.user_id,
+        day.label("day"),
+        func.count(QuizSession.id).label("quiz_count"),
+        func.sum(_score).label("score_sum")
+    ).where(QuizSession.completed_at.isnot(None), *criteria).group_by(QuizSession.user_id, day)
+
+
+ROLLUP_SOURCES = (
+    (UserStats, user_totals_select),
+    (UserTechnologyStats, technology_totals_select),
+    (UserDailyActivity, daily_totals_select),
+)
+
+
+def _key_columns(model) -> List[str]:
+    return [column.name for column in model.__table__.primary_key.columns]
+
+
+def _upsert_from(model, source: Select):
+    """INSERT ... SELECT qui ajoute les agrégats de `source` aux lignes existantes"""
+    table = model.__table__
+    columns = [column.name for column in source.selected_columns]
+    stmt = pg_insert(table).from_select(columns, source)
+
+    updates = {}
+    for name in columns:
+        if name in _key_columns(model):
+            continue
+        if name in ("best_score", "last_completed_at"):
+            updates[name] = func.greatest(table.c[name], stmt.excluded[name])
+        else:
+            updates[name] = table.c[name] + stmt.excluded[name]
+    if "updated_at" in table.c:
+        updates["updated_at"] = func.now()
+
+    return stmt.on_conflict_do_update(index_elements=_key_columns(model), set_=updates)
+
+
+def record_completed_session(db: Session, session_id: int):
+    """Ajouter une session qui vient de se terminer aux rollups de son utilisateur.
+
+    À appeler dans la transaction qui passe la session à l'état terminé, une seule fois
+    par session : les compteurs sont incrémentés, pas recalculés.
+    """
+    for model, source in ROLLUP_SOURCES:
+        db.execute(_upsert_from(model, source(QuizSession.id == session_id)))
+
+
+def rebuild_user_rollups(db: Session, user_ids: Optional[Iterable[int]] = None) -> Dict[str, int]:
+    """Recalculer les rollups depuis quiz_sessions (tous les utilisateurs ou une liste)"""
+    user_ids = list(user_ids) if user_ids is not None else None
+
+    # Les fins de quiz concurrentes attendent la fin de la reconstruction au lieu d'être perdues
+    for model in ROLLUP_MODELS:
+        db.execute(text(f"LOCK TABLE {model.__tablename__} IN SHARE ROW EXCLUSIVE MODE"))
+
+    rebuilt = {}
+    for model, source in ROLLUP_SOURCES:
+        criteria = [QuizSession.user_id.in_(user_ids)] if user_ids is not None else []
+        cleanup = delete(model)
+        if user_ids is not None:
+            cleanup = cleanup.where(model.user_id.in_(user_ids))
+        db.execute(cleanup)
+
+        aggregate = source(*criteria)
+        columns = [column.name for column in aggregate.selected_columns]
+        result = db.execute(pg_insert(model.__table__).from_select(columns, aggregate))
+        rebuilt[model.__tablename__] = result.rowcount
+
+    logger.info(f"📊 Rollups reconstruits: {rebuilt}")
+    return rebuilt
+
+
+def check_user_rollups(db: Session, user_ids: Optional[Iterable[int]] = None) -> List[Dict]:
+    """Comparer les rollups aux agrégats recalculés; retourne la liste des écarts"""
+    user_ids = list(user_ids) if user_ids is not None else None
+    mismatches = []
+
+    for model, source in ROLLUP_SOURCES:
+        keys = _key_columns(model)
+        aggregate = source(*([QuizSession.user_id.in_(user_ids)] if user_ids is not None else []))
+        columns = [column.name for column in aggregate.selected_columns]
+
+        expected = {
+            tuple(row[key] for key in keys): row
+            for row in db.execute(aggregate).mappings()
+        }
+        stored_query = select(*[model.__table__.c[name] for name in columns])
+        if user_ids is not None:
+            stored_query = stored_query.where(model.user_id.in_(user_ids))
+        actual = {
+            tuple(row[key] for key in keys): row
+            for row in db.execute(stored_query).mappings()
+        }
+
+        for key in sorted(expected.keys() | actual.keys(), key=str):
+            expected_row = expected.get(key)
+            actual_row = actual.get(key)
+            if expected_row is not None and actual_row is not None and \
+                    all(expected_row[name] == actual_row[name] for name in columns):
+                continue
+            mismatches.append({
+                "table": model.__tablename__,
+                "key": dict(zip(keys, key)),
+                "expected": dict(expected_row) if expected_row is not None else None,
+                "actual": dict(actual_row) if actual_row is not None else None
+            })
+
+    return mismatches
@@ -0,0 +1,309 @@
+import logging
+import random
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .bank_version import bank_version, current_bank_version
+from .config import settings
+from .queries import fetch_questions_by_ids
+from ..models.database_models import Question
+
+logger = logging.getLogger("quiz_app.sampling")
+
+# Délai maximal de connexion et de réponse de Redis : un serveur injoignable ne bloque pas le démarrage
+REDIS_TIMEOUT_SECONDS = 2
+
+# (technology_id, category_id, difficulty) - None signifie "tous"
+IndexKey = Tuple[Optional[int], Optional[int], Optional[int]]
+
+
+def index_keys(technology_id: int, category_id: int, difficulty: Optional[int]) -> List[IndexKey]:
+    """Toutes les combinaisons de filtres sous lesquelles une question doit être indexée"""
+    return [
+        (tech, cat, diff)
+        for tech in (technology_id, None)
+        for cat in (category_id, None)
+        for diff in (difficulty, None)
+    ]
+
+
+class _IdPool:
+    """Ensemble d'ids avec ajout, suppression et tirage en O(1)"""
+
+    __slots__ = ("ids", "positions")
+
+    def __init__(self):
+        self.ids: List[int] = []
+        self.positions: Dict[int, int] = {}
+
+    def add(self, question_id: int):
+        if question_id not in self.positions:
+            self.positions[question_id] = len(self.ids)
+            self.ids.append(question_id)
+
+    def discard(self, question_id: int):
+        position = self.positions.pop(question_id, None)
+        if position is None:
+            return
+        last = self.ids.pop()
+        if last != question_id:
+            self.ids[position] = last
+            self.positions[last] = position
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class MemoryQuestionIndex:
+    """Index des questions actives conservé dans le processus"""
+
+    def __init__(self):
+        self._pools: Dict[IndexKey, _IdPool] = {}
+
+    def rebuild(self, entries: Iterable[Tuple[int, List[IndexKey]]]):
+        pools: Dict[IndexKey, _IdPool] = {}
+        for question_id, keys in entries:
+            for key in keys:
+                pools.setdefault(key, _IdPool()).add(question_id)
+        self._pools = pools
+
+    def add(self, question_id: int, keys: List[IndexKey]):
+        for key in keys:
+            self._pools.setdefault(key, _IdPool()).add(question_id)
+
+    def discard(self, question_id: int, keys: List[IndexKey]):
+        for key in keys:
+            pool = self._pools.get(key)
+            if pool is not None:
+                pool.discard(question_id)
+
+    def sample(self, key: IndexKey, count: int) -> List[int]:
+        pool = self._pools.get(key)
+        if not pool:
+            return []
+        if count == 1:
+            return [random.choice(pool.ids)]
+        return random.sample(pool.ids, min(count, len(pool)))
+
+
+class RedisQuestionIndex:
+    """Index des questions actives partagé entre workers via des sets Redis"""
+
+    PREFIX = "quiz:questions"
+
+    def __init__(self, url: str, timeout_seconds: float = REDIS_TIMEOUT_SECONDS):
+        import redis
+
+        self._redis = redis.Redis.from_url(
+            url, socket_connect_timeout=timeout_seconds, socket_timeout=timeout_seconds
+        )
+        self._redis.ping()
+
+    def _key(self, key: IndexKey) -> str:
+        return ":".join([self.PREFIX] + ["*" if part is None else str(part) for part in key])
+
+    def rebuild(self, entries: Iterable[Tuple[int, List[IndexKey]]]):
+        members: Dict[str, List[int]] = {}
+        for question_id, keys in entries:
+            for key in keys:
+                members.setdefault(self._key(key), []).append(question_id)
+
+        old_keys = list(self._redis.scan_iter(match=f"{self.PREFIX}:*"))
+        pipe = self._redis.pipeline(transaction=True)
+        if old_keys:
+            pipe.delete(*old_keys)
+        for redis_key, ids in members.items():
+            pipe.sadd(redis_key, *ids)
+        pipe.execute()
+
+    def add(self, question_id: int, keys: List[IndexKey]):
+        pipe = self._redis.pipeline(transaction=True)
+        for key in keys:
+            pipe.sadd(self._key(key), question_id)
+        pipe.execute()
+
+    def discard(self, question_id: int, keys: List[IndexKey]):
+        pipe = self._redis.pipeline(transaction=True)
+        for key in keys:
+            pipe.srem(self._key(key), question_id)
+        pipe.execute()
+
+    def sample(self, key: IndexKey, count: int) -> List[int]:
+        # SRANDMEMBER avec un nombre positif renvoie des membres distincts
+        return [int(member) for member in self._redis.srandmember(self._key(key), count)]
+
+
+class QuestionSampler:
+    """Tirage uniforme de questions actives sans trier la table"""
+
+    def __init__(self, index, refresh_seconds: int = 300):
+        self._index = index
+        self._refresh_seconds = refresh_seconds
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._members: Dict[int, IndexKey] = {}
+        self._loaded_at: Optional[float] = None
+        self._version: Optional[int] = None
+
+    def configure(self):
+        """Choisir l'index selon la configuration (au démarrage, pas à l'import du module).
+
+        Avec QUESTION_SAMPLER_BACKEND=redis, l'index passe dans Redis si le serveur répond;
+        sinon l'index reste en mémoire. L'index est reconstruit au prochain ensure_fresh.
+        """
+        if settings.QUESTION_SAMPLER_BACKEND != "redis" or not settings.REDIS_URL:
+            return
+        try:
+            index = RedisQuestionIndex(settings.REDIS_URL)
+        except Exception as e:
+            logger.warning(f"⚠️  Redis indisponible, index des questions en mémoire: {e}")
+            return
+        with self._lock:
+            self._index = index
+            self._loaded_at = None
+
+    def refresh(self, db: Session):
+        """Reconstruire l'index complet en une seule requête"""
+        # Version lue avant les lignes : une écriture concurrente provoquera un nouveau rechargement
+        version = current_bank_version(db)
+        rows = db.query(
+            Question.id,
+            Question.technology_id,
+            Question.category_id,
+            Question.difficulty
+        ).filter(Question.is_active == True).all()
+
+        with self._lock:
+            self._members = {row.id: (row.technology_id, row.category_id, row.difficulty) for row in rows}
+            self._index.rebuild(
+                (question_id, index_keys(*member)) for question_id, member in self._members.items()
+            )
+            self._loaded_at = time.monotonic()
+            self._version = version
+
+        logger.info(f"🎲 Index de tirage reconstruit: {len(rows)} questions actives")
+
+    def ensure_fresh(self, db: Session):
+        """Recharger l'index s'il n'a jamais été chargé, s'il est trop ancien ou si la banque a changé.
+
+        La version couvre les écritures que les hooks ORM ne voient pas : INSERT Core des
+        imports, autres workers.
+        """
+        if not self._is_stale(db):
+            return
+        with self._refresh_lock:
+            # Une seule reconstruction quand plusieurs requêtes voient l'index périmé
+            if self._is_stale(db):
+                self.refresh(db)
+
+    def _is_stale(self, db: Session) -> bool:
+        loaded_at = self._loaded_at
+        return loaded_at is None or time.monotonic() - loaded_at > self._refresh_seconds \
+            or bank_version.get(db) != self._version
+
+    def upsert(self, question_id: int, technology_id: int, category_id: int,
+               difficulty: Optional[int], is_active: bool = True):
+        """Mettre à jour l'index pour une question créée ou modifiée"""
+        with self._lock:
+            self._remove_locked(question_id)
+            if is_active:
+                member = (technology_id, category_id, difficulty)
+                self._members[question_id] = member
+                self._index.add(question_id, index_keys(*member))
+
+    def remove(self, question_id: int):
+        """Retirer une question de l'index"""
+        with self._lock:
+            self._remove_locked(question_id)
+
+    def _remove_locked(self, question_id: int):
+        member = self._members.pop(question_id, None)
+        if member is not None:
+            self._index.discard(question_id, index_keys(*member))
+
+    def sample(self, technology_id: Optional[int] = None, category_id: Optional[int] = None,
+               difficulty: Optional[int] = None, count: int = 1) -> List[int]:
+        """Tirer jusqu'à `count` ids distincts correspondant aux filtres"""
+        if count < 1:
+            return []
+        with self._lock:
+            return self._index.sample((technology_id, category_id, difficulty), count)
+
+    def choice(self, technology_id: Optional[int] = None, category_id: Optional[int] = None,
+               difficulty: Optional[int] = None) -> Optional[int]:
+        """Tirer un id uniformément parmi les questions correspondantes"""
+        ids = self.sample(technology_id, category_id, difficulty, 1)
+        return ids[0] if ids else None
+
+
+# Index en mémoire jusqu'à configure() (événement de démarrage de l'application)
+question_sampler = QuestionSampler(MemoryQuestionIndex(), settings.QUESTION_INDEX_REFRESH_SECONDS)
+
+
+def pick_random_questions(
+    db: Session,
+    technology_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    difficulty: Optional[int] = None,
+    count: int = 1,
+    max_attempts: int = 3
+) -> List[Dict]:
+    """Récupérer `count` questions aléatoires distinctes, sérialisées (lecture par clé primaire)"""
+    question_sampler.ensure_fresh(db)
+
+    found: Dict[int, Dict] = {}
+    for _ in range(max_attempts):
+        ids = question_sampler.sample(technology_id, category_id, difficulty, count)
+        wanted = [question_id for question_id in ids if question_id not in found]
+        if not wanted:
+            break
+
+        for question in fetch_questions_by_ids(db, wanted):
+            found[question["id"]] = question
+
+        # Les ids absents sont obsolètes (question supprimée ou désactivée ailleurs)
+        stale = set(wanted) - set(found)
+        for question_id in stale:
+            question_sampler.remove(question_id)
+
+        if not stale or len(found) >= count:
+            break
+
+    return list(found.values())[:count]
+
+
+# === Mise à jour incrémentale de l'index sur les écritures ORM ===
+
+_PENDING_KEY = "question_sampler_pending"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_question_changes(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Question) and obj.id is not None:
+            pending[obj.id] = (obj.technology_id, obj.category_id, obj.difficulty, bool(obj.is_active))
+    for obj in session.deleted:
+        if isinstance(obj, Question) and obj.id is not None:
+            pending[obj.id] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_question_changes(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    for question_id, change in pending.items():
+        if change is None:
+            question_sampler.remove(question_id)
+        else:
+            question_sampler.upsert(question_id, *change)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_question_changes(session):
+    session.info.pop(_PENDING_KEY, None)
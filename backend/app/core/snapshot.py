@@ -0,0 +1,157 @@
+import logging
+import random
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .bank_version import current_bank_version
+from .catalog import CatalogMaps, load_catalog, resolve_filters
+from .queries import questions_select, serialize_question_row
+from .sampling import IndexKey, index_keys
+from .config import settings
+from ..models.database_models import Question
+
+logger = logging.getLogger("quiz_app.snapshot")
+
+
+class QuestionRecord:
+    """Question en lecture seule telle que servie par l'API"""
+
+    __slots__ = (
+        "id", "technology_id", "category_id", "question_text", "options",
+        "difficulty", "images", "tags", "technology", "category"
+    )
+
+    def __init__(self, data: Dict):
+        for name in self.__slots__:
+            value = data[name]
+            if name in ("options", "tags") and value is not None:
+                value = tuple(value)
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("QuestionRecord est immuable")
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "technology_id": self.technology_id,
+            "category_id": self.category_id,
+            "question_text": self.question_text,
+            "options": list(self.options),
+            "difficulty": self.difficulty,
+            "images": self.images,
+            "tags": list(self.tags) if self.tags is not None else None,
+            "technology": self.technology,
+            "category": self.category
+        }
+
+
+class QuestionSnapshot:
+    """Banque de questions actives figée, indexée par filtre et par tag"""
+
+    __slots__ = ("version", "catalog", "by_id", "by_filter", "by_tag")
+
+    def __init__(self, version: int, catalog: CatalogMaps, records: List[QuestionRecord]):
+        by_filter: Dict[IndexKey, List[QuestionRecord]] = {}
+        by_tag: Dict[str, List[QuestionRecord]] = {}
+        for record in records:
+            for key in index_keys(record.technology_id, record.category_id, record.difficulty):
+                by_filter.setdefault(key, []).append(record)
+            for tag in record.tags or ():
+                by_tag.setdefault(tag, []).append(record)
+
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "catalog", catalog)
+        object.__setattr__(self, "by_id", {record.id: record for record in records})
+        object.__setattr__(self, "by_filter", {key: tuple(items) for key, items in by_filter.items()})
+        object.__setattr__(self, "by_tag", {tag: tuple(items) for tag, items in by_tag.items()})
+
+    def __setattr__(self, name, value):
+        raise AttributeError("QuestionSnapshot est immuable")
+
+    def resolve(self, technology: Optional[str], category: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+        return resolve_filters(self.catalog, technology, category)
+
+    def matching(self, technology_id: Optional[int] = None, category_id: Optional[int] = None,
+                 difficulty: Optional[int] = None) -> Tuple[QuestionRecord, ...]:
+        return self.by_filter.get((technology_id, category_id, difficulty or None), ())
+
+    def questions(self, technology_id: Optional[int] = None, category_id: Optional[int] = None,
+                  difficulty: Optional[int] = None, limit: Optional[int] = None) -> List[Dict]:
+        records = self.matching(technology_id, category_id, difficulty)
+        if limit is not None:
+            records = records[:max(limit, 0)]
+        return [record.to_dict() for record in records]
+
+    def with_tag(self, tag: str) -> Tuple[QuestionRecord, ...]:
+        return self.by_tag.get(tag, ())
+
+    def sample(self, technology_id: Optional[int] = None, category_id: Optional[int] = None,
+               difficulty: Optional[int] = None, count: int = 1) -> List[Dict]:
+        records = self.matching(technology_id, category_id, difficulty)
+        if not records or count < 1:
+            return []
+        picked = random.sample(records, min(count, len(records)))
+        return [record.to_dict() for record in picked]
+
+
+class QuestionSnapshotStore:
+    """Détient le snapshot courant et le remplace quand la version en base change"""
+
+    def __init__(self, poll_seconds: int = 5):
+        self._poll_seconds = poll_seconds
+        self._snapshot: Optional[QuestionSnapshot] = None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def current(self) -> Optional[QuestionSnapshot]:
+        return self._snapshot
+
+    def load(self, db: Session) -> QuestionSnapshot:
+        """Construire un nouveau snapshot et le publier d'un seul coup"""
+        with self._reload_lock:
+            version = current_bank_version(db)
+            catalog = load_catalog(db)
+            rows = db.execute(questions_select().order_by(Question.id)).all()
+            snapshot = QuestionSnapshot(version, catalog, [QuestionRecord(serialize_question_row(row)) for row in rows])
+            # L'affectation d'une référence est atomique : les lecteurs voient l'ancien ou le nouveau
+            self._snapshot = snapshot
+
+        logger.info(f"📸 Snapshot des questions v{version}: {len(snapshot.by_id)} questions actives")
+        return snapshot
+
+    def reload_if_changed(self, db: Session) -> bool:
+        version = current_bank_version(db)
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return False
+        self.load(db)
+        return True
+
+    def start_polling(self, session_factory: Callable[[], Session]):
+        """Surveiller le compteur de version dans un thread d'arrière-plan"""
+        if self._thread is not None:
+            return
+
+        def poll():
+            while not self._stop.wait(self._poll_seconds):
+                db = session_factory()
+                try:
+                    self.reload_if_changed(db)
+                except Exception as e:
+                    logger.error(f"❌ Erreur lors du rafraîchissement du snapshot: {e}", exc_info=True)
+                finally:
+                    db.close()
+
+        self._thread = threading.Thread(target=poll, name="question-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+
+question_snapshot = QuestionSnapshotStore(settings.QUESTION_SNAPSHOT_POLL_SECONDS)
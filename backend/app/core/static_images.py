@@ -0,0 +1,206 @@
+import mimetypes
+import os
+import re
+import stat
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+from .compression import accepted_encodings
+from .image_store import MANIFEST_NAME, PRECOMPRESSED_ENCODINGS, PRECOMPRESSED_EXTENSIONS
+
+# Fichiers nommés par empreinte SHA-256 (originaux et variantes "-320w") : contenu immuable
+CONTENT_HASHED_NAME = re.compile(r"^(?P<digest>[0-9a-f]{64})(?:-\d+w)?\.[a-z0-9]+$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+ZEROCOPY_SEND = "http.response.zerocopysend"
+READ_CHUNK_SIZE = 64 * 1024
+
+_BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # Comparaison faible pour If-None-Match : W/"x" et "x" désignent la même représentation
+    return "*" in candidates or any(
+        (candidate[2:] if candidate.startswith("W/") else candidate) == etag
+        for candidate in candidates
+    )
+
+
+def _not_modified_since(if_modified_since: str, mtime: float) -> bool:
+    try:
+        return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+def parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    """(début, longueur) d'une plage "bytes=a-b" unique.
+
+    Retourne None si l'en-tête est ignoré (syntaxe inconnue, plages multiples) : le fichier
+    est alors servi entier. Lève ValueError si la plage ne peut pas être satisfaite.
+    """
+    match = _BYTE_RANGE.match(range_header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffixe : les N derniers octets
+        length = min(int(last), size)
+        if length == 0:
+            raise ValueError(range_header)
+        return size - length, length
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError(range_header)
+    return start, end - start + 1
+
+
+class ImageFileResponse(Response):
+    """Envoi d'un fichier (ou d'une plage d'octets) sans le charger en mémoire.
+
+    Si le serveur ASGI annonce l'extension zero-copy, le descripteur est passé au serveur
+    (sendfile); sinon le fichier est lu par blocs dans un thread.
+    """
+
+    def __init__(self, path: str, offset: int, length: int, status_code: int,
+                 headers: dict, method: str = "GET"):
+        self.path = path
+        self.offset = offset
+        self.length = length
+        self.send_header_only = method.upper() == "HEAD"
+        super().__init__(status_code=status_code, headers={**headers, "content-length": str(length)})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.send_header_only or self.length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if ZEROCOPY_SEND in scope.get("extensions", {}):
+            with open(self.path, "rb") as file:
+                await send({
+                    "type": ZEROCOPY_SEND,
+                    "file": file,
+                    "offset": self.offset,
+                    "count": self.length,
+                    "more_body": False,
+                })
+            return
+
+        async with await anyio.open_file(self.path, "rb") as file:
+            await file.seek(self.offset)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await file.read(min(READ_CHUNK_SIZE, remaining))
+                # Fichier tronqué entre stat() et la lecture : on termine la réponse
+                remaining = remaining - len(chunk) if chunk else 0
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+
+
+class ImageFiles(StaticFiles):
+    """Images des questions servies avec cache HTTP long, requêtes conditionnelles et plages.
+
+    Les fichiers nommés par empreinte de contenu (voir ImageStore) ne changent jamais pour une
+    URL donnée : ils sont marqués `immutable` pour un an avec l'empreinte comme ETag fort. Les
+    autres fichiers sont revalidés à chaque usage (ETag taille + date de modification). Les SVG
+    sont servis dans leur version précompressée (.br, .gz) si le client l'accepte.
+    """
+
+    async def check_config(self) -> None:
+        # Le dossier n'existe qu'après le premier import d'images : 404 en attendant
+        if self.directory is not None and not os.path.isdir(self.directory):
+            return
+        await super().check_config()
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        name = os.path.basename(path)
+        # Ni le manifeste (chemins des sources), ni les fichiers temporaires
+        if name == MANIFEST_NAME or name.startswith("."):
+            raise HTTPException(status_code=404)
+        return await super().get_response(path, scope)
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope,
+                      status_code: int = 200) -> Response:
+        full_path = str(full_path)
+        request_headers = Headers(scope=scope)
+        name = os.path.basename(full_path)
+        hashed = CONTENT_HASHED_NAME.match(name)
+
+        etag = f'"{name}"' if hashed else f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+        headers = {
+            "content-type": mimetypes.guess_type(name)[0] or "application/octet-stream",
+            "cache-control": IMMUTABLE_CACHE_CONTROL if hashed else REVALIDATE_CACHE_CONTROL,
+            "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+            "accept-ranges": "bytes",
+        }
+
+        path, size = full_path, stat_result.st_size
+        if os.path.splitext(name)[1].lower() in PRECOMPRESSED_EXTENSIONS:
+            headers["vary"] = "Accept-Encoding"
+            accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+            for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+                if encoding not in accepted:
+                    continue
+                try:
+                    compressed = os.stat(full_path + suffix)
+                except OSError:
+                    continue
+                if stat.S_ISREG(compressed.st_mode):
+                    path, size = full_path + suffix, compressed.st_size
+                    headers["content-encoding"] = encoding
+                    # Une ETag par représentation : la version compressée a ses propres octets
+                    etag = f'{etag[:-1]}-{encoding}"'
+                    break
+        headers["etag"] = etag
+
+        if status_code == 200 and self._not_modified(request_headers, etag, stat_result.st_mtime):
+            return NotModifiedResponse(Headers(headers))
+
+        offset, length = 0, size
+        range_header = request_headers.get("range")
+        if status_code == 200 and range_header and self._range_applies(request_headers, etag, headers):
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                return Response(status_code=416, headers={
+                    "content-range": f"bytes */{size}",
+                    "cache-control": headers["cache-control"],
+                })
+            if byte_range:
+                offset, length = byte_range
+                status_code = 206
+                headers["content-range"] = f"bytes {offset}-{offset + length - 1}/{size}"
+
+        return ImageFileResponse(path, offset, length, status_code, headers, scope["method"])
+
+    @staticmethod
+    def _not_modified(request_headers: Headers, etag: str, mtime: float) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            # If-None-Match prime sur If-Modified-Since (RFC 9110 §13.1.3)
+            return _etag_matches(if_none_match, etag)
+        if_modified_since = request_headers.get("if-modified-since")
+        return if_modified_since is not None and _not_modified_since(if_modified_since, mtime)
+
+    @staticmethod
+    def _range_applies(request_headers: Headers, etag: str, headers: dict) -> bool:
+        """If-Range : la plage ne vaut que si la représentation n'a pas changé"""
+        if_range = request_headers.get("if-range")
+        if if_range is None:
+            return True
+        if_range = if_range.strip()
+        if if_range.startswith('"'):
+            # Comparaison forte exigée pour les plages
+            return if_range == etag
+        return if_range == headers["last-modified"]
@@ -1,19 +1,35 @@
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Body, Depends, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import case, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.sql import func
 
 from . import schemas
-from .core.db import get_db, engine, Base, SessionLocal
+from .core.db import get_db, get_read_db, run_db, engine, async_engine, Base, SessionLocal
 from .core.init_data import init_database
-from .core.auth import get_current_active_user, get_optional_current_user
+from .core.auth import get_current_principal, Principal
+from .core.sampling import question_sampler, pick_random_questions
+from .core.answer_key import answer_key_cache
+from .core.queries import fetch_questions, fetch_technologies
+from .core.catalog import catalog_cache
+from .core.snapshot import question_snapshot
+from .core.rollups import record_completed_session
+from .core.pagination import keyset_page, set_next_cursor
+from .core.hashing import hashing_pool
+from .core.pool import pool_stats
+from .core.static_images import ImageFiles
+from .core.compression import CompressionMiddleware
+from .core import password_policy
+from .core.config import settings
 from .api.endpoints import auth, dashboard
-from .models.database_models import User, Technology, Question, QuizSession
+from .models.database_models import User, Technology, Question, QuizSession, QuizAnswer, install_question_bank_triggers
 
 # Configuration du logging
 def setup_simple_logging():
@@ -38,11 +54,15 @@ logger = logging.getLogger("quiz_app")
 
 # Créer les tables si elles n'existent pas
 Base.metadata.create_all(bind=engine)
+# Triggers du compteur de version (bases créées avant lui, sans la migration 002)
+install_question_bank_triggers(engine)
 
 app = FastAPI(
     title="Quiz IT API",
     description="API pour quiz multi-technologies avec authentification",
-    version="2.0.0"
+    version="2.0.0",
+    # orjson : sérialisation des réponses plusieurs fois plus rapide que json
+    default_response_class=ORJSONResponse
 )
 
 # Middleware CORS - Configuration plus robuste
@@ -55,6 +75,14 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+# Compression des réponses JSON volumineuses (/questions, /dashboard/me...)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.GZIP_COMPRESSION_LEVEL,
+    brotli_quality=settings.BROTLI_QUALITY,
+)
+
 @app.on_event("startup")
 def startup_event():
     """Initialisation au démarrage"""
@@ -77,6 +105,18 @@ def startup_event():
             logger.info(f"   - {tech_count} technologies")
             logger.info(f"   - {question_count} questions")
         
+        # Politique de hachage des mots de passe (benchmark de l'hôte)
+        password_policy.get_context()
+        
+        # Index de tirage aléatoire des questions (Redis si configuré et joignable)
+        question_sampler.configure()
+        question_sampler.refresh(db)
+        
+        # Mode snapshot : banque de questions servie depuis la mémoire
+        if settings.QUESTION_SNAPSHOT_ENABLED:
+            question_snapshot.load(db)
+            question_snapshot.start_polling(SessionLocal)
+        
         db.close()
         logger.info("✅ Application démarrée avec succès")
         
@@ -84,12 +124,23 @@ def startup_event():
         logger.error(f"❌ Erreur lors de l'initialisation: {e}", exc_info=True)
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Arrêt propre des tâches d'arrière-plan"""
+    question_snapshot.stop()
+    hashing_pool.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
+
 # Inclusion des routes d'authentification
 app.include_router(auth.router, prefix="/auth", tags=["authentification"])
 
 # Inclusion des routes du dashboard
 app.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
 
+# Images des questions (URLs par empreinte de contenu, cache immuable côté client)
+app.mount("/static/images", ImageFiles(directory=settings.IMAGES_DIR, check_dir=False), name="images")
+
 @app.get("/")
 def read_root():
     """Page d'accueil de l'API"""
@@ -119,180 +170,128 @@ def test_endpoint():
 
 @app.get("/technologies-debug")
 def get_technologies_debug(db: Session = Depends(get_db)):
-    """Debug des technologies sans schéma Pydantic"""
+    """Debug des technologies (même sérialisation que /technologies)"""
     try:
-        from .models.database_models import Technology
-        technologies = db.query(Technology).filter(Technology.is_active == True).all()
-        
-        result = []
-        for tech in technologies:
-            result.append({
-                "id": tech.id,
-                "name": tech.name,
-                "display_name": tech.display_name,
-                "description": tech.description,
-                "icon": tech.icon,
-                "color": tech.color,
-                "is_active": tech.is_active,
-                "created_at": str(tech.created_at)
-            })
-        
+        result = fetch_technologies(db)
         return {"technologies": result, "count": len(result)}
     except Exception as e:
         return {"error": str(e), "type": str(type(e))}
 
+@app.get("/debug/pool")
+def debug_pool():
+    """Debug - État et temps d'attente des pools de connexions"""
+    return {
+        "mode": settings.DB_POOL_MODE,
+        "pgbouncer": settings.DB_PGBOUNCER,
+        "sync": pool_stats(engine),
+        "async": pool_stats(async_engine)
+    }
+
 # === ROUTES TECHNOLOGIES ===
 
-@app.get("/technologies")
-def get_technologies(db: Session = Depends(get_db)):
+# Les routes de lecture renvoient des lignes déjà sérialisées (core/queries.py) directement
+# en JSON : response_model sert à la documentation, sans revalidation objet par objet.
+
+@app.get("/technologies", response_model=List[schemas.Technology])
+async def get_technologies(db = Depends(get_read_db)):
     """Récupérer toutes les technologies"""
     logger.info("Récupération des technologies")
     
     try:
-        from .models.database_models import Technology
-        technologies = db.query(Technology).filter(Technology.is_active == True).all()
-        
-        # Sérialisation manuelle pour éviter les problèmes Pydantic
-        result = []
-        for tech in technologies:
-            result.append({
-                "id": tech.id,
-                "name": tech.name,
-                "display_name": tech.display_name,
-                "description": tech.description,
-                "icon": tech.icon,
-                "color": tech.color,
-                "is_active": tech.is_active
-            })
+        result = await run_db(db, fetch_technologies)
         
         logger.info(f"✅ {len(result)} technologies récupérées")
-        return result
+        return ORJSONResponse(result)
         
     except Exception as e:
         logger.error(f"❌ Erreur lors de la récupération des technologies: {e}", exc_info=True)
-        return {"error": str(e)}
+        return ORJSONResponse({"error": str(e)})
+
+def _list_technology_categories(db: Session, tech_name: str):
+    from .models.database_models import Category
+    
+    technology_id = catalog_cache.technology_id(db, tech_name)
+    if technology_id is None:
+        return None
+    return db.query(Category).filter(Category.technology_id == technology_id).all()
 
 @app.get("/technologies/{tech_name}/categories", response_model=List[schemas.Category])
-def get_technology_categories(tech_name: str, db: Session = Depends(get_db)):
+async def get_technology_categories(tech_name: str, db = Depends(get_read_db)):
     """Récupérer les catégories d'une technologie"""
     logger.info(f"Récupération des catégories pour: {tech_name}")
     
-    from .models.database_models import Technology, Category
-    
-    tech = db.query(Technology).filter(Technology.name == tech_name).first()
-    if not tech:
+    categories = await run_db(db, _list_technology_categories, tech_name)
+    if categories is None:
         raise HTTPException(status_code=404, detail="Technologie non trouvée")
-    
-    categories = db.query(Category).filter(Category.technology_id == tech.id).all()
     return categories
 
 # === ROUTES QUESTIONS ===
 
-@app.get("/questions")
-def get_questions(
+def _list_questions(db: Session, technology: str, category: str, difficulty: int, limit: int) -> List[dict]:
+    technology_id, category_id = catalog_cache.resolve(db, technology, category)
+    
+    # Une seule requête jointe, sérialisée directement
+    return fetch_questions(db, technology_id, category_id, difficulty, limit)
+
+def _sample_questions(db: Session, technology: str, category: str, difficulty: int, count: int = 1) -> List[dict]:
+    technology_id, category_id = catalog_cache.resolve(db, technology, category)
+    
+    # Tirage dans l'index en mémoire puis lecture par clé primaire
+    return pick_random_questions(db, technology_id, category_id, difficulty or None, count)
+
+@app.get("/questions", response_model=List[schemas.QuestionItem])
+async def get_questions(
     technology: str = None,
     category: str = None,
     difficulty: int = None,
     limit: int = 10,
-    db: Session = Depends(get_db)
+    db = Depends(get_read_db)
 ):
     """Récupérer les questions (sans les bonnes réponses)"""
     logger.info(f"Récupération des questions - tech: {technology}, cat: {category}, diff: {difficulty}")
     
-    from .models.database_models import Question, Technology, Category
-    
     try:
-        query = db.query(Question).filter(Question.is_active == True)
-        
-        if technology:
-            tech = db.query(Technology).filter(Technology.name == technology).first()
-            if tech:
-                query = query.filter(Question.technology_id == tech.id)
-        
-        if category:
-            cat = db.query(Category).filter(Category.name == category).first()
-            if cat:
-                query = query.filter(Question.category_id == cat.id)
-        
-        if difficulty:
-            query = query.filter(Question.difficulty == difficulty)
-        
-        questions = query.limit(limit).all()
-        
-        # Sérialisation manuelle pour éviter les problèmes Pydantic
-        result = []
-        for q in questions:
-            import json
-            result.append({
-                "id": q.id,
-                "technology_id": q.technology_id,
-                "category_id": q.category_id,
-                "question_text": q.question_text,
-                "options": json.loads(q.options) if isinstance(q.options, str) else q.options,
-                "difficulty": q.difficulty,
-                "images": q.images,
-                "tags": json.loads(q.tags) if isinstance(q.tags, str) else q.tags,
-                "technology": q.technology.name if q.technology else None,
-                "category": q.category.name if q.category else None
-            })
+        snapshot = question_snapshot.current
+        if snapshot is not None:
+            technology_id, category_id = snapshot.resolve(technology, category)
+            result = snapshot.questions(technology_id, category_id, difficulty, limit)
+        else:
+            result = await run_db(db, _list_questions, technology, category, difficulty, limit)
         
         logger.info(f"✅ {len(result)} questions récupérées")
-        return result
+        return ORJSONResponse(result)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"❌ Erreur lors de la récupération des questions: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Erreur serveur")
 
-@app.get("/questions/random")
-def get_random_question(
+@app.get("/questions/random", response_model=schemas.QuestionItem)
+async def get_random_question(
     technology: str = None,
     category: str = None,
     difficulty: int = None,
-    db: Session = Depends(get_db)
+    db = Depends(get_read_db)
 ):
     """Récupérer une question aléatoire"""
     logger.info(f"Récupération question aléatoire - tech: {technology}")
     
-    from .models.database_models import Question, Technology, Category
-    
     try:
-        query = db.query(Question).filter(Question.is_active == True)
-        
-        if technology:
-            tech = db.query(Technology).filter(Technology.name == technology).first()
-            if tech:
-                query = query.filter(Question.technology_id == tech.id)
-        
-        if category:
-            cat = db.query(Category).filter(Category.name == category).first()
-            if cat:
-                query = query.filter(Question.category_id == cat.id)
-        
-        if difficulty:
-            query = query.filter(Question.difficulty == difficulty)
-        
-        question = query.order_by(func.random()).first()
+        snapshot = question_snapshot.current
+        if snapshot is not None:
+            technology_id, category_id = snapshot.resolve(technology, category)
+            questions = snapshot.sample(technology_id, category_id, difficulty)
+        else:
+            questions = await run_db(db, _sample_questions, technology, category, difficulty)
         
-        if question is None:
+        if not questions:
             logger.warning("❌ Aucune question aléatoire trouvée")
             raise HTTPException(status_code=404, detail="Aucune question trouvée")
         
-        logger.info(f"✅ Question aléatoire récupérée: ID {question.id}")
-        
-        # Sérialisation manuelle pour éviter les problèmes Pydantic
-        import json
-        return {
-            "id": question.id,
-            "technology_id": question.technology_id,
-            "category_id": question.category_id,
-            "question_text": question.question_text,
-            "options": json.loads(question.options) if isinstance(question.options, str) else question.options,
-            "difficulty": question.difficulty,
-            "images": question.images,
-            "tags": json.loads(question.tags) if isinstance(question.tags, str) else question.tags,
-            "technology": question.technology.name if question.technology else None,
-            "category": question.category.name if question.category else None
-        }
+        question = questions[0]
+        logger.info(f"✅ Question aléatoire récupérée: ID {question['id']}")
+        return ORJSONResponse(question)
         
     except HTTPException:
         raise
@@ -300,12 +299,40 @@ def get_random_question(
         logger.error(f"❌ Erreur lors de la récupération d'une question aléatoire: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Erreur serveur")
 
+@app.get("/questions/sample", response_model=List[schemas.QuestionItem])
+async def get_question_sample(
+    technology: str = None,
+    category: str = None,
+    difficulty: int = None,
+    count: int = Query(10, ge=1, le=100),
+    db = Depends(get_read_db)
+):
+    """Tirer plusieurs questions aléatoires distinctes (pour démarrer un quiz)"""
+    logger.info(f"Tirage de {count} questions - tech: {technology}, cat: {category}, diff: {difficulty}")
+    
+    try:
+        snapshot = question_snapshot.current
+        if snapshot is not None:
+            technology_id, category_id = snapshot.resolve(technology, category)
+            result = snapshot.sample(technology_id, category_id, difficulty, count)
+        else:
+            result = await run_db(db, _sample_questions, technology, category, difficulty, count)
+        
+        logger.info(f"✅ {len(result)} questions tirées")
+        return ORJSONResponse(result)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ Erreur lors du tirage des questions: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Erreur serveur")
+
 # === ROUTES QUIZ SESSIONS (authentification requise) ===
 
 @app.post("/quiz/start", response_model=schemas.QuizSession)
 def start_quiz(
     quiz_data: schemas.QuizSessionCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Démarrer une nouvelle session de quiz"""
@@ -330,15 +357,167 @@ def start_quiz(
     logger.info(f"✅ Session de quiz créée: {session.id}")
     return session
 
+@app.post("/quiz/{session_id}/answers", response_model=schemas.QuizAnswerBatchResult)
+def submit_quiz_answers(
+    session_id: int,
+    answers: List[schemas.QuizAnswerCreate] = Body(..., min_items=1, max_items=settings.QUIZ_ANSWERS_MAX_BATCH),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Enregistrer un lot de réponses en une seule insertion (une réponse par question)"""
+    logger.info(f"Soumission de {len(answers)} réponses pour la session {session_id}")
+    
+    # Verrou sur la session : un /finish concurrent attend la fin de l'insertion
+    session = db.query(QuizSession.id, QuizSession.status, QuizSession.technology_id).filter(
+        QuizSession.id == session_id,
+        QuizSession.user_id == current_user.id
+    ).with_for_update().first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session de quiz non trouvée")
+    if session.status != "in_progress":
+        raise HTTPException(status_code=409, detail="Session de quiz déjà terminée")
+    
+    if any(answer.quiz_session_id != session_id for answer in answers):
+        raise HTTPException(status_code=400, detail="Réponse rattachée à une autre session")
+    
+    question_ids = [answer.question_id for answer in answers]
+    if len(set(question_ids)) != len(question_ids):
+        raise HTTPException(status_code=400, detail="Plusieurs réponses à la même question dans le lot")
+    
+    # Correction à partir du cache des bonnes réponses
+    answer_keys = answer_key_cache.get_many(db, question_ids)
+    unknown = set(question_ids) - answer_keys.keys()
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Questions non trouvées: {sorted(unknown)}")
+    
+    # Seules les questions actives de la technologie de la session comptent dans le score
+    ineligible = sorted(
+        question_id for question_id in question_ids
+        if not answer_keys[question_id].is_active
+        or answer_keys[question_id].technology_id != session.technology_id
+    )
+    if ineligible:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Questions hors de la technologie du quiz ou désactivées: {ineligible}"
+        )
+    correct_answers = {question_id: key.correct_answer for question_id, key in answer_keys.items()}
+    
+    rows = [
+        {
+            "quiz_session_id": session_id,
+            "question_id": answer.question_id,
+            "user_answer": answer.user_answer,
+            "is_correct": answer.user_answer == correct_answers[answer.question_id],
+            "time_spent_seconds": answer.time_spent_seconds
+        }
+        for answer in answers
+    ]
+    
+    # Les questions déjà répondues dans la session sont ignorées (première réponse conservée)
+    saved_ids = set(db.execute(
+        pg_insert(QuizAnswer).values(rows)
+        .on_conflict_do_nothing(constraint="uq_quiz_answers_session_question")
+        .returning(QuizAnswer.question_id)
+    ).scalars())
+    db.commit()
+    
+    results = [
+        {
+            "question_id": row["question_id"],
+            "user_answer": row["user_answer"],
+            "is_correct": row["is_correct"],
+            "correct_answer": correct_answers[row["question_id"]]
+        }
+        for row in rows if row["question_id"] in saved_ids
+    ]
+    correct = sum(1 for result in results if result["is_correct"])
+    logger.info(f"✅ {len(results)} réponses enregistrées ({correct} correctes) pour la session {session_id}")
+    return {
+        "quiz_session_id": session_id,
+        "saved": len(results),
+        "correct": correct,
+        "results": results,
+        "already_answered": [question_id for question_id in question_ids if question_id not in saved_ids]
+    }
+
+@app.post("/quiz/{session_id}/finish", response_model=schemas.QuizSession)
+def finish_quiz(
+    session_id: int,
+    finish_data: schemas.QuizSessionFinish = None,
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Terminer une session : score calculé et enregistré en un seul UPDATE"""
+    logger.info(f"Fin du quiz {session_id} pour {current_user.username}")
+    
+    answers = QuizAnswer.quiz_session_id == QuizSession.id
+    total = select(func.count(QuizAnswer.id)).where(answers).scalar_subquery()
+    correct = select(func.count(QuizAnswer.id)).where(answers, QuizAnswer.is_correct == True).scalar_subquery()
+    
+    if finish_data and finish_data.time_spent_seconds is not None:
+        time_spent = finish_data.time_spent_seconds
+    else:
+        time_spent = select(
+            func.coalesce(func.sum(QuizAnswer.time_spent_seconds), 0)
+        ).where(answers).scalar_subquery()
+    
+    stmt = (
+        update(QuizSession)
+        .where(
+            QuizSession.id == session_id,
+            QuizSession.user_id == current_user.id,
+            QuizSession.status == "in_progress"
+        )
+        .values(
+            status="completed",
+            completed_at=func.now(),
+            total_questions=total,
+            correct_answers=correct,
+            score_percentage=case(
+                (total > 0, func.round(correct * 100.0 / total)),
+                else_=0
+            ),
+            time_spent_seconds=time_spent
+        )
+        .returning(*QuizSession.__table__.c)
+        .execution_options(synchronize_session=False)
+    )
+    
+    finished = db.execute(stmt).mappings().first()
+    if finished is None:
+        db.rollback()
+        exists = db.query(QuizSession.id).filter(
+            QuizSession.id == session_id,
+            QuizSession.user_id == current_user.id
+        ).first()
+        if not exists:
+            raise HTTPException(status_code=404, detail="Session de quiz non trouvée")
+        raise HTTPException(status_code=409, detail="Session de quiz déjà terminée")
+    
+    # Rollups du dashboard mis à jour dans la même transaction que la fin du quiz
+    record_completed_session(db, session_id)
+    db.commit()
+    
+    logger.info(f"✅ Quiz {session_id} terminé: {finished['score_percentage']}%")
+    return dict(finished)
+
 @app.get("/quiz/sessions", response_model=List[schemas.QuizSession])
 def get_user_quiz_sessions(
-    current_user: User = Depends(get_current_active_user),
+    response: Response,
+    limit: int = Query(20, ge=1, le=settings.HISTORY_PAGE_MAX_SIZE),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
-    """Récupérer les sessions de quiz de l'utilisateur"""
-    sessions = db.query(models.database_models.QuizSession).filter(
-        models.database_models.QuizSession.user_id == current_user.id
-    ).order_by(models.database_models.QuizSession.started_at.desc()).all()
+    """Récupérer les sessions de quiz de l'utilisateur, page par page (curseur dans X-Next-Cursor)"""
+    # Technologies chargées en une requête pour toute la page (schéma QuizSession imbriqué)
+    sessions, next_cursor = keyset_page(
+        db.query(QuizSession).options(selectinload(QuizSession.technology))
+        .filter(QuizSession.user_id == current_user.id),
+        QuizSession.started_at, QuizSession.id, cursor, limit
+    )
+    set_next_cursor(response, next_cursor)
     
     return sessions
 
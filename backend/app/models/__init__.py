@@ -1,4 +1,4 @@
 from .database_models import *
 from ..core.db import Base
 
-__all__ = ['Base', 'User', 'Technology', 'Category', 'Question', 'QuizSession', 'QuizAnswer'] 
\ No newline at end of file
+__all__ = ['Base', 'User', 'Technology', 'Category', 'Question', 'QuizSession', 'QuizAnswer', 'UserStats', 'UserTechnologyStats', 'UserDailyActivity', 'QuestionBankVersion'] 
\ No newline at end of file
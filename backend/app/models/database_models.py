@@ -1,4 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, JSON, UniqueConstraint
+import hashlib
+import json
+import unicodedata
+
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, Text, ForeignKey, Boolean, JSON, UniqueConstraint, Index, DDL, event
+from sqlalchemy import inspect, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..core.db import Base
@@ -9,7 +14,7 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(50), unique=True, index=True, nullable=False)
     email = Column(String(100), unique=True, index=True, nullable=False)
-    hashed_password = Column(String(100), nullable=False)
+    hashed_password = Column(String(255), nullable=False)  # bcrypt ou argon2
     full_name = Column(String(100))
     is_active = Column(Boolean, default=True)
     is_admin = Column(Boolean, default=False)
@@ -40,7 +45,7 @@ class Category(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), index=True, nullable=False)
     description = Column(Text)
-    technology_id = Column(Integer, ForeignKey("technologies.id"), nullable=False)
+    technology_id = Column(Integer, ForeignKey("technologies.id"), nullable=False, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relations
@@ -66,9 +71,24 @@ class Question(Base):
     images = Column(JSON)  # Stockage des images
     tags = Column(JSON)  # Liste des tags
     is_active = Column(Boolean, default=True)
+    content_hash = Column(String(64), nullable=False)  # Empreinte normalisée énoncé + options (question_content_hash)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Index partiels des filtres de /questions (technologie, catégorie, difficulté)
+    __table_args__ = (
+        # Une même question ne peut exister qu'une fois par technologie
+        Index('ix_questions_content_hash', 'technology_id', 'content_hash', unique=True),
+        Index(
+            'ix_questions_active_filters', 'technology_id', 'category_id', 'difficulty',
+            postgresql_where=is_active == True
+        ),
+        Index(
+            'ix_questions_active_category', 'category_id', 'difficulty',
+            postgresql_where=is_active == True
+        ),
+    )
+
     # Relations
     technology = relationship("Technology", back_populates="questions")
     category = relationship("Category", back_populates="questions")
@@ -88,6 +108,15 @@ class QuizSession(Base):
     started_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True))
 
+    # Index des pages d'historique (pagination par curseur sur (date, id))
+    __table_args__ = (
+        Index(
+            'ix_quiz_sessions_user_completed', 'user_id', completed_at.desc(), id.desc(),
+            postgresql_where=completed_at.isnot(None)
+        ),
+        Index('ix_quiz_sessions_user_started', 'user_id', started_at.desc(), id.desc()),
+    )
+
     # Relations
     user = relationship("User", back_populates="quiz_sessions")
     technology = relationship("Technology")
@@ -97,13 +126,140 @@ class QuizAnswer(Base):
     __tablename__ = "quiz_answers"
 
     id = Column(Integer, primary_key=True, index=True)
-    quiz_session_id = Column(Integer, ForeignKey("quiz_sessions.id"), nullable=False)
+    quiz_session_id = Column(Integer, ForeignKey("quiz_sessions.id"), nullable=False, index=True)
     question_id = Column(Integer, ForeignKey("questions.id"), nullable=False)
     user_answer = Column(String(500), nullable=False)
     is_correct = Column(Boolean, nullable=False)
     time_spent_seconds = Column(Integer, default=0)
     answered_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Une seule réponse par question et par session
+    __table_args__ = (
+        UniqueConstraint('quiz_session_id', 'question_id', name='uq_quiz_answers_session_question'),
+    )
+
     # Relations
     quiz_session = relationship("QuizSession", back_populates="quiz_answers")
-    question = relationship("Question", back_populates="quiz_answers")
\ No newline at end of file
+    question = relationship("Question", back_populates="quiz_answers")
+
+class UserStats(Base):
+    """Agrégats des sessions terminées d'un utilisateur, maintenus à la fin de chaque quiz"""
+    __tablename__ = "user_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_quizzes = Column(Integer, nullable=False, default=0)
+    score_sum = Column(BigInteger, nullable=False, default=0)
+    best_score = Column(Integer, nullable=False, default=0)
+    total_time_spent = Column(BigInteger, nullable=False, default=0)
+    last_completed_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class UserTechnologyStats(Base):
+    """Compteurs par technologie des sessions terminées d'un utilisateur"""
+    __tablename__ = "user_technology_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    technology_id = Column(Integer, ForeignKey("technologies.id", ondelete="CASCADE"), primary_key=True)
+    quiz_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(BigInteger, nullable=False, default=0)
+
+class UserDailyActivity(Base):
+    """Nombre de quiz terminés et somme des scores par utilisateur et par jour"""
+    __tablename__ = "user_daily_activity"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    quiz_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(BigInteger, nullable=False, default=0)
+
+class QuestionBankVersion(Base):
+    """Compteur incrémenté à chaque écriture sur la banque de questions"""
+    __tablename__ = "question_bank_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+# Fonction et triggers PostgreSQL maintenant le compteur (aussi créés par la migration 002)
+BUMP_QUESTION_BANK_VERSION = """
+CREATE OR REPLACE FUNCTION bump_question_bank_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE question_bank_version SET version = version + 1, updated_at = now() WHERE id = 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+QUESTION_BANK_TABLES = ("technologies", "categories", "questions")
+
+def _question_bank_trigger_sql(table_name: str) -> str:
+    return (
+        f"CREATE TRIGGER {table_name}_bump_question_bank_version "
+        f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table_name} "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION bump_question_bank_version()"
+    )
+
+def _question_bank_trigger(table_name: str) -> DDL:
+    return DDL(_question_bank_trigger_sql(table_name)).execute_if(dialect="postgresql")
+
+# Clé du verrou consultatif qui sérialise l'installation entre workers démarrant ensemble
+QUESTION_BANK_TRIGGERS_LOCK = 74_200_005
+
+def install_question_bank_triggers(engine):
+    """Installer compteur, fonction et triggers s'ils manquent (idempotent).
+
+    `after_create` ne s'exécute que pour les tables nouvelles : une base créée avant le
+    compteur, sans passer par la migration 002, n'aurait jamais de triggers.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as connection:
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": QUESTION_BANK_TRIGGERS_LOCK})
+        connection.execute(text(
+            "INSERT INTO question_bank_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING"
+        ))
+        connection.execute(text(BUMP_QUESTION_BANK_VERSION))
+        existing = set(connection.execute(text(
+            "SELECT tgname FROM pg_trigger WHERE NOT tgisinternal AND tgname LIKE '%_bump_question_bank_version'"
+        )).scalars())
+        for table_name in QUESTION_BANK_TABLES:
+            if f"{table_name}_bump_question_bank_version" not in existing:
+                connection.execute(text(_question_bank_trigger_sql(table_name)))
+
+event.listen(
+    QuestionBankVersion.__table__,
+    "after_create",
+    DDL("INSERT INTO question_bank_version (id, version) VALUES (1, 0)")
+)
+
+for _model in (Technology, Category, Question):
+    event.listen(_model.__table__, "after_create", DDL(BUMP_QUESTION_BANK_VERSION).execute_if(dialect="postgresql"))
+    event.listen(_model.__table__, "after_create", _question_bank_trigger(_model.__tablename__))
+
+
+def _normalize_text(value) -> str:
+    """Minuscules, espaces fusionnés et formes Unicode unifiées"""
+    return " ".join(unicodedata.normalize("NFKC", str(value)).casefold().split())
+
+def question_content_hash(question_text: str, options) -> str:
+    """Empreinte d'une question insensible à la casse, aux espaces et à l'ordre des options"""
+    if isinstance(options, str):
+        # Anciennes importations : liste encodée en JSON deux fois
+        options = json.loads(options)
+    payload = json.dumps(
+        [_normalize_text(question_text), sorted(_normalize_text(option) for option in options or [])],
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+@event.listens_for(Question, "before_insert")
+def _set_question_content_hash(mapper, connection, target):
+    target.content_hash = question_content_hash(target.question_text, target.options)
+
+@event.listens_for(Question, "before_update")
+def _update_question_content_hash(mapper, connection, target):
+    # Seul un changement du texte ou des options modifie l'empreinte (pas images, tags...)
+    attrs = inspect(target).attrs
+    if attrs.question_text.history.has_changes() or attrs.options.history.has_changes():
+        target.content_hash = question_content_hash(target.question_text, target.options)
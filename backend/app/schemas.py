@@ -28,7 +28,7 @@ class User(UserBase):
     updated_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
+        orm_mode = True
 
 # ============================================================================
 # Authentication Schemas
@@ -73,7 +73,7 @@ class Technology(TechnologyBase):
     created_at: datetime
 
     class Config:
-        from_attributes = True
+        orm_mode = True
 
 # ============================================================================
 # Category Schemas
@@ -98,7 +98,7 @@ class Category(CategoryBase):
     technology: Optional[Technology] = None
 
     class Config:
-        from_attributes = True
+        orm_mode = True
 
 # ============================================================================
 # Question Schemas
@@ -139,7 +139,7 @@ class Question(QuestionBase):
     category: Optional[Category] = None
 
     class Config:
-        from_attributes = True
+        orm_mode = True
 
 # ============================================================================
 # Quiz Session Schemas
@@ -158,6 +158,9 @@ class QuizSessionUpdate(BaseModel):
     score_percentage: Optional[int] = Field(None, ge=0, le=100)
     time_spent_seconds: Optional[int] = Field(None, ge=0)
 
+class QuizSessionFinish(BaseModel):
+    time_spent_seconds: Optional[int] = Field(None, ge=0)
+
 class QuizSession(QuizSessionBase):
     id: int
     user_id: int
@@ -171,7 +174,7 @@ class QuizSession(QuizSessionBase):
     technology: Optional[Technology] = None
 
     class Config:
-        from_attributes = True
+        orm_mode = True
 
 # ============================================================================
 # Quiz Answer Schemas
@@ -186,6 +189,21 @@ class QuizAnswerBase(BaseModel):
 class QuizAnswerCreate(QuizAnswerBase):
     pass
 
+class QuizAnswerGraded(BaseModel):
+    """Résultat de correction d'une réponse soumise"""
+    question_id: int
+    user_answer: str
+    is_correct: bool
+    correct_answer: str
+
+class QuizAnswerBatchResult(BaseModel):
+    """Résultat d'un lot de réponses enregistrées"""
+    quiz_session_id: int
+    saved: int
+    correct: int
+    results: List[QuizAnswerGraded]
+    already_answered: List[int] = []  # questions ignorées, déjà répondues dans la session
+
 class QuizAnswer(QuizAnswerBase):
     id: int
     is_correct: bool
@@ -193,7 +211,7 @@ class QuizAnswer(QuizAnswerBase):
     question: Optional[Question] = None
 
     class Config:
-        from_attributes = True
+        orm_mode = True
 
 # ============================================================================
 # Response Schemas
@@ -209,7 +227,23 @@ class QuestionForQuiz(BaseModel):
     tags: Optional[List[str]] = None
 
     class Config:
-        from_attributes = True
+        orm_mode = True
+
+class QuestionItem(BaseModel):
+    """Question servie par /questions, /questions/random et /questions/sample (sans la réponse)"""
+    id: int
+    technology_id: int
+    category_id: int
+    question_text: str
+    options: List[str]
+    difficulty: int
+    images: Optional[dict] = None
+    tags: Optional[List[str]] = None
+    technology: str  # nom technique de la technologie
+    category: str    # nom de la catégorie
+
+    class Config:
+        orm_mode = True
 
 class QuizResult(BaseModel):
     """Schema pour les résultats d'un quiz"""
@@ -235,7 +269,7 @@ class QuestionPublic(BaseModel):
     category: Optional[Category] = None
 
     class Config:
-        from_attributes = True
+        orm_mode = True
 
 # ============================================================================
 # Dashboard Schemas
@@ -253,7 +287,7 @@ class QuizSessionSummary(BaseModel):
     time_spent_seconds: int
     
     class Config:
-        from_attributes = True
+        orm_mode = True
 
 class UserStatistics(BaseModel):
     """Statistiques détaillées d'un utilisateur"""
@@ -279,7 +313,7 @@ class UserDashboard(BaseModel):
     quiz_history: List[QuizSessionSummary]
     
     class Config:
-        from_attributes = True
+        orm_mode = True
 
 class DashboardStats(BaseModel):
     """Schema pour les statistiques du dashboard admin"""
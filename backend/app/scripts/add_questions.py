@@ -4,43 +4,65 @@ Script pour ajouter massivement des questions au quiz avec support d'images
 Usage: python add_questions.py --tech spark --file questions_spark.json --images-dir ./images
 """
 
-import json
 import sys
 import argparse
-import shutil
-import uuid
+import itertools
 from pathlib import Path
 from sqlalchemy.orm import Session
-from typing import List, Dict, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-# Add parent directory to path
-sys.path.append(str(Path(__file__).parent.parent))
+# Ajouter le chemin parent pour les imports
+sys.path.append(str(Path(__file__).parent.parent.parent))
 
+from app.core.config import settings
 from app.core.db import SessionLocal
-from app.models.database_models import Technology, Category, Question
+from app.core.image_store import ImageStore
+from app.core.image_variants import VariantGenerator
+from app.core.question_files import QUESTION_FILE_FORMATS, iter_questions
+from app.core.question_import import ImportReport, import_questions, upsert_categories
+from app.models.database_models import Technology
 
 # Configuration des dossiers d'images
-IMAGES_BASE_DIR = Path("/app/static/images")
-ALLOWED_IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg'}
+IMAGES_BASE_DIR = Path(settings.IMAGES_DIR)
+
+# Nombre de questions dont les images sont copiées ensemble par le pool de threads
+IMAGE_CHUNK_SIZE = 64
+
+image_store = ImageStore(IMAGES_BASE_DIR, workers=settings.IMAGE_IMPORT_WORKERS)
+
+# Variantes WebP/AVIF redimensionnées, générées dans un pool de processus
+variant_generator = VariantGenerator(
+    image_store, settings.IMAGE_VARIANT_WORKERS, settings.IMAGE_VARIANT_FORMATS.split(",")
+) if settings.IMAGE_VARIANTS_ENABLED else None
+
+# Champs d'image (ancien format) -> catégorie de stockage
+IMAGE_FIELDS = {
+    'question_image': 'questions',
+    'code_image': 'code_examples', 
+    'diagram_image': 'diagrams',
+    'screenshot_image': 'screenshots'
+}
+
+# Types de l'objet images -> catégorie de stockage
+IMAGE_TYPE_CATEGORIES = {
+    'question': 'questions',
+    'code': 'code_examples',
+    'diagram': 'diagrams', 
+    'screenshot': 'screenshots',
+    'example': 'code_examples'
+}
 
 def setup_image_directories():
     """Créer les dossiers d'images nécessaires"""
-    dirs_to_create = [
-        IMAGES_BASE_DIR,
-        IMAGES_BASE_DIR / "questions",
-        IMAGES_BASE_DIR / "code_examples",
-        IMAGES_BASE_DIR / "diagrams",
-        IMAGES_BASE_DIR / "screenshots"
-    ]
-    
-    for dir_path in dirs_to_create:
-        dir_path.mkdir(parents=True, exist_ok=True)
-    
+    image_store.setup_directories()
     print(f"📁 Dossiers d'images configurés dans {IMAGES_BASE_DIR}")
 
 def copy_image_to_static(source_path: str, category: str = "questions") -> Optional[str]:
     """
-    Copier une image vers le dossier static et retourner l'URL relative
+    Stocker une image dans le dossier static et retourner l'URL relative
+    
+    Le fichier est nommé d'après l'empreinte de son contenu : une image déjà importée
+    (même depuis un autre chemin) n'est pas recopiée.
     
     Args:
         source_path: Chemin vers l'image source
@@ -49,32 +71,34 @@ def copy_image_to_static(source_path: str, category: str = "questions") -> Optio
     Returns:
         URL relative de l'image ou None si erreur
     """
-    source = Path(source_path)
-    
-    if not source.exists():
-        print(f"⚠️  Image non trouvée: {source_path}")
-        return None
-    
-    if source.suffix.lower() not in ALLOWED_IMAGE_EXTENSIONS:
-        print(f"⚠️  Extension non supportée: {source.suffix}")
-        return None
-    
-    # Générer un nom unique pour éviter les conflits
-    unique_name = f"{uuid.uuid4().hex}{source.suffix}"
-    destination = IMAGES_BASE_DIR / category / unique_name
-    
-    try:
-        shutil.copy2(source, destination)
-        # Retourner l'URL relative pour l'application
-        return f"/static/images/{category}/{unique_name}"
-    except Exception as e:
-        print(f"❌ Erreur lors de la copie d'image: {e}")
-        return None
+    return image_store.ingest(source_path, category)
+
+def _image_source(images_dir: Optional[Path], image_path: str) -> str:
+    return str(images_dir / image_path) if images_dir else str(Path(image_path))
+
+def question_image_sources(question_data: Dict, images_base_path: Optional[str]) -> List[Tuple[str, str]]:
+    """Couples (chemin source, catégorie) des images référencées par une question"""
+    images_dir = Path(images_base_path) if images_base_path else None
+    sources = [
+        (_image_source(images_dir, question_data[field]), category)
+        for field, category in IMAGE_FIELDS.items()
+        if question_data.get(field)
+    ]
+    if isinstance(question_data.get('images'), dict):
+        sources.extend(
+            (_image_source(images_dir, image_path), IMAGE_TYPE_CATEGORIES.get(image_type, 'questions'))
+            for image_type, image_path in question_data['images'].items()
+            if image_path
+        )
+    return sources
 
-def process_question_images(question_data: Dict, images_base_path: str) -> Dict:
+def process_question_images(question_data: Dict, images_base_path: str, stored_urls: Optional[Dict] = None) -> Dict:
     """
     Traiter les images d'une question et mettre à jour les chemins
     
+    `stored_urls` contient les images déjà stockées par `process_images_in_chunks`
+    ((chemin source, catégorie) -> URL); à défaut chaque image est stockée ici.
+    
     Formats supportés dans le JSON:
     {
         "question_text": "Que fait ce code?",
@@ -93,25 +117,19 @@ def process_question_images(question_data: Dict, images_base_path: str) -> Dict:
     processed_question = question_data.copy()
     images_dir = Path(images_base_path) if images_base_path else None
     
-    # Traiter les images individuelles (ancien format)
-    image_fields = {
-        'question_image': 'questions',
-        'code_image': 'code_examples', 
-        'diagram_image': 'diagrams',
-        'screenshot_image': 'screenshots'
-    }
+    def store(image_path: str, category: str) -> Optional[str]:
+        source = (_image_source(images_dir, image_path), category)
+        if stored_urls is not None and source in stored_urls:
+            return stored_urls[source]
+        return copy_image_to_static(*source)
     
-    for field, category in image_fields.items():
+    # Traiter les images individuelles (ancien format)
+    for field, category in IMAGE_FIELDS.items():
         if field in question_data and question_data[field]:
-            if images_dir:
-                image_path = images_dir / question_data[field]
-            else:
-                image_path = Path(question_data[field])
-            
-            url = copy_image_to_static(str(image_path), category)
+            url = store(question_data[field], category)
             if url:
                 processed_question[field] = url
-                print(f"📷 Image copiée: {question_data[field]} -> {url}")
+                print(f"📷 Image: {question_data[field]} -> {url}")
             else:
                 processed_question[field] = None
     
@@ -121,34 +139,42 @@ def process_question_images(question_data: Dict, images_base_path: str) -> Dict:
         
         for image_type, image_path in question_data['images'].items():
             if image_path:
-                # Déterminer la catégorie basée sur le type
-                category_map = {
-                    'question': 'questions',
-                    'code': 'code_examples',
-                    'diagram': 'diagrams', 
-                    'screenshot': 'screenshots',
-                    'example': 'code_examples'
-                }
-                category = category_map.get(image_type, 'questions')
-                
-                if images_dir:
-                    full_path = images_dir / image_path
-                else:
-                    full_path = Path(image_path)
-                
-                url = copy_image_to_static(str(full_path), category)
+                category = IMAGE_TYPE_CATEGORIES.get(image_type, 'questions')
+                url = store(image_path, category)
                 if url:
                     processed_images[image_type] = url
-                    print(f"📷 Image {image_type} copiée: {image_path} -> {url}")
+                    print(f"📷 Image {image_type}: {image_path} -> {url}")
         
         processed_question['images'] = processed_images
     
     return processed_question
 
-def load_questions_from_json(file_path: str) -> List[Dict]:
-    """Charger les questions depuis un fichier JSON"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+def attach_image_variants(processed_question: Dict, variants: Dict[str, Dict]) -> Dict:
+    """Ajouter les dimensions et variantes des images stockées dans images["variants"]"""
+    images = processed_question.get('images') or {}
+    urls = [processed_question.get(field) for field in IMAGE_FIELDS] + list(images.values())
+    found = {url: variants[url] for url in urls if isinstance(url, str) and url in variants}
+    if found:
+        processed_question['images'] = {**images, 'variants': found}
+    return processed_question
+
+def process_images_in_chunks(questions_data: Iterable[Dict], images_dir: Optional[str]) -> Iterator[Dict]:
+    """Stocker les images par paquets de questions (copies en parallèle), dans l'ordre du flux"""
+    questions = iter(questions_data)
+    while True:
+        chunk = list(itertools.islice(questions, IMAGE_CHUNK_SIZE))
+        if not chunk:
+            return
+        stored_urls = image_store.ingest_many(
+            source for q_data in chunk for source in question_image_sources(q_data, images_dir)
+        )
+        variants = variant_generator.generate(url for url in stored_urls.values() if url) if variant_generator else {}
+        for q_data in chunk:
+            yield attach_image_variants(process_question_images(q_data, images_dir, stored_urls), variants)
+
+def load_questions_from_json(file_path: str, file_format: Optional[str] = None) -> Iterator[Dict]:
+    """Lire les questions une à une depuis un fichier JSON ou NDJSON"""
+    return iter_questions(file_path, file_format)
 
 def create_categories_for_tech(db: Session, tech_id: int, tech_name: str) -> Dict[str, int]:
     """Créer les catégories pour une technologie"""
@@ -197,118 +223,74 @@ def create_categories_for_tech(db: Session, tech_id: int, tech_name: str) -> Dic
         {"name": "Visual", "description": "Questions avec images"}
     ])
     
-    category_ids = {}
-    for cat_data in categories:
-        existing_cat = db.query(Category).filter(
-            Category.name == cat_data["name"],
-            Category.technology_id == tech_id
-        ).first()
-        
-        if not existing_cat:
-            category = Category(
-                name=cat_data["name"],
-                description=cat_data["description"],
-                technology_id=tech_id
-            )
-            db.add(category)
-            db.commit()
-            category_ids[cat_data["name"]] = category.id
-            print(f"✅ Catégorie créée: {cat_data['name']}")
+    category_ids = upsert_categories(db, tech_id, categories)
+    print(f"✅ {len(category_ids)} catégories prêtes pour {tech_name}")
+    return category_ids
+
+def prepare_question(processed_question: Dict, category_ids: Dict[str, int]) -> Dict:
+    """Choisir la catégorie et les tags d'une question dont les images sont stockées"""
+    images = processed_question.get("images") or {}
+    
+    # Déterminer la catégorie
+    category_name = processed_question.get("category", "General")
+    
+    # Si la question a des images, utiliser une catégorie visuelle appropriée
+    has_images = any([
+        processed_question.get("question_image"),
+        processed_question.get("code_image"),
+        processed_question.get("diagram_image"),
+        images
+    ])
+    has_code = processed_question.get("code_image") or images.get("code")
+    has_diagram = processed_question.get("diagram_image") or images.get("diagram")
+    
+    if has_images and category_name == "General":
+        if has_code:
+            category_name = "Code Examples"
+        elif has_diagram:
+            category_name = "Visual" if "Visual" in category_ids else "Architecture"
         else:
-            category_ids[cat_data["name"]] = existing_cat.id
-            print(f"👤 Catégorie existe: {cat_data['name']}")
+            category_name = "Visual" if "Visual" in category_ids else category_name
     
-    return category_ids
+    if category_name not in category_ids:
+        category_name = next(iter(category_ids))
+    processed_question["category"] = category_name
+    
+    # Ajouter les métadonnées d'images aux tags
+    tags = list(processed_question.get("tags", []))
+    if has_images:
+        tags.append("with_images")
+        if has_code:
+            tags.append("code_example")
+        if has_diagram:
+            tags.append("visual_diagram")
+    processed_question["tags"] = tags
+    
+    return processed_question
 
-def add_questions_bulk(db: Session, tech_name: str, questions_data: List[Dict], images_dir: Optional[str]) -> int:
+def add_questions_bulk(db: Session, tech_name: str, questions_data: Iterable[Dict], images_dir: Optional[str]) -> Optional[ImportReport]:
     """Ajouter les questions en masse avec support d'images"""
     tech = db.query(Technology).filter(Technology.name == tech_name).first()
     if not tech:
         print(f"❌ Technologie '{tech_name}' non trouvée")
-        return 0
+        return None
     
     category_ids = create_categories_for_tech(db, tech.id, tech_name)
     
-    added_count = 0
-    for i, q_data in enumerate(questions_data, 1):
-        print(f"\n📝 Traitement question {i}/{len(questions_data)}")
-        
-        # Traiter les images si présentes
-        processed_question = process_question_images(q_data, images_dir)
-        
-        # Vérifier si la question existe déjà
-        existing = db.query(Question).filter(
-            Question.question_text == processed_question["question_text"],
-            Question.technology_id == tech.id
-        ).first()
-        
-        if existing:
-            print(f"⚠️  Question existe déjà: {processed_question['question_text'][:50]}...")
-            continue
-        
-        # Déterminer la catégorie
-        category_name = processed_question.get("category", "General")
-        
-        # Si la question a des images, utiliser une catégorie visuelle appropriée
-        has_images = any([
-            processed_question.get("question_image"),
-            processed_question.get("code_image"),
-            processed_question.get("diagram_image"),
-            processed_question.get("images")
-        ])
-        
-        if has_images and category_name == "General":
-            if processed_question.get("code_image") or (processed_question.get("images", {}).get("code")):
-                category_name = "Code Examples"
-            elif processed_question.get("diagram_image") or (processed_question.get("images", {}).get("diagram")):
-                category_name = "Visual" if "Visual" in category_ids else "Architecture"
-            else:
-                category_name = "Visual" if "Visual" in category_ids else category_name
-        
-        category_id = category_ids.get(category_name, list(category_ids.values())[0])
-        
-        # Préparer les métadonnées d'images pour stockage
-        image_metadata = {}
-        if processed_question.get("question_image"):
-            image_metadata["question_image"] = processed_question["question_image"]
-        if processed_question.get("code_image"):
-            image_metadata["code_image"] = processed_question["code_image"]
-        if processed_question.get("diagram_image"):
-            image_metadata["diagram_image"] = processed_question["diagram_image"]
-        if processed_question.get("images"):
-            image_metadata["images"] = processed_question["images"]
-        
-        # Ajouter les métadonnées d'images aux tags
-        tags = processed_question.get("tags", [])
-        if image_metadata:
-            tags.append("with_images")
-            if image_metadata.get("code_image") or image_metadata.get("images", {}).get("code"):
-                tags.append("code_example")
-            if image_metadata.get("diagram_image") or image_metadata.get("images", {}).get("diagram"):
-                tags.append("visual_diagram")
-        
-        question = Question(
-            technology_id=tech.id,
-            category_id=category_id,
-            question_text=processed_question["question_text"],
-            options=processed_question["options"],
-            correct_answer=processed_question["correct_answer"],
-            explanation=processed_question.get("explanation", ""),
-            difficulty=processed_question.get("difficulty", 1),
-            tags=tags,
-            is_active=True
+    try:
+        report = import_questions(
+            db,
+            tech,
+            (prepare_question(q_data, category_ids) for q_data in process_images_in_chunks(questions_data, images_dir))
         )
-        
-        db.add(question)
-        added_count += 1
-        
-        if added_count % 50 == 0:
-            db.commit()
-            print(f"📊 {added_count} questions ajoutées...")
-    
-    db.commit()
-    print(f"✅ Total: {added_count} questions ajoutées pour {tech_name}")
-    return added_count
+        db.commit()
+    finally:
+        if variant_generator:
+            variant_generator.close()
+    image_store.save()
+    print(f"📷 {image_store.stored_files()} images distinctes dans {IMAGES_BASE_DIR}")
+    print(f"✅ {report.summary()}")
+    return report
 
 def main():
     parser = argparse.ArgumentParser(description='Ajouter des questions au quiz avec support d\'images')
@@ -316,6 +298,8 @@ def main():
                        help='Technologie cible')
     parser.add_argument('--file', required=True, help='Fichier JSON contenant les questions')
     parser.add_argument('--images-dir', help='Dossier contenant les images (optionnel)')
+    parser.add_argument('--format', choices=QUESTION_FILE_FORMATS,
+                       help='Format du fichier (déduit de l\'extension par défaut: .ndjson/.jsonl)')
     
     args = parser.parse_args()
     
@@ -334,19 +318,13 @@ def main():
     if args.images_dir:
         print(f"📁 Dossier d'images: {args.images_dir}")
     
-    questions_data = load_questions_from_json(args.file)
-    print(f"📝 {len(questions_data)} questions trouvées")
-    
-    # Compter les questions avec images
-    questions_with_images = sum(1 for q in questions_data if any([
-        q.get("question_image"), q.get("code_image"), q.get("diagram_image"), q.get("images")
-    ]))
-    print(f"📷 {questions_with_images} questions avec images détectées")
+    questions_data = load_questions_from_json(args.file, args.format)
     
     db = SessionLocal()
     try:
-        added = add_questions_bulk(db, args.tech, questions_data, args.images_dir)
-        print(f"🎉 Import terminé: {added} questions ajoutées")
+        report = add_questions_bulk(db, args.tech, questions_data, args.images_dir)
+        if report:
+            print(f"🎉 Import terminé: {report.inserted} questions ajoutées")
     except Exception as e:
         print(f"❌ Erreur: {e}")
         db.rollback()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Script de non-régression des statistiques du dashboard pour un gros utilisateur
+Usage: python benchmark_dashboard.py [--seed] [--sessions-per-user 10000] [--max-ms 100]
+
+Les statistiques servies par /dashboard/stats (rollups) sont comparées à un calcul de
+référence en Python sur toutes les sessions terminées de l'utilisateur, et chronométrées
+avec /dashboard/progress et /dashboard/me. Le script échoue (code 1) si les résultats
+diffèrent ou si une médiane dépasse --max-ms. Avec --seed, le jeu de données de
+check_query_plans.py est inséré (10 000 sessions par utilisateur) puis annulé.
+"""
+
+import argparse
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict
+
+# Ajouter le chemin parent pour les imports
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import desc, func
+from sqlalchemy.orm import Session
+
+from app.core.db import SessionLocal
+from app.api.endpoints import dashboard
+from app.models.database_models import User, QuizSession, Technology
+
+from check_query_plans import seed
+from benchmark_question_queries import count_selects, median_ms
+
+
+def heaviest_user(db: Session) -> User:
+    user_id = db.query(QuizSession.user_id).filter(QuizSession.completed_at.isnot(None)).group_by(
+        QuizSession.user_id
+    ).order_by(func.count(QuizSession.id).desc()).limit(1).scalar()
+    if user_id is None:
+        raise SystemExit("❌ Aucune session terminée : relancer avec --seed")
+    return db.query(User).filter(User.id == user_id).first()
+
+
+def reference_statistics(user_id: int, db: Session) -> Dict:
+    """Statistiques recalculées en Python depuis toutes les sessions terminées"""
+    sessions = db.query(
+        QuizSession.id, QuizSession.score_percentage, QuizSession.time_spent_seconds,
+        QuizSession.completed_at, Technology.name
+    ).join(Technology, QuizSession.technology_id == Technology.id).filter(
+        QuizSession.user_id == user_id,
+        QuizSession.completed_at.isnot(None)
+    ).order_by(desc(QuizSession.completed_at)).all()
+
+    scores = [session.score_percentage or 0 for session in sessions]
+    by_technology = defaultdict(list)
+    for session, score in zip(sessions, scores):
+        by_technology[session.name].append(score)
+
+    return {
+        "total_quizzes": len(sessions),
+        "average_score": round(sum(scores) / len(scores), 1) if scores else 0.0,
+        "best_score": max(scores, default=0),
+        "total_time_spent": sum(session.time_spent_seconds or 0 for session in sessions),
+        "quizzes_by_technology": {name: len(values) for name, values in by_technology.items()},
+        "scores_by_technology": {
+            name: round(sum(values) / len(values), 1) for name, values in by_technology.items()
+        },
+        "recent_activity": [session.id for session in sessions[:5]]
+    }
+
+
+def compare(expected: Dict, actual: Dict) -> int:
+    actual = {**actual, "recent_activity": [summary["id"] for summary in actual["recent_activity"]]}
+    differences = 0
+    for field, value in expected.items():
+        if actual[field] != value:
+            differences += 1
+            print(f"❌ {field}: attendu {value}, obtenu {actual[field]}")
+    return differences
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Non-régression des statistiques du dashboard')
+    parser.add_argument('--seed', action='store_true', help='Insérer des données synthétiques (annulées à la fin)')
+    parser.add_argument('--max-ms', type=float, default=100, help='Médiane maximale par endpoint')
+    parser.add_argument('--repeat', type=int, default=5, help='Mesures par endpoint')
+    parser.add_argument('--technologies', type=int, default=5)
+    parser.add_argument('--categories', type=int, default=2, help='Catégories par technologie')
+    parser.add_argument('--questions-per-category', type=int, default=20)
+    parser.add_argument('--users', type=int, default=1)
+    parser.add_argument('--sessions-per-user', type=int, default=10000)
+
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.seed:
+            seed(db, args)
+        user = heaviest_user(db)
+
+        query_count, statistics = count_selects(db, lambda: dashboard.get_user_statistics(user.id, db))
+        failures = compare(reference_statistics(user.id, db), statistics.dict())
+        print(f"👤 {user.username}: {statistics.total_quizzes} sessions terminées, "
+              f"statistiques en {query_count} requêtes")
+
+        timings = {
+            "référence Python": lambda: reference_statistics(user.id, db),
+            "GET /dashboard/stats": lambda: dashboard.get_user_statistics(user.id, db),
+            "GET /dashboard/progress": lambda: dashboard.get_progress_data(user.id, db, 365, "week"),
+            "GET /dashboard/me": lambda: dashboard.build_dashboard_response(db, user, None),
+        }
+        for label, call in timings.items():
+            elapsed = median_ms(call, args.repeat)
+            # La référence est le calcul que les rollups évitent : elle n'a pas de limite
+            too_slow = label.startswith("GET") and elapsed > args.max_ms
+            failures += too_slow
+            print(f"{'❌' if too_slow else '✅'} {label}: {elapsed:.1f} ms")
+    finally:
+        db.rollback()
+        db.close()
+
+    if failures:
+        print(f"⚠️  {failures} écarts ou dépassements")
+        return 1
+    print("🎉 Statistiques identiques au calcul de référence")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
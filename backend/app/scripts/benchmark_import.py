@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Script pour mesurer le débit de l'import en masse des questions
+Usage: python benchmark_import.py [--questions 100000] [--min-per-minute 100000]
+
+Des questions synthétiques sont importées par app/core/question_import.py dans une
+technologie temporaire, au sein d'une transaction annulée à la fin. Le script échoue
+(code 1) si le débit est inférieur à --min-per-minute questions par minute.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator
+
+# Ajouter le chemin parent pour les imports
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from app.core.db import SessionLocal
+from app.core.question_import import DEFAULT_BATCH_SIZE, ensure_technology, import_questions
+
+BENCHMARK_TECHNOLOGY = "benchmark_import"
+
+
+def synthetic_questions(count: int, categories: int) -> Iterator[Dict]:
+    for position in range(count):
+        yield {
+            "question_text": f"Question de test n°{position} : quelle est la bonne réponse ?",
+            "options": [f"Réponse {position}-{option}" for option in "abcd"],
+            "correct_answer": f"Réponse {position}-a",
+            "explanation": "Explication de la bonne réponse.",
+            "difficulty": 1 + position % 5,
+            "category": f"Catégorie {position % categories}",
+            "tags": ["benchmark", f"lot-{position // 1000}"],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mesurer le débit de l\'import de questions')
+    parser.add_argument('--questions', type=int, default=100_000, help='Questions synthétiques à importer')
+    parser.add_argument('--categories', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--validate', action='store_true', help='Valider chaque question par QuestionCreate')
+    parser.add_argument('--min-per-minute', type=float, default=100_000,
+                       help='Débit minimal attendu (questions par minute)')
+
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        technology = ensure_technology(db, BENCHMARK_TECHNOLOGY, "Benchmark import")
+        started = time.perf_counter()
+        report = import_questions(
+            db,
+            technology,
+            synthetic_questions(args.questions, args.categories),
+            batch_size=args.batch_size,
+            validate=args.validate
+        )
+        elapsed = time.perf_counter() - started
+    finally:
+        db.rollback()
+        db.close()
+
+    per_minute = report.inserted * 60 / elapsed if elapsed else 0.0
+    print(f"📊 {report.inserted} questions insérées en {elapsed:.1f}s "
+          f"({report.rows_per_second:.0f} lignes/s, {per_minute:.0f} par minute)")
+    if report.inserted != args.questions:
+        print(f"❌ {args.questions - report.inserted} questions non insérées ({report.invalid} invalides)")
+        return 1
+    if per_minute < args.min_per_minute:
+        print(f"❌ Débit inférieur à l'objectif de {args.min_per_minute:.0f} questions par minute")
+        return 1
+    print("🎉 Objectif de débit atteint")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
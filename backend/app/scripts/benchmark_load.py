@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test de charge des routes de lecture contre une API en cours d'exécution
+Usage: python benchmark_load.py [--url http://localhost:8000] [--clients 500] [--duration 30]
+
+Chaque client garde sa connexion HTTP/1.1 ouverte et enchaîne les requêtes sur les routes
+demandées (--path, répétable). Le débit (requêtes/s) et les latences p50/p99 sont affichés
+par route. À lancer une fois avec ASYNC_DB_ENABLED=false puis true pour comparer les deux
+moteurs. Le script échoue (code 1) si des requêtes échouent ou si le p99 dépasse --max-p99-ms.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = ["/technologies", "/questions?limit=50", "/questions/sample?count=10"]
+
+
+class Connection:
+    """Connexion HTTP/1.1 persistante minimale (réponses Content-Length ou chunked)"""
+
+    def __init__(self, host: str, port: int, token: Optional[str]):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    async def get(self, path: str) -> int:
+        if self.writer is None:
+            await self._connect()
+        headers = [f"GET {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "Connection: keep-alive"]
+        if self.token:
+            headers.append(f"Authorization: Bearer {self.token}")
+        self.writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("ascii"))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("connexion fermée par le serveur")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        else:
+            await self.reader.readexactly(int(response_headers.get("content-length", 0)))
+
+        if response_headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status
+
+
+async def client(url, paths: List[str], token: Optional[str], deadline: float, offset: int,
+                 latencies: Dict[str, List[float]], errors: Dict[str, int]):
+    connection = Connection(url.hostname, url.port or 80, token)
+    request_number = offset
+    try:
+        while time.perf_counter() < deadline:
+            path = paths[request_number % len(paths)]
+            request_number += 1
+            started = time.perf_counter()
+            try:
+                status = await connection.get(path)
+            except (OSError, ConnectionError, ValueError, asyncio.IncompleteReadError):
+                errors[path] += 1
+                await connection.close()
+                continue
+            if status >= 400:
+                errors[path] += 1
+            else:
+                latencies[path].append((time.perf_counter() - started) * 1000)
+    finally:
+        await connection.close()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run(args) -> int:
+    url = urlsplit(args.url)
+    paths = args.path or DEFAULT_PATHS
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+
+    print(f"🚀 {args.clients} clients pendant {args.duration} s sur {args.url}")
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*(
+        client(url, paths, args.token, deadline, offset, latencies, errors)
+        for offset in range(args.clients)
+    ))
+    elapsed = time.perf_counter() - started
+
+    failures = 0
+    for path in paths:
+        done = latencies[path]
+        if not done:
+            print(f"❌ {path}: aucune réponse réussie ({errors[path]} erreurs)")
+            failures += 1
+            continue
+        p99 = percentile(done, 0.99)
+        too_slow = args.max_p99_ms is not None and p99 > args.max_p99_ms
+        failures += too_slow or errors[path] > 0
+        print(f"{'❌' if too_slow or errors[path] else '✅'} {path}: {len(done) / elapsed:.0f} req/s, "
+              f"p50 {percentile(done, 0.5):.1f} ms, p99 {p99:.1f} ms, {errors[path]} erreurs")
+
+    total = sum(len(done) for done in latencies.values())
+    print(f"📊 Total: {total / elapsed:.0f} req/s")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Test de charge des routes de lecture')
+    parser.add_argument('--url', default='http://localhost:8000', help='Adresse de l\'API')
+    parser.add_argument('--path', action='append', help=f'Route à charger (répétable, défaut: {DEFAULT_PATHS})')
+    parser.add_argument('--clients', type=int, default=500, help='Clients simultanés')
+    parser.add_argument('--duration', type=float, default=30, help='Durée en secondes')
+    parser.add_argument('--token', help='Jeton JWT pour les routes authentifiées (/dashboard/...)')
+    parser.add_argument('--max-p99-ms', type=float, help='p99 maximal par route')
+
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Script pour vérifier que le nombre de requêtes de GET /questions ne dépend pas de `limit`
+Usage: python benchmark_question_queries.py [--seed] [--limits 1 10 100 1000]
+
+Les SELECT émis par fetch_questions (la couche de requêtes de /questions) sont comptés
+pour chaque valeur de `limit`, avec le temps de réponse médian. Le script échoue (code 1)
+si le nombre de requêtes varie avec `limit` (chargement paresseux par ligne, N+1).
+Avec --seed, le jeu de données de check_query_plans.py est inséré puis annulé.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Tuple
+
+# Ajouter le chemin parent pour les imports
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from app.core.db import SessionLocal
+from app.core.queries import fetch_questions
+from app.models.database_models import Question
+
+from check_query_plans import seed
+
+
+def count_selects(db: Session, call: Callable) -> Tuple[int, object]:
+    """Nombre de SELECT émis par `call` et sa valeur de retour"""
+    selects = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        result = call()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return len(selects), result
+
+
+def median_ms(call: Callable, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compter les requêtes de GET /questions selon limit')
+    parser.add_argument('--seed', action='store_true', help='Insérer des données synthétiques (annulées à la fin)')
+    parser.add_argument('--limits', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=5, help='Mesures par valeur de limit')
+    parser.add_argument('--technologies', type=int, default=5)
+    parser.add_argument('--categories', type=int, default=8, help='Catégories par technologie')
+    parser.add_argument('--questions-per-category', type=int, default=250)
+    parser.add_argument('--users', type=int, default=1)
+    parser.add_argument('--sessions-per-user', type=int, default=10)
+
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.seed:
+            seed(db, args)
+        available = db.query(func.count(Question.id)).filter(Question.is_active == True).scalar()
+        if not available:
+            raise SystemExit("❌ Aucune question active : relancer avec --seed")
+
+        query_counts = set()
+        print(f"{'limit':>8} {'questions':>10} {'requêtes':>9} {'médiane':>10}")
+        for limit in args.limits:
+            call = lambda: fetch_questions(db, limit=limit)
+            query_count, questions = count_selects(db, call)
+            query_counts.add(query_count)
+            print(f"{limit:>8} {len(questions):>10} {query_count:>9} {median_ms(call, args.repeat):>8.2f} ms")
+    finally:
+        db.rollback()
+        db.close()
+
+    if len(query_counts) > 1:
+        print(f"❌ Le nombre de requêtes varie avec limit: {sorted(query_counts)}")
+        return 1
+    print(f"🎉 {query_counts.pop()} requête(s) quel que soit limit ({available} questions actives)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Script pour mesurer le coût de sérialisation et la taille sur le réseau des réponses
+Usage: python benchmark_responses.py [--limit 50] [--repeat 200]
+
+Des réponses de la forme de /questions?limit=N (questions des fichiers JSON de ce dossier)
+et /dashboard/me (historique de 50 quiz) sont rendues comme avant (jsonable_encoder puis
+JSONResponse) et comme maintenant (ORJSONResponse), puis compressées avec les réglages de
+CompressionMiddleware. Aucune base de données n'est nécessaire.
+"""
+
+import argparse
+import itertools
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Ajouter le chemin parent pour les imports
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app.core.compression import CompressionMiddleware
+from app.core.config import settings
+from app.core.question_files import iter_questions
+
+QUESTION_FILES = sorted(Path(__file__).parent.glob("*_questions*.json"))
+
+
+def questions_payload(limit: int) -> List[Dict]:
+    """Réponse de /questions?limit=N construite à partir des fichiers de questions"""
+    questions = [question for path in QUESTION_FILES for question in iter_questions(path)]
+    if not questions:
+        raise SystemExit(f"❌ Aucun fichier de questions dans {Path(__file__).parent}")
+    return [
+        {
+            "id": position + 1,
+            "technology_id": 1,
+            "category_id": 1,
+            "question_text": question["question_text"],
+            "options": question["options"],
+            "difficulty": question.get("difficulty", 1),
+            "images": question.get("images"),
+            "tags": question.get("tags"),
+            "technology": "python",
+            "category": question.get("category", "General"),
+        }
+        for position, question in zip(range(limit), itertools.cycle(questions))
+    ]
+
+
+def dashboard_payload(history_size: int = 50) -> Dict:
+    """Réponse de /dashboard/me pour un utilisateur avec `history_size` quiz récents"""
+    now = datetime(2026, 1, 1, 12, 0)
+    history = [
+        {
+            "id": session_id,
+            "technology_name": "python",
+            "score_percentage": session_id * 7 % 101,
+            "total_questions": 10,
+            "correct_answers": session_id % 11,
+            "started_at": now - timedelta(hours=session_id, minutes=5),
+            "completed_at": now - timedelta(hours=session_id),
+            "time_spent_seconds": 300,
+        }
+        for session_id in range(history_size, 0, -1)
+    ]
+    days = [now.date() - timedelta(days=offset) for offset in range(30, -1, -1)]
+    return {
+        "user": {
+            "id": 1, "email": "user@example.com", "username": "user", "full_name": "Utilisateur",
+            "is_active": True, "is_admin": False, "created_at": now, "updated_at": now,
+        },
+        "statistics": {
+            "total_quizzes": history_size,
+            "average_score": 54.2,
+            "best_score": 100,
+            "total_time_spent": history_size * 300,
+            "quizzes_by_technology": {"python": history_size},
+            "scores_by_technology": {"python": 54.2},
+            "recent_activity": history[:5],
+        },
+        "progress_data": {
+            "dates": [day.strftime('%Y-%m-%d') for day in days],
+            "scores": [float(offset * 3 % 100) for offset in range(len(days))],
+            "quiz_counts": [offset % 4 for offset in range(len(days))],
+        },
+        "quiz_history": history,
+    }
+
+
+def median_us(call: Callable, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def compress(middleware: CompressionMiddleware, encoding: str, body: bytes) -> bytes:
+    process, finish = middleware.compressor(encoding)
+    return process(body) + finish()
+
+
+def report(label: str, payload, middleware: CompressionMiddleware, repeat: int):
+    renderers = {
+        "avant (jsonable_encoder + json)": lambda: JSONResponse(content=jsonable_encoder(payload)).body,
+        "après (orjson)": lambda: ORJSONResponse(content=payload).body,
+    }
+    print(f"📦 {label}")
+    for name, render in renderers.items():
+        print(f"   {name}: {median_us(render, repeat):.0f} µs, {len(render())} octets")
+
+    body = ORJSONResponse(content=payload).body
+    encodings = [("gzip", settings.GZIP_COMPRESSION_LEVEL)]
+    if middleware.brotli is not None:
+        encodings.insert(0, ("br", settings.BROTLI_QUALITY))
+    else:
+        print("   ⚠️  Module brotli non installé : br non mesuré")
+    for encoding, level in encodings:
+        compressed = compress(middleware, encoding, body)
+        elapsed = median_us(lambda: compress(middleware, encoding, body), repeat)
+        print(f"   {encoding}-{level}: {len(compressed)} octets "
+              f"({len(compressed) * 100 / len(body):.0f} %), {elapsed:.0f} µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mesurer la sérialisation et la compression des réponses')
+    parser.add_argument('--limit', type=int, default=50, help='Nombre de questions de /questions')
+    parser.add_argument('--repeat', type=int, default=200, help='Mesures par rendu')
+
+    args = parser.parse_args()
+
+    middleware = CompressionMiddleware(
+        app=None,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.GZIP_COMPRESSION_LEVEL,
+        brotli_quality=settings.BROTLI_QUALITY,
+    )
+    report(f"GET /questions?limit={args.limit}", questions_payload(args.limit), middleware, args.repeat)
+    report("GET /dashboard/me", dashboard_payload(), middleware, args.repeat)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
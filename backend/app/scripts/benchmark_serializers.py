@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark du coût de sérialisation par objet des questions et technologies
+Usage: python benchmark_serializers.py [--objects 100] [--repeat 50]
+
+Chaque objet est sérialisé comme avant (modèle Pydantic validé puis jsonable_encoder et
+json) et par les sérialiseurs partagés de app/core/queries.py suivis d'orjson. Les lignes
+sont construites en mémoire à partir des fichiers de questions de ce dossier : aucune base
+de données n'est nécessaire.
+"""
+
+import argparse
+import json
+import sys
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List
+
+# Ajouter le chemin parent pour les imports
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from app.core.queries import QUESTION_COLUMNS, serialize_question_row, serialize_technology_row
+from app.models.database_models import Technology
+from app.schemas import QuestionItem, Technology as TechnologySchema
+
+from benchmark_responses import median_us, questions_payload
+
+QuestionRow = namedtuple("QuestionRow", [column.key for column in QUESTION_COLUMNS])
+
+
+def question_rows(count: int) -> List[QuestionRow]:
+    """Lignes de la forme de `questions_select`"""
+    return [QuestionRow(**question) for question in questions_payload(count)]
+
+
+def technologies(count: int) -> List[Technology]:
+    created_at = datetime(2026, 1, 1, 12, 0)
+    return [
+        Technology(id=position, name=f"tech_{position}", display_name=f"Tech {position}",
+                   description="Questions about tech", icon="💻", color="#007bff",
+                   is_active=True, created_at=created_at)
+        for position in range(1, count + 1)
+    ]
+
+
+def per_object_us(serialize: Callable, objects: List, repeat: int) -> float:
+    return median_us(lambda: serialize(objects), repeat) / len(objects)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Coût de sérialisation par objet')
+    parser.add_argument('--objects', type=int, default=100, help='Objets sérialisés par mesure')
+    parser.add_argument('--repeat', type=int, default=50, help='Mesures par sérialiseur')
+
+    args = parser.parse_args()
+
+    cases = {
+        "question": (question_rows(args.objects), {
+            "avant (QuestionItem + jsonable_encoder + json)": lambda rows: json.dumps(
+                jsonable_encoder([QuestionItem(**row._asdict()) for row in rows])
+            ),
+            "après (serialize_question_row + orjson)": lambda rows: orjson.dumps(
+                [serialize_question_row(row) for row in rows]
+            ),
+        }),
+        "technologie": (technologies(args.objects), {
+            "avant (from_orm + jsonable_encoder + json)": lambda techs: json.dumps(
+                jsonable_encoder([TechnologySchema.from_orm(tech) for tech in techs])
+            ),
+            "après (serialize_technology_row + orjson)": lambda techs: orjson.dumps(
+                [serialize_technology_row(tech) for tech in techs]
+            ),
+        }),
+    }
+
+    for label, (objects, serializers) in cases.items():
+        print(f"⏱️  {label} ({len(objects)} objets)")
+        for name, serialize in serializers.items():
+            print(f"   {name}: {per_object_us(serialize, objects, args.repeat):.2f} µs/objet")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
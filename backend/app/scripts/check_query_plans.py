@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Script pour vérifier les plans d'exécution des requêtes des endpoints
+Usage: python check_query_plans.py [--seed] [--max-seq-scan-rows 1000]
+
+Les requêtes réellement émises par les fonctions des endpoints sont capturées puis
+passées à EXPLAIN. Le script échoue (code 1) si un plan parcourt séquentiellement une
+table plus grande que le seuil. Avec --seed, un jeu de données synthétique est inséré
+dans une transaction annulée à la fin.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+# Ajouter le chemin parent pour les imports
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from sqlalchemy import event, func, select, text
+from sqlalchemy.orm import Session
+
+from app.core.db import SessionLocal
+from app.core.answer_key import answer_key_cache
+from app.core.catalog import load_catalog
+from app.core.hashing import _find_login_user
+from app.core.pagination import keyset_page
+from app.core.queries import fetch_questions, fetch_questions_by_ids
+from app.core.rollups import rebuild_user_rollups
+from app.api.endpoints import dashboard
+from app.models.database_models import User, Category, Question, QuizSession, QuizAnswer
+
+SEED_PREFIX = "explain_"
+
+SEED_STATEMENTS = [
+    """
+    INSERT INTO technologies (name, display_name, is_active)
+    SELECT 'explain_tech_' || g, 'Explain ' || g, true FROM generate_series(1, :technologies) g
+    """,
+    """
+    INSERT INTO categories (name, technology_id)
+    SELECT 'explain_category_' || c, t.id
+    FROM technologies t, generate_series(1, :categories) c
+    WHERE t.name LIKE 'explain_tech_%'
+    """,
+    """
+    INSERT INTO questions (technology_id, category_id, question_text, options, correct_answer, difficulty, is_active)
+    SELECT c.technology_id, c.id, 'Question ' || c.id || '-' || g, '["a", "b", "c", "d"]', 'a', 1 + g % 5, g % 10 <> 0
+    FROM categories c JOIN technologies t ON t.id = c.technology_id, generate_series(1, :questions_per_category) g
+    WHERE t.name LIKE 'explain_tech_%'
+    """,
+    """
+    INSERT INTO users (username, email, hashed_password, is_active, is_admin)
+    SELECT 'explain_user_' || g, 'explain_user_' || g || '@example.com', 'x', true, false
+    FROM generate_series(1, :users) g
+    """,
+    """
+    INSERT INTO quiz_sessions (user_id, technology_id, status, total_questions, correct_answers,
+                               score_percentage, time_spent_seconds, started_at, completed_at)
+    SELECT u.id,
+           (ARRAY(SELECT id FROM technologies WHERE name LIKE 'explain_tech_%' ORDER BY id))[1 + g % :technologies],
+           CASE WHEN g % 20 = 0 THEN 'in_progress' ELSE 'completed' END,
+           5, g % 6, (g % 6) * 20, 60,
+           now() - g * interval '1 hour',
+           CASE WHEN g % 20 = 0 THEN NULL ELSE now() - g * interval '1 hour' + interval '5 minutes' END
+    FROM users u, generate_series(1, :sessions_per_user) g
+    WHERE u.username LIKE 'explain_user_%'
+    """,
+    """
+    INSERT INTO quiz_answers (quiz_session_id, question_id, user_answer, is_correct, time_spent_seconds)
+    SELECT s.id, (SELECT min(id) FROM questions), 'a', g % 2 = 0, 12
+    FROM quiz_sessions s JOIN users u ON u.id = s.user_id, generate_series(1, 5) g
+    WHERE u.username LIKE 'explain_user_%'
+    """,
+]
+
+SEED_TABLES = ("technologies", "categories", "questions", "users", "quiz_sessions", "quiz_answers",
+               "user_stats", "user_technology_stats", "user_daily_activity")
+
+
+def seed(db: Session, args):
+    params = {
+        "technologies": args.technologies,
+        "categories": args.categories,
+        "questions_per_category": args.questions_per_category,
+        "users": args.users,
+        "sessions_per_user": args.sessions_per_user,
+    }
+    for statement in SEED_STATEMENTS:
+        db.execute(text(statement), params)
+
+    user_ids = [row.id for row in db.query(User.id).filter(User.username.like(f"{SEED_PREFIX}user_%"))]
+    rebuild_user_rollups(db, user_ids)
+
+    # Statistiques à jour pour que le planificateur voie les volumes insérés
+    for table_name in SEED_TABLES:
+        db.execute(text(f"ANALYZE {table_name}"))
+    print(f"🌱 Données synthétiques insérées pour {len(user_ids)} utilisateurs")
+
+
+def pick_targets(db: Session) -> Dict:
+    """Utilisateur avec le plus de sessions et un couple technologie/catégorie peuplé"""
+    user_id = db.query(QuizSession.user_id).group_by(QuizSession.user_id).order_by(
+        func.count(QuizSession.id).desc()
+    ).limit(1).scalar()
+    category = db.query(Category.id, Category.technology_id).join(
+        Question, Question.category_id == Category.id
+    ).group_by(Category.id, Category.technology_id).order_by(func.count(Question.id).desc()).first()
+    question_ids = [row.id for row in db.query(Question.id).filter(Question.is_active == True).limit(10)]
+    session_id = db.query(QuizSession.id).filter(QuizSession.user_id == user_id).limit(1).scalar()
+    user = db.query(User).filter(User.id == user_id).first() if user_id else None
+
+    if user is None or category is None or not question_ids:
+        raise SystemExit("❌ Base vide : relancer avec --seed")
+
+    return {
+        "user_id": user_id,
+        "username": user.username,
+        "technology_id": category.technology_id,
+        "category_id": category.id,
+        "question_ids": question_ids,
+        "session_id": session_id,
+    }
+
+
+def endpoint_calls(db: Session, t: Dict) -> List[Tuple[str, Callable]]:
+    """Appels reproduisant les requêtes émises par chaque endpoint"""
+
+    def history_pages():
+        _, cursor = dashboard.get_quiz_history(t["user_id"], db, 20)
+        dashboard.get_quiz_history(t["user_id"], db, 20, cursor)
+
+    def session_pages():
+        sessions = db.query(QuizSession).filter(QuizSession.user_id == t["user_id"])
+        _, cursor = keyset_page(sessions, QuizSession.started_at, QuizSession.id, None, 20)
+        keyset_page(sessions, QuizSession.started_at, QuizSession.id, cursor, 20)
+
+    return [
+        ("POST /auth/login", lambda: _find_login_user(db, t["username"])),
+        ("auth: utilisateur par id", lambda: db.query(User).filter(User.id == t["user_id"]).first()),
+        ("catalogue des filtres", lambda: load_catalog(db)),
+        ("GET /questions?technology", lambda: fetch_questions(db, t["technology_id"], None, None, 50)),
+        ("GET /questions?category", lambda: fetch_questions(db, None, t["category_id"], None, 50)),
+        ("GET /questions?technology&category&difficulty",
+         lambda: fetch_questions(db, t["technology_id"], t["category_id"], 3, 50)),
+        ("GET /questions/random", lambda: fetch_questions_by_ids(db, t["question_ids"])),
+        ("GET /technologies/{name}/categories",
+         lambda: db.query(Category).filter(Category.technology_id == t["technology_id"]).all()),
+        ("POST /quiz/{id}/answers (corrigé)", lambda: answer_key_cache.get_many(db, t["question_ids"])),
+        ("POST /quiz/{id}/finish (réponses)", lambda: db.execute(
+            select(func.count(QuizAnswer.id)).where(QuizAnswer.quiz_session_id == t["session_id"])
+        ).scalar()),
+        ("GET /quiz/sessions", session_pages),
+        ("GET /dashboard/stats", lambda: dashboard.get_user_statistics(t["user_id"], db)),
+        ("GET /dashboard/progress", lambda: dashboard.get_progress_data(t["user_id"], db, 365, "week")),
+        ("GET /dashboard/history", history_pages),
+    ]
+
+
+def capture_queries(db: Session, calls: List[Tuple[str, Callable]]) -> List[Tuple[str, str, dict]]:
+    captured = []
+    current = {"label": None}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            captured.append((current["label"], statement, parameters))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        for label, call in calls:
+            current["label"] = label
+            call()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return captured
+
+
+def _seq_scans(plan: Dict):
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from _seq_scans(child)
+
+
+def check_plans(db: Session, captured, max_rows: int) -> int:
+    table_rows = {
+        row.relname: int(row.reltuples)
+        for row in db.execute(text("SELECT relname, reltuples FROM pg_class WHERE relkind = 'r'"))
+    }
+    cursor = db.connection().connection.cursor()
+    failures = 0
+
+    for label, statement, parameters in captured:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        large_scans = [
+            (relation, table_rows.get(relation, 0))
+            for relation in _seq_scans(plan[0]["Plan"])
+            if table_rows.get(relation, 0) > max_rows
+        ]
+        if large_scans:
+            failures += 1
+            scans = ", ".join(f"{relation} (~{rows} lignes)" for relation, rows in large_scans)
+            print(f"❌ {label}: parcours séquentiel de {scans}")
+            print(f"   {' '.join(statement.split())}")
+        else:
+            print(f"✅ {label}")
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Vérifier les plans d\'exécution des requêtes des endpoints')
+    parser.add_argument('--seed', action='store_true', help='Insérer des données synthétiques (annulées à la fin)')
+    parser.add_argument('--max-seq-scan-rows', type=int, default=1000,
+                       help='Taille de table au-delà de laquelle un parcours séquentiel est une erreur')
+    parser.add_argument('--technologies', type=int, default=5)
+    parser.add_argument('--categories', type=int, default=8, help='Catégories par technologie')
+    parser.add_argument('--questions-per-category', type=int, default=250)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--sessions-per-user', type=int, default=2000)
+
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.seed:
+            seed(db, args)
+        targets = pick_targets(db)
+        captured = capture_queries(db, endpoint_calls(db, targets))
+        failures = check_plans(db, captured, args.max_seq_scan_rows)
+    finally:
+        db.rollback()
+        db.close()
+
+    if failures:
+        print(f"⚠️  {failures} requêtes avec parcours séquentiel sur une grande table")
+        return 1
+    print(f"🎉 {len(captured)} requêtes vérifiées")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
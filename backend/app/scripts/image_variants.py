@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Script pour générer les variantes WebP/AVIF des images des questions déjà en base
+Usage: python image_variants.py [--tech spark] [--workers 4] [--batch-size 200]
+
+Pour chaque image servie sous /static/images, des variantes miniature, mobile et desktop
+sont générées dans un pool de processus, puis leurs dimensions et URLs sont enregistrées
+dans Question.images["variants"]. Les variantes existantes ne sont pas régénérées.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from app.core.config import settings
+from app.core.db import SessionLocal
+from app.core.image_store import ImageStore
+from app.core.image_variants import VariantGenerator, image_urls, with_variants
+from app.core.queries import _json_value
+from app.models.database_models import Question, Technology
+
+def main():
+    parser = argparse.ArgumentParser(description='Générer les variantes des images des questions')
+    parser.add_argument('--tech', help='Limiter à une technologie')
+    parser.add_argument('--workers', type=int, default=settings.IMAGE_VARIANT_WORKERS,
+                       help='Processus de génération (0 = un par cœur)')
+    parser.add_argument('--batch-size', type=int, default=200, help='Questions mises à jour par transaction')
+
+    args = parser.parse_args()
+
+    store = ImageStore(settings.IMAGES_DIR)
+    generator = VariantGenerator(store, args.workers, settings.IMAGE_VARIANT_FORMATS.split(","))
+    if not generator.formats:
+        print("❌ Pillow n'est pas installé ou ne sait encoder aucun format demandé")
+        return 1
+
+    db = SessionLocal()
+    try:
+        query = db.query(Question.id).filter(Question.images.isnot(None))
+        if args.tech:
+            query = query.join(Technology).filter(Technology.name == args.tech)
+        question_ids = [row.id for row in query.order_by(Question.id)]
+        print(f"🖼️  {len(question_ids)} questions avec images ({', '.join(generator.formats)})")
+
+        updated = 0
+        for start in range(0, len(question_ids), args.batch_size):
+            questions = db.query(Question).filter(
+                Question.id.in_(question_ids[start:start + args.batch_size])
+            ).all()
+            images_by_id = {question.id: _json_value(question.images) for question in questions}
+            variants = generator.generate(
+                url for images in images_by_id.values() for url in image_urls(images)
+            )
+
+            for question in questions:
+                images = with_variants(images_by_id[question.id], variants)
+                if images != images_by_id[question.id]:
+                    question.images = images
+                    updated += 1
+            db.commit()
+            store.save()
+            print(f"📊 {min(start + args.batch_size, len(question_ids))}/{len(question_ids)} questions traitées")
+    except Exception as e:
+        print(f"❌ Erreur: {e}")
+        db.rollback()
+        raise
+    finally:
+        generator.close()
+        db.close()
+
+    print(f"🎉 {updated} questions mises à jour")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,137 +1,109 @@
-import json
+#!/usr/bin/env python3
+"""
+Import every question file in parallel, one technology per worker process
+Usage: python import_all_questions.py [--workers 4] [--file spark=extra_spark.ndjson]
+"""
+import argparse
+import multiprocessing
+import os
 import sys
-import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-import os
 
 # Add the backend app to the path
 backend_path = os.path.join(os.path.dirname(__file__), '..', '..')
 sys.path.insert(0, backend_path)
 
-from app.core.db import get_db
-from app.models.database_models import Technology, Category, Question
-from sqlalchemy.orm import Session
+from app.core.db import SessionLocal
+from app.core.question_import import DEFAULT_BATCH_SIZE, import_files
+from app.models.database_models import Technology, Question
+
+SCRIPT_DIR = Path(__file__).parent
 
-async def import_questions_from_file(db: Session, tech_name: str, file_path: str):
-    print(f"\n🚀 Importing questions for {tech_name}...")
-    
-    # Get or create technology
-    technology = db.query(Technology).filter(Technology.name == tech_name).first()
-    if not technology:
-        technology = Technology(name=tech_name, description=f"Questions about {tech_name}")
-        db.add(technology)
-        db.commit()
-        db.refresh(technology)
-        print(f"✅ Created technology: {tech_name}")
-    
-    # Load questions from JSON
-    with open(file_path, 'r', encoding='utf-8') as f:
-        questions_data = json.load(f)
-    
-    imported_count = 0
-    skipped_count = 0
-    
-    for q_data in questions_data:
-        # Check if question already exists
-        existing = db.query(Question).filter(
-            Question.question_text == q_data['question_text']
-        ).first()
-        
-        if existing:
-            skipped_count += 1
-            continue
-        
-        # Get or create category
-        category_name = q_data.get('category', 'General')
-        category = db.query(Category).filter(
-            Category.name == category_name,
-            Category.technology_id == technology.id
-        ).first()
-        
-        if not category:
-            category = Category(
-                name=category_name,
-                technology_id=technology.id,
-                description=f"{category_name} questions for {tech_name}"
-            )
-            db.add(category)
-            db.commit()
-            db.refresh(category)
-        
-        # Handle images
-        images_json = None
-        if 'code_image' in q_data:
-            images_json = json.dumps({"code": q_data['code_image']})
-        elif 'diagram_image' in q_data:
-            images_json = json.dumps({"diagram": q_data['diagram_image']})
-        elif 'screenshot_image' in q_data:
-            images_json = json.dumps({"screenshot": q_data['screenshot_image']})
-        elif 'question_image' in q_data:
-            images_json = json.dumps({"question": q_data['question_image']})
-        elif 'images' in q_data:
-            images_json = json.dumps(q_data['images'])
-        
-        # Create question
-        question = Question(
-            question_text=q_data['question_text'],
-            options=json.dumps(q_data['options']),
-            correct_answer=q_data['correct_answer'],
-            explanation=q_data.get('explanation', ''),
-            difficulty=q_data.get('difficulty', 1),
-            images=images_json,
-            tags=json.dumps(q_data.get('tags', [])),
-            technology_id=technology.id,
-            category_id=category.id
-        )
-        
-        db.add(question)
-        imported_count += 1
-    
-    db.commit()
-    print(f"✅ {tech_name}: {imported_count} questions imported, {skipped_count} skipped")
-    return imported_count
+# Technology name -> (display name, files shipped in this directory)
+DEFAULT_IMPORTS = {
+    'spark': ('Apache Spark', ['spark_mixed_questions.json']),
+    'git': ('Git', ['git_mixed_questions.json']),
+    'docker': ('Docker', ['docker_mixed_questions.json']),
+    'JavaScript': ('JavaScript', ['javascript_questions.json']),
+    'Python': ('Python', ['python_questions.json']),
+}
+
+def collect_jobs(extra_files):
+    """Group files by technology: each technology is imported by a single worker"""
+    jobs = {}
+    for tech_name, (display_name, file_names) in DEFAULT_IMPORTS.items():
+        paths = [str(SCRIPT_DIR / name) for name in file_names if (SCRIPT_DIR / name).exists()]
+        if paths:
+            jobs[tech_name] = (display_name, paths)
+
+    for spec in extra_files or []:
+        tech_name, _, path = spec.partition('=')
+        if not path or not Path(path).exists():
+            raise SystemExit(f"❌ Invalid --file '{spec}' (expected tech=path to an existing file)")
+        jobs.setdefault(tech_name, (None, []))[1].append(path)
+    return jobs
 
 def main():
-    from app.core.db import SessionLocal
+    parser = argparse.ArgumentParser(description='Import all question files in parallel')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                       help='Number of worker processes (default: one per core)')
+    parser.add_argument('--file', action='append', dest='files', metavar='TECH=PATH',
+                       help='Additional JSON/NDJSON file for a technology (repeatable)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--no-validate', action='store_true',
+                       help='Skip QuestionCreate schema validation in workers')
+
+    args = parser.parse_args()
+
+    jobs = collect_jobs(args.files)
+    if not jobs:
+        print("❌ No question files found")
+        return 1
+
+    workers = max(1, min(args.workers, len(jobs)))
+    print(f"🚀 Importing {len(jobs)} technologies with {workers} worker processes...")
+
+    started_at = time.perf_counter()
+    reports = []
+    failures = 0
+    # spawn: each worker opens its own database connections
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = {
+            executor.submit(import_files, tech_name, display_name, paths, args.batch_size, not args.no_validate): tech_name
+            for tech_name, (display_name, paths) in jobs.items()
+        }
+        for future in as_completed(futures):
+            tech_name = futures[future]
+            try:
+                report = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"❌ {tech_name}: {e}")
+                continue
+            reports.append(report)
+            print(f"✅ {report.summary()}")
+            for error in report.errors:
+                print(f"   ⚠️  {error}")
+    elapsed = time.perf_counter() - started_at
+
+    total_inserted = sum(report.inserted for report in reports)
+    print(f"\n🎉 Total: {total_inserted} questions imported, "
+          f"{sum(report.duplicates for report in reports)} duplicates, "
+          f"{sum(report.invalid for report in reports)} invalid "
+          f"in {elapsed:.2f}s ({total_inserted / elapsed if elapsed else 0:.0f} rows/s)")
+
+    # Show summary
     db = SessionLocal()
-    
     try:
-        total_imported = 0
-        
-        # Get the current script directory
-        script_dir = os.path.dirname(__file__)
-        
-        # Import Spark questions
-        spark_file = os.path.join(script_dir, 'spark_mixed_questions.json')
-        if Path(spark_file).exists():
-            count = asyncio.run(import_questions_from_file(db, 'Apache Spark', spark_file))
-            total_imported += count
-        
-        # Import Git questions  
-        git_file = os.path.join(script_dir, 'git_mixed_questions.json')
-        if Path(git_file).exists():
-            count = asyncio.run(import_questions_from_file(db, 'Git', git_file))
-            total_imported += count
-        
-        # Import Docker questions
-        docker_file = os.path.join(script_dir, 'docker_mixed_questions.json')
-        if Path(docker_file).exists():
-            count = asyncio.run(import_questions_from_file(db, 'Docker', docker_file))
-            total_imported += count
-        
-        print(f"\n🎉 Total imported: {total_imported} questions across all technologies!")
-        
-        # Show summary
-        technologies = db.query(Technology).all()
-        for tech in technologies:
+        for tech in db.query(Technology).all():
             question_count = db.query(Question).filter(Question.technology_id == tech.id).count()
             print(f"📊 {tech.name}: {question_count} questions total")
-            
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        db.rollback()
     finally:
         db.close()
 
+    return 1 if failures else 0
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    sys.exit(main())
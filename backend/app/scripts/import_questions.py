@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Script d'import en masse des questions d'une technologie
+Usage: python import_questions.py --tech spark --file questions_spark.json [--display-name "Apache Spark"]
+       python import_questions.py --tech spark --file export.ndjson --format ndjson
+
+Accepte une liste de questions, un objet {"technology": ..., "questions": [...]} ou un
+fichier NDJSON (une question par ligne). Le fichier est lu au fil de l'eau et chaque lot est
+validé séparément : un point de contrôle (<fichier>.checkpoint) permet de reprendre un import
+interrompu là où il s'est arrêté. Les doublons sont ignorés : l'import peut être relancé.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from app.core.db import SessionLocal
+from app.core.question_files import (
+    QUESTION_FILE_FORMATS, iter_questions, load_checkpoint, save_checkpoint, clear_checkpoint
+)
+from app.core.question_import import DEFAULT_BATCH_SIZE, ensure_technology, import_questions
+
+def main():
+    parser = argparse.ArgumentParser(description='Importer des questions en masse')
+    parser.add_argument('--tech', required=True, help='Nom technique de la technologie (créée si absente)')
+    parser.add_argument('--file', required=True, help='Fichier JSON ou NDJSON contenant les questions')
+    parser.add_argument('--display-name', help='Nom affiché si la technologie est créée')
+    parser.add_argument('--format', choices=QUESTION_FILE_FORMATS,
+                       help='Format du fichier (déduit de l\'extension par défaut: .ndjson/.jsonl)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                       help='Nombre de questions par INSERT (et par transaction)')
+    parser.add_argument('--restart', action='store_true',
+                       help='Ignorer le point de contrôle et reprendre depuis le début')
+
+    args = parser.parse_args()
+
+    if not Path(args.file).exists():
+        print(f"❌ Fichier non trouvé: {args.file}")
+        return 1
+
+    skip = 0 if args.restart else load_checkpoint(args.file, args.tech)
+    if skip:
+        print(f"⏩ Reprise après {skip} questions déjà traitées")
+    print(f"🚀 Import des questions pour {args.tech} depuis {args.file}")
+
+    def commit_batch(report):
+        db.commit()
+        save_checkpoint(args.file, args.tech, skip + report.read)
+        print(f"📊 {skip + report.read} questions traitées, {report.inserted} insérées ({report.rows_per_second:.0f} lignes/s)")
+
+    db = SessionLocal()
+    try:
+        tech = ensure_technology(db, args.tech, args.display_name)
+        db.commit()
+        report = import_questions(
+            db,
+            tech,
+            iter_questions(args.file, args.format, skip),
+            batch_size=args.batch_size,
+            on_batch=commit_batch
+        )
+    except Exception as e:
+        print(f"❌ Erreur: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    clear_checkpoint(args.file)
+    print(f"🎉 {report.summary()}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
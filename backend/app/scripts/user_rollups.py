@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Script pour reconstruire et vérifier les rollups de statistiques utilisateurs
+Usage: python user_rollups.py backfill [--user-id 1 --user-id 2]
+       python user_rollups.py check [--user-id 1]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Ajouter le chemin parent pour les imports
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from app.core.db import SessionLocal
+from app.core.rollups import rebuild_user_rollups, check_user_rollups
+
+def backfill(user_ids) -> int:
+    db = SessionLocal()
+    try:
+        rebuilt = rebuild_user_rollups(db, user_ids)
+        db.commit()
+        for table_name, count in rebuilt.items():
+            print(f"✅ {table_name}: {count} lignes reconstruites")
+        return 0
+    except Exception as e:
+        print(f"❌ Erreur: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def check(user_ids) -> int:
+    db = SessionLocal()
+    try:
+        mismatches = check_user_rollups(db, user_ids)
+    finally:
+        db.close()
+
+    if not mismatches:
+        print("✅ Rollups cohérents avec quiz_sessions")
+        return 0
+
+    for mismatch in mismatches:
+        print(f"❌ {mismatch['table']} {mismatch['key']}: attendu {mismatch['expected']}, trouvé {mismatch['actual']}")
+    print(f"⚠️  {len(mismatches)} écarts détectés, relancer 'backfill' pour corriger")
+    return 1
+
+def main():
+    parser = argparse.ArgumentParser(description='Rollups des statistiques utilisateurs')
+    parser.add_argument('command', choices=['backfill', 'check'],
+                       help='backfill: recalculer depuis quiz_sessions, check: comparer aux tables brutes')
+    parser.add_argument('--user-id', type=int, action='append', dest='user_ids',
+                       help='Limiter à un utilisateur (répétable)')
+
+    args = parser.parse_args()
+
+    if args.command == 'backfill':
+        return backfill(args.user_ids)
+    return check(args.user_ids)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,18 @@
+import os
+import sys
+from pathlib import Path
+
+# Ajouter le dossier backend pour les imports de `app`
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Réglages minimaux pour importer l'application sans fichier .env
+for name, value in {
+    "POSTGRES_USER": "quiz_user",
+    "POSTGRES_PASSWORD": "quiz_password",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "quiz_db",
+    "SECRET_KEY": "test-secret-key",
+    "ENVIRONMENT": "test",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+import jwt
+import pytest
+
+from app.core.auth import ALGORITHM, SECRET_KEY, AuthError, create_access_token, verify_token
+
+
+def assert_unauthorized(token: str, detail: str):
+    with pytest.raises(AuthError) as error:
+        verify_token(token)
+    assert error.value.status_code == 401
+    assert error.value.detail == detail
+
+
+def test_verify_token_returns_payload():
+    payload = verify_token(create_access_token({"sub": "alice", "uid": 1}))
+    assert payload["sub"] == "alice"
+    assert payload["uid"] == 1
+
+
+@pytest.mark.parametrize("token", ["", "not-a-token", "a.b.c"])
+def test_verify_token_rejects_malformed_token(token):
+    assert_unauthorized(token, "Invalid token")
+
+
+def test_verify_token_rejects_bad_signature():
+    token = jwt.encode({"sub": "alice"}, SECRET_KEY + "-other", algorithm=ALGORITHM)
+    assert_unauthorized(token, "Invalid token")
+
+
+def test_verify_token_rejects_expired_token():
+    token = create_access_token({"sub": "alice"}, expires_delta=timedelta(seconds=-1))
+    assert_unauthorized(token, "Token expired")
+
+
+def test_verify_token_requires_subject():
+    token = jwt.encode({"uid": 1}, SECRET_KEY, algorithm=ALGORITHM)
+    assert_unauthorized(token, "Invalid token")
@@ -0,0 +1,39 @@
+import sys
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+sys.path.append(str(Path(__file__).parent.parent / "app" / "scripts"))
+
+import check_query_plans
+from app.core.db import SessionLocal, engine
+
+
+@pytest.fixture
+def db():
+    try:
+        with engine.connect() as connection:
+            if connection.dialect.name != "postgresql":
+                pytest.skip("EXPLAIN (FORMAT JSON) nécessite Postgres")
+    except OperationalError as e:
+        pytest.skip(f"Postgres indisponible: {e}")
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        # Données synthétiques annulées, comme avec scripts/check_query_plans.py --seed
+        session.rollback()
+        session.close()
+
+
+def test_endpoint_queries_avoid_sequential_scans(db):
+    args = Namespace(technologies=5, categories=8, questions_per_category=250, users=20, sessions_per_user=2000)
+    check_query_plans.seed(db, args)
+    targets = check_query_plans.pick_targets(db)
+    captured = check_query_plans.capture_queries(db, check_query_plans.endpoint_calls(db, targets))
+
+    assert captured
+    assert check_query_plans.check_plans(db, captured, max_rows=1000) == 0
@@ -0,0 +1,54 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from app.core.question_files import _JsonReader, _iter_json
+
+CHUNK_SIZES = (1, 2, 3, 7)
+
+DOCUMENTS = [
+    '[4.5]',
+    '[1e10]',
+    '[-0.25, 3E-2, 12345678901234567890]',
+    '[{"a":1}, 4.5]',
+    '[{"a": 1.5e+3, "b": [true, false, null], "c": "\\u00e9t\\u00e9"}]',
+    '{"technology": "python", "count": 2.75, "questions": [{"d": 10}, {"d": 2.0}], "tail": 1e3}',
+    ' [ ] ',
+]
+
+QUESTION_FILES = sorted((Path(__file__).parent.parent / "app" / "scripts").glob("*_questions*.json"))
+
+
+def expected_items(document: str):
+    data = json.loads(document)
+    return data["questions"] if isinstance(data, dict) else data
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_iter_json_matches_json_load(document, chunk_size):
+    assert list(_iter_json(io.StringIO(document), chunk_size)) == expected_items(document)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("path", QUESTION_FILES, ids=lambda path: path.name)
+def test_iter_json_reads_question_files(path, chunk_size):
+    document = path.read_text(encoding="utf-8")
+    assert list(_iter_json(io.StringIO(document), chunk_size)) == expected_items(document)
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_iter_json_rejects_malformed_numbers(chunk_size):
+    with pytest.raises(ValueError):
+        list(_iter_json(io.StringIO('[4.5x]'), chunk_size))
+
+
+def test_reader_buffer_is_bounded():
+    # Valeur jamais terminée : la lecture s'arrête au plafond au lieu de charger tout le fichier
+    stream = io.StringIO('["' + "x" * 10_000)
+    reader = _JsonReader(stream, chunk_size=16, max_buffer_size=256)
+    with pytest.raises(ValueError):
+        list(reader.array())
+    assert stream.tell() < 1024
@@ -111,44 +111,38 @@ const Quiz = ({ selectedTechnology, onBack }) => {
       is_correct: answer === questions[currentQuestion].correct_answer
     };
     
-    setUserAnswers([...userAnswers, newAnswer]);
-
-    // TODO: Réactiver la sauvegarde des réponses plus tard
-    // if (isAuthenticated && token && quizSession) {
-    //   try {
-    //     await fetch(`${API_URL}/quiz/answer`, {
-    //       method: 'POST',
-    //       headers: {
-    //         'Content-Type': 'application/json',
-    //         'Authorization': `Bearer ${token}`
-    //       },
-    //       body: JSON.stringify({
-    //         quiz_session_id: quizSession.id,
-    //         question_id: questions[currentQuestion].id,
-    //         user_answer: answer,
-    //         time_spent_seconds: Math.floor((new Date() - startTime) / 1000)
-    //       })
-    //     });
-    //   } catch (error) {
-    //     console.log('Sauvegarde en base échouée, continuons en local:', error);
-    //   }
-    // }
+    const answers = [...userAnswers, newAnswer];
+    setUserAnswers(answers);
 
     if (currentQuestion + 1 < questions.length) {
       setCurrentQuestion(currentQuestion + 1);
     } else {
       // Terminer le quiz
-      await finishQuiz();
+      await finishQuiz(answers);
     }
   };
 
-  const finishQuiz = async () => {
+  const finishQuiz = async (answers) => {
     const endTime = new Date();
     const totalTimeSeconds = Math.floor((endTime - startTime) / 1000);
 
     // Essayer de terminer la session si connecté
     if (isAuthenticated && token && quizSession) {
       try {
+        // Enregistrer toutes les réponses en un seul envoi
+        await fetch(`${API_URL}/quiz/${quizSession.id}/answers`, {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+            'Authorization': `Bearer ${token}`
+          },
+          body: JSON.stringify(answers.map(answer => ({
+            quiz_session_id: quizSession.id,
+            question_id: answer.question_id,
+            user_answer: answer.user_answer
+          })))
+        });
+
         const response = await fetch(`${API_URL}/quiz/${quizSession.id}/finish`, {
           method: 'POST',
           headers: {